@@ -22,6 +22,10 @@ export interface DocumentStatus {
     id: number;
     status: string;
     progress: number;
+    eta_seconds: number;
+    strategy?: string | null;
+    draft_ready?: boolean;
+    mode?: string;
 }
 
 const documentsService = {
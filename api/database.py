@@ -1,13 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+import os
 
-# SQLite database URL
-DATABASE_URL = "sqlite:///./git2doc.db"
+# Database URL (SQLite by default; point every API/worker node at the same
+# server database to share the job queue across machines)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./git2doc.db")
 
 # Create engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(DATABASE_URL, connect_args=connect_args)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -61,15 +64,58 @@ class Document(Base):
     name = Column(String, nullable=False)
     repo_url = Column(String, nullable=False)
     github_repo = Column(String, nullable=False)  # e.g., "owner/repo"
-    status = Column(String, default="processing")  # processing, completed, failed
+    status = Column(String, default="processing")  # processing, completed, failed, cancelled
     file_path = Column(String, nullable=True)  # Path to generated PDF
     pages = Column(Integer, nullable=True)
     size = Column(String, nullable=True)  # e.g., "2.4 MB"
     prompt = Column(Text, nullable=True)  # User's custom prompt
+    stage_timeouts = Column(Text, nullable=True)  # JSON of per-stage time budget overrides (seconds)
+    degraded_stages = Column(String, nullable=True)  # Comma-separated optional stages that were skipped
+    draft_file_path = Column(String, nullable=True)  # Quick overview PDF, shown until the full document is ready
+    mode = Column(String, nullable=True, default="standard")  # Depth mode: fast, standard, deep
+    generation_seconds = Column(Float, nullable=True)  # Pipeline wall time, to compare with the mode's target
+    strategy = Column(String, nullable=True)  # Analysis strategy chosen by the planner
+    predicted_seconds = Column(Float, nullable=True)  # Expected pipeline wall time when the run started
+    started_at = Column(DateTime, nullable=True)  # When the current pipeline run started
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="documents")
+    jobs = relationship("Job", back_populates="document", cascade="all, delete-orphan")
+
+
+# Job Model (durable generation queue)
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    status = Column(String, default="queued", index=True)  # queued, running, completed, failed, cancelled
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    available_at = Column(DateTime, default=datetime.utcnow)  # Not claimable before this time (retry backoff)
+    lease_owner = Column(String, nullable=True)  # Worker id holding the lease
+    lease_expires_at = Column(DateTime, nullable=True)  # Visibility timeout; expired leases are reclaimed
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    document = relationship("Document", back_populates="jobs")
+
+
+# Stage timing history (for ETA predictions)
+class StageTiming(Base):
+    __tablename__ = "stage_timings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, nullable=True)  # Kept after the document is deleted
+    stage = Column(String, nullable=False, index=True)
+    seconds = Column(Float, nullable=False)
+    mode = Column(String, nullable=False, index=True)
+    strategy = Column(String, nullable=True)
+    repo_size_kb = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
 # Subscription Model
@@ -96,9 +142,24 @@ def get_db():
         db.close()
 
 
+def _add_missing_columns():
+    """Add columns introduced after a table was first created (create_all never alters tables)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
 # Create all tables
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
     print("✅ Database tables created successfully")
 
 
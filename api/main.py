@@ -2,8 +2,21 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+import os
 from api.database import init_db
-from api.routers import auth, articles, documents
+from api.routers import auth, articles, documents, system
+from api.services.doc_generator import GENERATION_WORKERS
+from api.worker import Worker, build_async_runner, build_pool
+
+# Run a worker inside the API process unless generation is handled by
+# separate `python -m api.worker` processes (EMBEDDED_WORKER=0).
+# WORKER_POOL_SIZE > 0 runs its jobs in pre-forked warm processes;
+# WORKER_ASYNC_JOBS > 0 multiplexes that many jobs on one event loop.
+EMBEDDED_WORKER = os.getenv("EMBEDDED_WORKER", "1") == "1"
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "0"))
+WORKER_RECYCLE_JOBS = int(os.getenv("WORKER_RECYCLE_JOBS", "50"))
+WORKER_RECYCLE_RSS_MB = float(os.getenv("WORKER_RECYCLE_RSS_MB", "0")) or None
+WORKER_ASYNC_JOBS = int(os.getenv("WORKER_ASYNC_JOBS", "0"))
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -36,15 +49,32 @@ if storage_path.exists():
 app.include_router(auth.router)
 app.include_router(articles.router)
 app.include_router(documents.router)
+app.include_router(system.router)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     init_db()
+    if EMBEDDED_WORKER:
+        worker = Worker(
+            concurrency=GENERATION_WORKERS,
+            pool=build_pool(WORKER_POOL_SIZE, WORKER_RECYCLE_JOBS, WORKER_RECYCLE_RSS_MB),
+            async_runner=None if WORKER_POOL_SIZE else build_async_runner(WORKER_ASYNC_JOBS)
+        )
+        worker.start()
+        system.embedded_worker = worker
+        print(f"⚙️  Embedded worker started with concurrency {worker.concurrency}")
     print("🚀 Git2Doc API started successfully!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop claiming new jobs; unfinished jobs are reclaimed after their lease expires"""
+    if system.embedded_worker:
+        system.embedded_worker.stop(timeout=5)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
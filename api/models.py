@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
 
@@ -64,6 +64,8 @@ class ArticleResponse(ArticleBase):
 class DocumentCreate(BaseModel):
     repo_url: str
     prompt: Optional[str] = None
+    stage_timeouts: Optional[Dict[str, float]] = None  # e.g. {"analysis": 120, "diagram": 10}
+    mode: Optional[str] = None  # fast, standard (default) or deep
 
 
 class DocumentResponse(BaseModel):
@@ -76,6 +78,10 @@ class DocumentResponse(BaseModel):
     file_path: Optional[str] = None
     pages: Optional[int] = None
     size: Optional[str] = None
+    degraded_stages: Optional[str] = None
+    draft_file_path: Optional[str] = None
+    mode: Optional[str] = None
+    generation_seconds: Optional[float] = None
     created_at: datetime
     
     class Config:
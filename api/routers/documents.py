@@ -1,44 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+import json
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List
 from pathlib import Path
-from api.database import get_db, Document, User, SessionLocal
+from api.database import get_db, Document, User
 from api.models import DocumentCreate, DocumentResponse
 from api.middleware.auth_middleware import get_current_user
-from api.services.doc_generator import generate_documentation_task
-import re
+from api.services.doc_generator import document_dir
+from api.services.eta import document_eta
+from api.services.job_queue import cancel_jobs, enqueue_job, has_live_attempt
+from pipeline import parse_repo_url
+from pipeline.local_repo import allowed_in_api, local_repo_path
+from pipeline.modes import DEFAULT_MODE, get_mode
+from pipeline.runner import resolve_budgets
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
 
-def parse_github_url(url: str) -> str:
-    """Extract owner/repo from GitHub URL"""
-    url = url.replace('https://', '').replace('http://', '')
-    url = url.replace('github.com/', '')
-    url = url.replace('.git', '')
-    parts = url.strip('/').split('/')
-    if len(parts) >= 2:
-        return f"{parts[0]}/{parts[1]}"
-    raise ValueError(f"Invalid GitHub URL format: {url}")
-
-
 @router.post("/generate", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_document(
     doc_data: DocumentCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Generate documentation from GitHub repository
     Returns immediately with document ID and status='processing'
-    Actual generation happens in background
+    Actual generation is picked up from the job queue by a worker
     """
     
-    # Parse GitHub URL
+    # Parse the GitHub URL (or local repository path)
     try:
-        github_repo = parse_github_url(doc_data.repo_url)
+        local_path = local_repo_path(doc_data.repo_url)
+        if local_path is not None and not allowed_in_api(local_path):
+            raise ValueError("Local repositories must be under one of the LOCAL_REPO_ROOTS directories")
+        github_repo = parse_repo_url(doc_data.repo_url)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Validate the depth mode and per-stage time budget overrides
+    try:
+        mode = get_mode(doc_data.mode)
+        resolve_budgets(doc_data.stage_timeouts, mode)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,25 +59,99 @@ async def generate_document(
         repo_url=doc_data.repo_url,
         github_repo=github_repo,
         status="processing",
-        prompt=doc_data.prompt
+        prompt=doc_data.prompt,
+        stage_timeouts=json.dumps(doc_data.stage_timeouts) if doc_data.stage_timeouts else None,
+        mode=mode.name
     )
     
     db.add(new_doc)
     db.commit()
     db.refresh(new_doc)
     
-    # Add background task for documentation generation
-    background_tasks.add_task(
-        generate_documentation_task,
-        doc_id=new_doc.id,
-        repo_url=doc_data.repo_url,
-        prompt=doc_data.prompt or "",
-        db_session_maker=SessionLocal
-    )
+    # Enqueue the generation job (survives restarts; any worker can claim it)
+    enqueue_job(db, new_doc.id)
     
     return new_doc
 
 
+@router.post("/{doc_id}/resume", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_document(
+    doc_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-queue a failed or cancelled document. The worker restarts from the first
+    pipeline stage without a valid checkpoint, so finished LLM stages are not repeated.
+    """
+    document = db.query(Document).filter(
+        Document.id == doc_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if document.status not in ("failed", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only failed or cancelled documents can be resumed"
+        )
+    
+    # A cancelled run's stages may still be writing to the document's workspace
+    if has_live_attempt(db, document.id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The previous attempt is still stopping; try again in a few seconds"
+        )
+    
+    document.status = "processing"
+    db.commit()
+    enqueue_job(db, document.id)
+    db.refresh(document)
+    
+    return document
+
+
+@router.post("/{doc_id}/cancel", response_model=DocumentResponse)
+async def cancel_document(
+    doc_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cancel a document that is still being generated.
+    Its queued job is dropped, and a running one is stopped by its worker
+    within a few seconds, freeing the worker slot.
+    """
+    document = db.query(Document).filter(
+        Document.id == doc_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if document.status != "processing":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only documents that are still processing can be cancelled"
+        )
+    
+    cancel_jobs(db, document.id)
+    document.status = "cancelled"
+    db.commit()
+    db.refresh(document)
+    
+    return document
+
+
 @router.get("", response_model=List[DocumentResponse])
 async def get_user_documents(
     current_user: User = Depends(get_current_user),
@@ -126,10 +207,53 @@ async def get_document_status(
     return {
         "id": document.id,
         "status": document.status,
-        "progress": 100 if document.status == "completed" else (50 if document.status == "processing" else 0)
+        **document_eta(db, document),
+        "strategy": document.strategy,
+        "draft_ready": bool(document.draft_file_path),
+        "mode": document.mode or DEFAULT_MODE,
+        "latency_target_seconds": get_mode(document.mode).latency_target_seconds,
+        "generation_seconds": document.generation_seconds
     }
 
 
+@router.get("/{doc_id}/draft")
+async def download_draft(
+    doc_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download the draft overview PDF while the full document is being generated"""
+    document = db.query(Document).filter(
+        Document.id == doc_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not document.draft_file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No draft available"
+        )
+    
+    file_path = Path(document.draft_file_path)
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found on server"
+        )
+    
+    return FileResponse(
+        path=file_path,
+        media_type="application/pdf",
+        filename=f"{document.github_repo.replace('/', '-')}-draft.pdf"
+    )
+
+
 @router.get("/{doc_id}/download")
 async def download_document(
     doc_id: int,
@@ -180,7 +304,7 @@ async def delete_document(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Delete a document"""
+    """Delete a document, cancelling its generation if it is still running"""
     document = db.query(Document).filter(
         Document.id == doc_id,
         Document.user_id == current_user.id
@@ -192,15 +316,19 @@ async def delete_document(
             detail="Document not found"
         )
     
-    # Delete files from storage
-    if document.file_path:
-        doc_dir = Path(f"storage/documents/{doc_id}")
-        if doc_dir.exists():
-            import shutil
-            shutil.rmtree(doc_dir)
+    # Stop any in-flight generation before its files are removed
+    cancel_jobs(db, document.id)
+    # A running attempt may still write files; its worker removes them once it has exited
+    running = has_live_attempt(db, document.id)
     
     # Delete database record
     db.delete(document)
     db.commit()
     
+    # Delete files from storage (including checkpoints of unfinished runs)
+    doc_dir = document_dir(doc_id)
+    if not running and doc_dir.exists():
+        import shutil
+        shutil.rmtree(doc_dir, ignore_errors=True)
+    
     return None
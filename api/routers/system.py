@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from api.database import User
+from api.middleware.auth_middleware import get_current_admin_user
+from pipeline import github_http, github_rate
+from pipeline.snapshot_cache import get_cache
+
+router = APIRouter(prefix="/api/system", tags=["System"])
+
+# Worker running inside this API process (set on startup), if any
+embedded_worker = None
+
+
+@router.get("/workers")
+async def get_worker_stats(current_user: User = Depends(get_current_admin_user)):
+    """Embedded worker, warm pool and async runner statistics (admin only)"""
+    if embedded_worker is None:
+        return {"embedded_worker": False, "pool": None, "async_runner": None}
+
+    return {
+        "embedded_worker": True,
+        "worker_id": embedded_worker.worker_id,
+        "concurrency": embedded_worker.concurrency,
+        "pool": embedded_worker.pool.stats() if embedded_worker.pool else None,
+        "async_runner": embedded_worker.async_runner.stats() if embedded_worker.async_runner else None
+    }
+
+
+@router.get("/snapshot-cache")
+async def get_snapshot_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """Repository snapshot cache size and hit/miss counts across all workers (admin only)"""
+    cache = get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/github-cache")
+async def get_github_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """GitHub requests sent and ETag revalidations of this process, and the shared rate-limit budget (admin only)"""
+    return {**github_http.stats(), "rate_limit": github_rate.stats()}
@@ -1,150 +1,192 @@
-import subprocess
+import json
 import os
 import shutil
+import threading
+from datetime import datetime
 from pathlib import Path
 from sqlalchemy.orm import Session
 from api.database import Document
+from api.services.eta import predict_total_seconds, record_stage_timings
+from pipeline import parse_repo_url, parse_tree_path, run_pipeline
+from pipeline.local_repo import local_repo_path
+from pipeline.draft import generate_draft
+from pipeline.modes import get_mode
+from pipeline.planner import plan_job
+from pipeline.workspace import JobWorkspace
 import PyPDF2
 
+# Job slots of the worker embedded in the API process (see api/main.py)
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "4"))
 
-async def generate_documentation_task(
+# Git2Doc root directory; generated documents live under storage/documents/<id>
+GIT2DOC_ROOT = Path(__file__).parent.parent.parent.absolute()
+
+# Publish a quick draft overview while the full pipeline runs
+DRAFT_ENABLED = os.getenv("DRAFT_ENABLED", "1") == "1"
+
+def document_dir(doc_id: int) -> Path:
+    """Directory of a document's files (PDFs, drafts, checkpoints)"""
+    return GIT2DOC_ROOT / f"storage/documents/{doc_id}"
+
+
+DEFAULT_QUESTION = "Generate comprehensive technical documentation for this repository, including architecture, implementation details, and usage instructions."
+
+
+def publish_draft(doc_id: int, repo_url: str, output_dir: Path, db_session_maker):
+    """Generate the draft overview and expose it on the document (never raises)"""
+    try:
+        draft_pdf = generate_draft(repo_url, output_dir)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not generate draft for doc_id {doc_id}: {e}")
+        return
+
+    db = db_session_maker()
+    try:
+        doc = db.query(Document).filter(Document.id == doc_id).first()
+        # Too late if the full document (or a cancellation) got there first
+        if doc and doc.status == "processing":
+            doc.draft_file_path = str(draft_pdf.relative_to(GIT2DOC_ROOT))
+            db.commit()
+            print(f"Draft ready for doc_id {doc_id}")
+            return
+    finally:
+        db.close()
+
+    # Nobody removes the files of a draft that was never published
+    if doc is None:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return
+    workspace = JobWorkspace(root=output_dir)
+    for draft_file in (workspace.draft_markdown_file, workspace.draft_pdf_file):
+        draft_file.unlink(missing_ok=True)
+
+
+def generate_document(
     doc_id: int,
     repo_url: str,
     prompt: str,
-    db_session_maker
+    db_session_maker,
+    runner=None,
+    cancel_event=None
 ):
     """
-    Background task to generate documentation using existing Git2Doc main.py
-    
+    Generate documentation using the in-process Git2Doc pipeline (blocking)
+
     This function:
     1. Creates output directory for the document
-    2. Calls the existing main.py script with repo URL and prompt
-    3. Moves generated files to the document's storage directory
-    4. Updates database with file info and status
+    2. Publishes a draft overview in the background (see publish_draft)
+    3. Plans the analysis strategy and stores the predicted duration (ETA)
+    4. Runs the pipeline with repo URL and prompt, writing into that directory
+    5. Updates database with file info, status, wall time and any degraded
+       stages, replacing the draft, and records the stage timings
+
+    Raises on failure and leaves the document status untouched, so callers
+    (the job queue worker) can decide whether to retry. `runner` replaces
+    run_pipeline, e.g. with WorkerPool.run to execute in a warm process.
+    Setting `cancel_event` aborts the run with PipelineCancelled.
     """
-    
-    # Get the Git2Doc root directory first
-    git2doc_root = Path(__file__).parent.parent.parent.absolute()
-    
+
+    git2doc_root = GIT2DOC_ROOT
+
     # Create output directory as absolute path
-    output_dir = git2doc_root / f"storage/documents/{doc_id}"
+    output_dir = document_dir(doc_id)
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Prepare the question/prompt for main.py
-    question = prompt if prompt else "Generate comprehensive technical documentation for this repository, including architecture, implementation details, and usage instructions."
-    
-    # Create a temporary input file for the subprocess
-    temp_input_file = output_dir / "input.txt"
-    with open(temp_input_file, 'w') as f:
-        f.write(f"{repo_url}\n{question}\n")
-    
+
+    # Prepare the question/prompt for the pipeline
+    question = prompt if prompt else DEFAULT_QUESTION
+
+    # Depth mode and per-job stage time budgets, if the request set any
+    db = db_session_maker()
+    try:
+        doc = db.query(Document).filter(Document.id == doc_id).first()
+        stage_budgets = json.loads(doc.stage_timeouts) if doc and doc.stage_timeouts else None
+        mode = doc.mode if doc else None
+        github_repo = doc.github_repo if doc else parse_repo_url(repo_url)
+        local_path = local_repo_path(repo_url)
+        # The draft is built from GitHub metadata, which local repositories do not have
+        needs_draft = DRAFT_ENABLED and doc is not None and not doc.draft_file_path and local_path is None
+    finally:
+        db.close()
+
+    # The draft only needs a few GitHub calls, so it is ready long before the pipeline
+    if needs_draft:
+        threading.Thread(
+            target=publish_draft,
+            args=(doc_id, repo_url, output_dir, db_session_maker),
+            name=f"git2doc-draft-{doc_id}",
+            daemon=True
+        ).start()
+
+    # Plan up front, so the ETA can account for the strategy
+    depth_mode = get_mode(mode)
+    ref, subpath = (None, "") if local_path else parse_tree_path(repo_url)
+    plan = plan_job(github_repo, depth_mode, local_path=local_path, ref=ref, subpath=subpath)
+    db = db_session_maker()
+    try:
+        doc = db.query(Document).filter(Document.id == doc_id).first()
+        if doc:
+            doc.strategy = plan.strategy
+            doc.predicted_seconds = predict_total_seconds(db, depth_mode.name, plan.strategy)
+            doc.started_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+    # Resume from any stage checkpoints a previous attempt left in the directory
+    result = (runner or run_pipeline)(
+        repo_url, question, output_dir, resume=True, stage_budgets=stage_budgets,
+        cancel_event=cancel_event, mode=mode, plan=plan
+    )
+    pdf_path = result.pdf_file
+
+    if not pdf_path.exists():
+        raise RuntimeError(f"No PDF produced for doc_id: {doc_id}")
+
+    # Get number of pages
+    pages = None
     try:
-        # Set up environment with PYTHONPATH
-        env = os.environ.copy()
-        env['PYTHONPATH'] = str(git2doc_root)
-        
-        result = subprocess.run(
-            ["python3", "main.py"],
-            stdin=open(temp_input_file),
-            cwd=git2doc_root,
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout
+        with open(pdf_path, 'rb') as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            pages = len(pdf_reader.pages)
+    except Exception:
+        pass
+
+    # Get file size
+    size_bytes = pdf_path.stat().st_size
+    if size_bytes < 1024 * 1024:
+        size_str = f"{size_bytes / 1024:.1f} KB"
+    else:
+        size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
+
+    scope = f"{result.repo_name}/{result.subpath}" if result.subpath else result.repo_name
+    doc_name = f"{scope.replace('/', '-')}-docs.pdf"
+
+    # Update database
+    db = db_session_maker()
+    try:
+        doc = db.query(Document).filter(Document.id == doc_id).first()
+        # A document cancelled while the PDF was being rendered stays cancelled
+        if doc and doc.status == "processing":
+            doc.name = doc_name
+            doc.file_path = str(pdf_path.relative_to(git2doc_root))
+            doc.pages = pages
+            doc.size = size_str
+            doc.degraded_stages = ",".join(result.degraded_stages) or None
+            doc.generation_seconds = round(result.elapsed_seconds, 1)
+            doc.draft_file_path = None
+            doc.status = "completed"
+            db.commit()
+
+        # Stages restored from checkpoints or skipped say nothing about future runs
+        skipped = set(result.resumed_stages) | set(result.degraded_stages)
+        record_stage_timings(
+            db, doc_id, depth_mode.name, plan.strategy, plan.size_kb,
+            {stage: seconds for stage, seconds in result.stage_timings.items() if stage not in skipped}
         )
-        
-        if result.returncode != 0:
-            print(f"Error generating documentation: {result.stderr}")
-            # Update database with failed status
-            db = db_session_maker()
-            try:
-                doc = db.query(Document).filter(Document.id == doc_id).first()
-                if doc:
-                    doc.status = "failed"
-                    db.commit()
-            finally:
-                db.close()
-            return
-        
-        # Move generated files to output directory
-        # List of files generated by main.py
-        generated_files = [
-            "technical_documentation.pdf",
-            "content.txt",
-            "project_workflow.json",
-            "project_workflow_diagram.png"
-        ]
-        
-        pdf_path = None
-        for filename in generated_files:
-            source = git2doc_root / filename
-            if source.exists():
-                dest = output_dir / filename
-                shutil.move(str(source), str(dest))
-                if filename == "technical_documentation.pdf":
-                    pdf_path = dest
-        
-        # Get PDF info
-        pages = None
-        size_str = None
-        
-        if pdf_path and pdf_path.exists():
-            # Get number of pages
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    pages = len(pdf_reader.pages)
-            except:
-                pass
-            
-            # Get file size
-            size_bytes = pdf_path.stat().st_size
-            if size_bytes < 1024 * 1024:
-                size_str = f"{size_bytes / 1024:.1f} KB"
-            else:
-                size_str = f"{size_bytes / (1024 * 1024):.1f} MB"
-            
-            # Extract repo name from URL
-            repo_parts = repo_url.rstrip('/').split('/')
-            repo_name = f"{repo_parts[-2]}/{repo_parts[-1]}" if len(repo_parts) >= 2 else repo_parts[-1]
-            doc_name = f"{repo_name.replace('/', '-')}-docs.pdf"
-            
-            # Update database
-            db = db_session_maker()
-            try:
-                doc = db.query(Document).filter(Document.id == doc_id).first()
-                if doc:
-                    doc.name = doc_name
-                    doc.file_path = str(pdf_path.relative_to(git2doc_root))
-                    doc.pages = pages
-                    doc.size = size_str
-                    doc.status = "completed"
-                    db.commit()
-            finally:
-                db.close()
-        
-        # Clean up temp file
-        if temp_input_file.exists():
-            temp_input_file.unlink()
-            
-    except subprocess.TimeoutExpired:
-        print(f"Documentation generation timed out for doc_id: {doc_id}")
-        db = db_session_maker()
-        try:
-            doc = db.query(Document).filter(Document.id == doc_id).first()
-            if doc:
-                doc.status = "failed"
-                db.commit()
-        finally:
-            db.close()
-            
-    except Exception as e:
-        print(f"Error in document generation task: {str(e)}")
-        db = db_session_maker()
-        try:
-            doc = db.query(Document).filter(Document.id == doc_id).first()
-            if doc:
-                doc.status = "failed"
-                db.commit()
-        finally:
-            db.close()
+    finally:
+        db.close()
+
+    # The full document replaces the draft
+    workspace = JobWorkspace(root=output_dir)
+    for draft_file in (workspace.draft_markdown_file, workspace.draft_pdf_file):
+        draft_file.unlink(missing_ok=True)
@@ -0,0 +1,104 @@
+"""
+ETA predictions from the timings of earlier jobs.
+
+Every finished job records how long each of its stages took, together with
+its depth mode and analysis strategy. A new job's expected duration is the
+critical path of its stage DAG, with each stage estimated by the median of
+the recent runs of that stage in the same mode and strategy (falling back to
+the same mode, then to fixed priors scaled to the mode's latency target).
+"""
+import statistics
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from api.database import Document, StageTiming
+from pipeline.dag import critical_path_seconds
+from pipeline.modes import get_mode
+from pipeline.runner import stage_dependencies
+
+# Recent runs per stage that an estimate is based on
+HISTORY_SAMPLES = 50
+# Fewer runs than this are not trusted over the broader fallback
+MIN_SAMPLES = 3
+
+# Typical stage durations of a standard-mode job, used until there is history
+PRIOR_STAGE_SECONDS = {
+    "ingest": 0.1,
+    "plan": 2,
+    "snapshot": 3,
+    "scan": 0.2,
+    "pack": 0.5,
+    "analyze": 90,
+    "document": 60,
+    "workflow_json": 30,
+    "diagram": 3,
+    "render": 5,
+}
+
+# Running jobs never report more than this before they actually finish
+MAX_RUNNING_PROGRESS = 95
+
+
+def record_stage_timings(
+    db: Session,
+    document_id: int,
+    mode: str,
+    strategy: Optional[str],
+    repo_size_kb: Optional[int],
+    timings: Dict[str, float]
+):
+    """Store the stage durations of a finished run"""
+    for stage, seconds in timings.items():
+        db.add(StageTiming(
+            document_id=document_id,
+            stage=stage,
+            seconds=seconds,
+            mode=mode,
+            strategy=strategy,
+            repo_size_kb=repo_size_kb
+        ))
+    db.commit()
+
+
+def _recent_seconds(db: Session, stage: str, mode: str, strategy: Optional[str]) -> List[float]:
+    query = db.query(StageTiming.seconds).filter(StageTiming.stage == stage, StageTiming.mode == mode)
+    if strategy:
+        query = query.filter(StageTiming.strategy == strategy)
+    rows = query.order_by(StageTiming.created_at.desc(), StageTiming.id.desc()).limit(HISTORY_SAMPLES).all()
+    return [row.seconds for row in rows]
+
+
+def predict_stage_seconds(db: Session, mode: Optional[str] = None, strategy: Optional[str] = None) -> Dict[str, float]:
+    """Expected duration of every stage of a job in this mode and strategy"""
+    depth_mode = get_mode(mode)
+    prior_scale = depth_mode.latency_target_seconds / get_mode().latency_target_seconds
+    estimates = {}
+    for stage in stage_dependencies(depth_mode):
+        samples = _recent_seconds(db, stage, depth_mode.name, strategy)
+        if len(samples) < MIN_SAMPLES and strategy:
+            samples = _recent_seconds(db, stage, depth_mode.name, None)
+        if len(samples) >= MIN_SAMPLES:
+            estimates[stage] = statistics.median(samples)
+        else:
+            estimates[stage] = PRIOR_STAGE_SECONDS.get(stage, 0.0) * prior_scale
+    return estimates
+
+
+def predict_total_seconds(db: Session, mode: Optional[str] = None, strategy: Optional[str] = None) -> float:
+    """Expected wall time of a job: the critical path through its stages"""
+    return critical_path_seconds(stage_dependencies(get_mode(mode)), predict_stage_seconds(db, mode, strategy))
+
+
+def document_eta(db: Session, document: Document, now: Optional[datetime] = None) -> dict:
+    """Progress (percent) and remaining seconds of a document's generation"""
+    if document.status != "processing":
+        return {"progress": 100 if document.status == "completed" else 0, "eta_seconds": 0.0}
+
+    predicted = document.predicted_seconds or predict_total_seconds(db, document.mode, document.strategy)
+    if document.started_at is None:
+        # Still queued: the whole run is ahead
+        return {"progress": 0, "eta_seconds": round(predicted, 1)}
+
+    elapsed = ((now or datetime.utcnow()) - document.started_at).total_seconds()
+    progress = min(MAX_RUNNING_PROGRESS, int(elapsed / predicted * 100)) if predicted else MAX_RUNNING_PROGRESS
+    return {"progress": progress, "eta_seconds": round(max(0.0, predicted - elapsed), 1)}
@@ -0,0 +1,199 @@
+"""
+Durable generation job queue on top of the SQLAlchemy database.
+
+Jobs are claimed with a lease: a worker owns a job until lease_expires_at and
+must keep extending it while it runs. If the worker dies the lease expires and
+any other worker (in any process or on any node sharing the database) can
+claim the job again. Failed attempts are retried with exponential backoff
+until max_attempts is reached. Cancelled jobs are never claimed again, and
+the worker running one notices the cancellation and stops it. A cancelled
+job keeps its lease until the worker's attempt has actually exited, so the
+document is not resumed while that attempt can still write to its workspace.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from api.database import Document, Job
+
+# Queue configuration
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30"))
+
+
+def enqueue_job(db: Session, document_id: int, max_attempts: int = None) -> Job:
+    """Add a generation job for a document to the queue"""
+    job = Job(
+        document_id=document_id,
+        status="queued",
+        max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+        available_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claimable(now: datetime):
+    """Jobs that are due, or whose lease (visibility timeout) has expired"""
+    return or_(
+        and_(Job.status == "queued", Job.available_at <= now),
+        and_(Job.status == "running", Job.lease_expires_at < now),
+    )
+
+
+def claim_job(db: Session, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> Optional[Job]:
+    """
+    Claim the next available job for worker_id.
+
+    The claim is a conditional UPDATE, so two workers racing for the same row
+    cannot both win. Returns None if nothing is claimable.
+    """
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(_claimable(now)).order_by(
+        Job.available_at, Job.id
+    ).limit(10).all()
+
+    for (job_id,) in candidates:
+        claimed = db.query(Job).filter(Job.id == job_id, _claimable(now)).update(
+            {
+                Job.status: "running",
+                Job.lease_owner: worker_id,
+                Job.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                Job.attempts: Job.attempts + 1,
+                Job.updated_at: now,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        if not claimed:
+            continue  # Another worker won the race
+
+        job = db.get(Job, job_id)
+        db.refresh(job)
+        if job.attempts > job.max_attempts:
+            # Reclaimed after its last attempt's worker died
+            _finish_failed(db, job, job.last_error or "Lease expired on final attempt")
+            continue
+        return job
+
+    return None
+
+
+def extend_lease(db: Session, job_id: int, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """Heartbeat: push the lease forward. Returns False if the lease was lost."""
+    now = datetime.utcnow()
+    extended = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status.in_(["running", "cancelled"]),
+        Job.lease_owner == worker_id
+    ).update(
+        {Job.lease_expires_at: now + timedelta(seconds=lease_seconds), Job.updated_at: now},
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(extended)
+
+
+def complete_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Mark a job completed if worker_id still holds its lease"""
+    completed = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == "running",
+        Job.lease_owner == worker_id
+    ).update(
+        {Job.status: "completed", Job.lease_expires_at: None, Job.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(completed)
+
+
+def fail_job(db: Session, job_id: int, worker_id: str, error: str) -> Optional[str]:
+    """
+    Record a failed attempt. The job is re-queued with exponential backoff,
+    or failed for good (together with its document) once attempts run out.
+    Returns the job's new status, or None if worker_id no longer holds the lease.
+    """
+    job = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == "running",
+        Job.lease_owner == worker_id
+    ).first()
+    if not job:
+        return None
+
+    if job.attempts >= job.max_attempts:
+        _finish_failed(db, job, error)
+        return "failed"
+
+    backoff = JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+    job.status = "queued"
+    job.lease_owner = None
+    job.lease_expires_at = None
+    job.available_at = datetime.utcnow() + timedelta(seconds=backoff)
+    job.last_error = error
+    db.commit()
+    return "queued"
+
+
+def cancel_jobs(db: Session, document_id: int) -> int:
+    """
+    Cancel a document's queued and running jobs; returns how many were cancelled.
+    Running jobs keep their lease until their worker releases it (see release_job).
+    """
+    now = datetime.utcnow()
+    queued = db.query(Job).filter(Job.document_id == document_id, Job.status == "queued").update(
+        {Job.status: "cancelled", Job.lease_owner: None, Job.lease_expires_at: None, Job.updated_at: now},
+        synchronize_session=False
+    )
+    running = db.query(Job).filter(Job.document_id == document_id, Job.status == "running").update(
+        {Job.status: "cancelled", Job.updated_at: now},
+        synchronize_session=False
+    )
+    db.commit()
+    return queued + running
+
+
+def release_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """Drop worker_id's lease on a cancelled job once its attempt has exited"""
+    released = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == "cancelled",
+        Job.lease_owner == worker_id
+    ).update(
+        {Job.lease_owner: None, Job.lease_expires_at: None, Job.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(released)
+
+
+def has_live_attempt(db: Session, document_id: int) -> bool:
+    """True while a worker still holds an unexpired lease on one of the document's jobs"""
+    return db.query(Job.id).filter(
+        Job.document_id == document_id,
+        Job.lease_owner.isnot(None),
+        Job.lease_expires_at >= datetime.utcnow()
+    ).first() is not None
+
+
+def is_cancelled(db: Session, job_id: int) -> bool:
+    """True if a job was cancelled or deleted (together with its document)"""
+    status = db.query(Job.status).filter(Job.id == job_id).scalar()
+    return status is None or status == "cancelled"
+
+
+def _finish_failed(db: Session, job: Job, error: str):
+    """Fail a job permanently and mark its document failed"""
+    job.status = "failed"
+    job.lease_owner = None
+    job.lease_expires_at = None
+    job.last_error = error
+    doc = db.query(Document).filter(Document.id == job.document_id).first()
+    if doc:
+        doc.status = "failed"
+    db.commit()
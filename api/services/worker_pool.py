@@ -0,0 +1,265 @@
+"""
+Pre-forked pool of warm pipeline processes.
+
+Each child process imports the heavy pipeline dependencies (agno, the
+OpenRouter client, PyMuPDF, graphviz) once, reports "ready", and then runs
+jobs handed to it by the parent. A child is recycled after a configurable
+number of jobs or once its RSS crosses a threshold, so leaks in third-party
+libraries cannot accumulate; a replacement is started immediately.
+Cancelling a job kills the process running it (which stops any in-flight
+LLM calls) and likewise replaces it.
+
+Children are created from a forkserver that has the pipeline modules
+preloaded, which keeps process start cheap and avoids forking the API's
+threads.
+"""
+import importlib
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Optional
+
+from pipeline.dag import CANCEL_POLL_SECONDS, PipelineCancelled
+
+# Modules the forkserver imports once so every child starts warm
+PRELOAD_MODULES = ["pipeline", "pipeline.agents", "doc_creation", "generate_project_workflow"]
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Peak RSS: kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _resolve(target: str):
+    """Import "module:function" and return the function"""
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _child_main(conn, target: str, warm_up: Optional[str], max_jobs: int, max_rss_mb: Optional[float]):
+    """Child process loop: warm up, then run jobs until recycled"""
+    if warm_up:
+        _resolve(warm_up)()
+    func = _resolve(target)
+    conn.send(("ready", os.getpid()))
+
+    jobs_done = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == "stop":
+            return
+
+        _, args, kwargs = message
+        try:
+            value, ok = func(*args, **kwargs), True
+        except Exception as e:
+            value, ok = f"{e.__class__.__name__}: {e}", False
+        jobs_done += 1
+
+        recycle = None
+        if max_jobs and jobs_done >= max_jobs:
+            recycle = "jobs"
+        elif max_rss_mb and _rss_mb() >= max_rss_mb:
+            recycle = "rss"
+        conn.send(("result", ok, value, recycle))
+        if recycle:
+            return
+
+
+class _PoolWorker:
+    """Parent-side handle for one child process"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.busy = False
+        self.started_at = time.time()
+
+
+class WorkerPool:
+    """Fixed-size pool of warm worker processes that run one job at a time each"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs_per_worker: int = 50,
+        max_rss_mb: Optional[float] = None,
+        target: str = "pipeline:run_pipeline",
+        warm_up: Optional[str] = "pipeline.agents:warm_up",
+        start_method: Optional[str] = None
+    ):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.target = target
+        self.warm_up = warm_up
+
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        self._ctx = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._ctx.set_forkserver_preload(PRELOAD_MODULES)
+
+        self._workers = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+        self._stats = {
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+            "jobs_cancelled": 0,
+            "warm_jobs": 0,
+            "cold_jobs": 0,
+            "recycled_after_jobs": 0,
+            "recycled_for_rss": 0,
+            "crashed": 0,
+        }
+
+    def start(self):
+        """Pre-fork all workers; they warm up in the background"""
+        with self._lock:
+            while len(self._workers) < self.size:
+                self._workers.append(self._spawn())
+
+    def _spawn(self) -> _PoolWorker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_child_main,
+            args=(child_conn, self.target, self.warm_up, self.max_jobs_per_worker, self.max_rss_mb),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _PoolWorker(process, parent_conn)
+
+    def _poll_ready(self, worker: _PoolWorker):
+        """Consume a pending "ready" message without blocking"""
+        if not worker.ready and worker.conn.poll():
+            message = worker.conn.recv()
+            if message[0] == "ready":
+                worker.ready = True
+
+    def _acquire(self) -> _PoolWorker:
+        """Wait for an idle worker, preferring ones that have finished warming up"""
+        with self._idle:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Worker pool is closed")
+                idle = [w for w in self._workers if not w.busy]
+                for worker in idle:
+                    self._poll_ready(worker)
+                ready = [w for w in idle if w.ready]
+                if ready or idle:
+                    worker = (ready or idle)[0]
+                    worker.busy = True
+                    return worker
+                self._idle.wait()
+
+    def _replace(self, worker: _PoolWorker, reason: str):
+        """Retire a worker and start a warm replacement (caller holds the lock)"""
+        if reason == "jobs":
+            self._stats["recycled_after_jobs"] += 1
+        elif reason == "rss":
+            self._stats["recycled_for_rss"] += 1
+        elif reason == "crash":
+            self._stats["crashed"] += 1
+        if reason == "cancelled":
+            worker.process.kill()
+        worker.conn.close()
+        worker.process.join(timeout=5)
+        if worker.process.is_alive():
+            worker.process.kill()
+        self._workers.remove(worker)
+        if not self._closed:
+            self._workers.append(self._spawn())
+
+    def run(self, *args, cancel_event: Optional[threading.Event] = None, **kwargs):
+        """
+        Run the target in a pool process and return its result (blocking).
+        Raises RuntimeError if the job raised or the worker process died, and
+        PipelineCancelled if cancel_event was set (the process is killed).
+        """
+        worker = self._acquire()
+        warm = worker.ready
+        recycle = None
+        try:
+            worker.conn.send(("job", args, kwargs))
+            while True:
+                if cancel_event is not None and not worker.conn.poll(CANCEL_POLL_SECONDS):
+                    if cancel_event.is_set():
+                        message = ("result", False, "Cancelled", "cancelled")
+                        break
+                    continue
+                message = worker.conn.recv()
+                if message[0] == "ready":
+                    worker.ready = True
+                    continue
+                break
+            _, ok, value, recycle = message
+        except (EOFError, OSError):
+            ok, value, recycle = False, "Worker process died", "crash"
+
+        with self._idle:
+            self._stats["warm_jobs" if warm else "cold_jobs"] += 1
+            if recycle == "cancelled":
+                self._stats["jobs_cancelled"] += 1
+            else:
+                self._stats["jobs_completed" if ok else "jobs_failed"] += 1
+            worker.busy = False
+            if recycle:
+                self._replace(worker, recycle)
+            self._idle.notify()
+
+        if recycle == "cancelled":
+            raise PipelineCancelled(value)
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def stats(self) -> dict:
+        """Pool size, worker states, recycle counts and warm/cold job counts"""
+        with self._lock:
+            for worker in self._workers:
+                if not worker.busy:
+                    self._poll_ready(worker)
+            return {
+                "size": self.size,
+                "alive": sum(1 for w in self._workers if w.process.is_alive()),
+                "busy": sum(1 for w in self._workers if w.busy),
+                "warm_idle": sum(1 for w in self._workers if w.ready and not w.busy),
+                "max_jobs_per_worker": self.max_jobs_per_worker,
+                "max_rss_mb": self.max_rss_mb,
+                "recycled": self._stats["recycled_after_jobs"] + self._stats["recycled_for_rss"],
+                **self._stats,
+            }
+
+    def close(self):
+        """Stop all workers"""
+        with self._idle:
+            self._closed = True
+            self._idle.notify_all()
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                if not worker.busy:
+                    worker.conn.send(("stop",))
+            except OSError:
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
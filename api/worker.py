@@ -0,0 +1,305 @@
+"""
+Standalone generation worker.
+
+Claims jobs from the durable queue (api/services/job_queue.py) and runs the
+pipeline for them. Run as many of these as needed, on any machine that can
+reach the database and the shared storage directory:
+
+    python -m api.worker --concurrency 4
+
+With --pool-size N the pipeline runs in N pre-forked warm processes
+(api/services/worker_pool.py) instead of in this process's threads. With
+--async-jobs N up to N pipelines are multiplexed on one event loop
+(pipeline/async_runner.py), which suits the mostly I/O-bound jobs.
+
+The API process also starts an embedded worker unless EMBEDDED_WORKER=0.
+
+While a job runs, the slot polls the database for cancellation (see
+POST /api/documents/{id}/cancel) and aborts the pipeline, freeing the slot
+within a few seconds. Stages still running stop at their agents' next tool
+call; the job's lease is only released once they have exited.
+"""
+import argparse
+import functools
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import wait
+from api.database import SessionLocal, Document, init_db
+from api.services import job_queue
+from api.services.doc_generator import document_dir, generate_document
+from api.services.worker_pool import WorkerPool
+from pipeline import PipelineCancelled
+from pipeline.async_runner import AsyncPipelineRunner
+
+
+class Worker:
+    """Runs `concurrency` job slots, each claiming and executing one job at a time"""
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        db_session_maker=SessionLocal,
+        poll_interval: float = 2.0,
+        lease_seconds: int = job_queue.JOB_LEASE_SECONDS,
+        worker_id: str = None,
+        handler=generate_document,
+        pool: WorkerPool = None,
+        cancel_poll_interval: float = 2.0,
+        async_runner: AsyncPipelineRunner = None
+    ):
+        if pool is not None:
+            # One slot per pool process; the slot thread only does bookkeeping
+            concurrency = pool.size
+            handler = functools.partial(handler, runner=pool.run)
+        elif async_runner is not None:
+            # One slot per concurrent pipeline on the runner's event loop
+            concurrency = async_runner.max_concurrent_jobs
+            handler = functools.partial(handler, runner=async_runner.run)
+        self.pool = pool
+        self.async_runner = async_runner
+        self.concurrency = concurrency
+        self.db_session_maker = db_session_maker
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.handler = handler
+        self.cancel_poll_interval = cancel_poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the job slots in background threads"""
+        if self.pool:
+            self.pool.start()
+        if self.async_runner:
+            self.async_runner.start()
+        for slot in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._slot_loop,
+                name=f"git2doc-worker-{slot}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = None):
+        """Stop claiming new jobs and wait for the slots to finish"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self.pool:
+            self.pool.close()
+        if self.async_runner:
+            self.async_runner.close()
+
+    def run_forever(self):
+        """Start the slots and block until interrupted"""
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            print("Stopping worker...")
+        finally:
+            self.stop()
+
+    def _slot_loop(self):
+        slot_id = f"{self.worker_id}/{threading.current_thread().name}"
+        while not self._stop.is_set():
+            if not self.run_once(slot_id):
+                self._stop.wait(self.poll_interval)
+
+    def run_once(self, slot_id: str = None) -> bool:
+        """Claim and execute a single job. Returns False if the queue was empty."""
+        slot_id = slot_id or self.worker_id
+        db = self.db_session_maker()
+        try:
+            job = job_queue.claim_job(db, slot_id, self.lease_seconds)
+            if not job:
+                return False
+            job_id = job.id
+            doc = db.query(Document).filter(Document.id == job.document_id).first()
+            if not doc:
+                job_queue.fail_job(db, job_id, slot_id, "Document no longer exists")
+                return True
+            doc_id, repo_url, prompt = doc.id, doc.repo_url, doc.prompt or ""
+        finally:
+            db.close()
+
+        print(f"[{slot_id}] Running job {job_id} for document {doc_id}")
+        heartbeat_stop = threading.Event()
+        cancel_event = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job_id, slot_id, heartbeat_stop, cancel_event),
+            daemon=True
+        )
+        heartbeat.start()
+        cancelled = None
+        try:
+            self.handler(doc_id, repo_url, prompt, self.db_session_maker, cancel_event=cancel_event)
+            error = None
+        except PipelineCancelled as e:
+            cancelled = e
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+        if cancelled is not None:
+            # The job row is already cancelled (or deleted); free the slot now and the lease once the run has exited
+            print(f"[{slot_id}] Job {job_id} cancelled")
+            self._release_when_stopped(job_id, doc_id, slot_id, cancelled.abandoned)
+            return True
+
+        db = self.db_session_maker()
+        try:
+            if error is None:
+                job_queue.complete_job(db, job_id, slot_id)
+            else:
+                new_status = job_queue.fail_job(db, job_id, slot_id, error)
+                print(f"[{slot_id}] Job {job_id} failed ({error}); now {new_status}")
+        finally:
+            db.close()
+        self._remove_if_deleted(doc_id)
+        return True
+
+    def _heartbeat(self, job_id: int, slot_id: str, stop: threading.Event, cancel: threading.Event):
+        """
+        Watch for cancellation every cancel_poll_interval and extend the
+        job's lease every third of the lease period while it runs (a lost
+        lease cancels the run too)
+        """
+        last_extended = time.monotonic()
+        while not stop.wait(min(self.cancel_poll_interval, self.lease_seconds / 3)):
+            db = self.db_session_maker()
+            try:
+                if job_queue.is_cancelled(db, job_id):
+                    cancel.set()
+                    return
+                if time.monotonic() - last_extended < self.lease_seconds / 3:
+                    continue
+                if not job_queue.extend_lease(db, job_id, slot_id, self.lease_seconds):
+                    # Another worker may claim the job and run it in the same workspace; stop this attempt
+                    print(f"[{slot_id}] Lost lease on job {job_id}, stopping it")
+                    cancel.set()
+                    return
+                last_extended = time.monotonic()
+            finally:
+                db.close()
+
+
+    def _release_when_stopped(self, job_id: int, doc_id: int, slot_id: str, abandoned):
+        """
+        Release a cancelled job's lease once the stages its run abandoned have
+        exited, extending it meanwhile, and remove the files of a document
+        deleted in the meantime. Waits in the background unless they already have.
+        """
+        def release():
+            pending = set(abandoned)
+            while pending:
+                _, pending = wait(pending, timeout=self.lease_seconds / 3)
+                if pending:
+                    db = self.db_session_maker()
+                    try:
+                        job_queue.extend_lease(db, job_id, slot_id, self.lease_seconds)
+                    finally:
+                        db.close()
+            db = self.db_session_maker()
+            try:
+                job_queue.release_job(db, job_id, slot_id)
+            finally:
+                db.close()
+            self._remove_if_deleted(doc_id)
+
+        if all(future.done() for future in abandoned):
+            release()
+        else:
+            threading.Thread(target=release, name=f"git2doc-release-{job_id}", daemon=True).start()
+
+    def _remove_if_deleted(self, doc_id: int):
+        """Remove a document's files if it was deleted while its attempt ran (the API leaves them to us)"""
+        db = self.db_session_maker()
+        try:
+            deleted = db.query(Document.id).filter(Document.id == doc_id).first() is None
+        finally:
+            db.close()
+        if deleted:
+            shutil.rmtree(document_dir(doc_id), ignore_errors=True)
+
+
+def build_pool(size: int, recycle_after: int, recycle_rss_mb: float = None):
+    """Create a WorkerPool, or None when size is 0"""
+    if size <= 0:
+        return None
+    return WorkerPool(size=size, max_jobs_per_worker=recycle_after, max_rss_mb=recycle_rss_mb)
+
+
+def build_async_runner(max_concurrent_jobs: int):
+    """Create an AsyncPipelineRunner, or None when max_concurrent_jobs is 0"""
+    if max_concurrent_jobs <= 0:
+        return None
+    return AsyncPipelineRunner(max_concurrent_jobs=max_concurrent_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Git2Doc generation worker")
+    parser.add_argument(
+        "--concurrency", type=int,
+        default=int(os.getenv("WORKER_CONCURRENCY", "2")),
+        help="Number of jobs to run at once (default: $WORKER_CONCURRENCY or 2)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=2.0,
+        help="Seconds to wait between polls when the queue is empty"
+    )
+    parser.add_argument(
+        "--lease-seconds", type=int, default=job_queue.JOB_LEASE_SECONDS,
+        help="Visibility timeout for claimed jobs"
+    )
+    parser.add_argument("--worker-id", default=None, help="Identifier recorded on claimed jobs")
+    parser.add_argument(
+        "--pool-size", type=int,
+        default=int(os.getenv("WORKER_POOL_SIZE", "0")),
+        help="Run jobs in this many pre-forked warm processes (0 = threads in this process)"
+    )
+    parser.add_argument(
+        "--recycle-after", type=int,
+        default=int(os.getenv("WORKER_RECYCLE_JOBS", "50")),
+        help="Recycle a pool process after this many jobs"
+    )
+    parser.add_argument(
+        "--recycle-rss-mb", type=float,
+        default=float(os.getenv("WORKER_RECYCLE_RSS_MB", "0")) or None,
+        help="Recycle a pool process once its RSS exceeds this many MB"
+    )
+    parser.add_argument(
+        "--async-jobs", type=int,
+        default=int(os.getenv("WORKER_ASYNC_JOBS", "0")),
+        help="Run up to this many jobs on one event loop in this process (0 = one thread per job)"
+    )
+    args = parser.parse_args()
+    if args.pool_size and args.async_jobs:
+        parser.error("--pool-size and --async-jobs cannot be combined")
+
+    init_db()
+    worker = Worker(
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        lease_seconds=args.lease_seconds,
+        worker_id=args.worker_id,
+        pool=build_pool(args.pool_size, args.recycle_after, args.recycle_rss_mb),
+        async_runner=build_async_runner(args.async_jobs)
+    )
+    print(f"🚀 Git2Doc worker {worker.worker_id} started with concurrency {worker.concurrency}")
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Non-interactive batch CLI: document many repositories concurrently.
+
+The input file has one job per line, either
+
+    https://github.com/owner/repo  Optional question for this repository
+
+or a JSON object {"repo_url": "...", "question": "..."}. A local directory,
+bare git repository or file:// URL can stand in for the GitHub URL (no
+GitHub requests at all; see pipeline.local_repo). Blank lines and lines
+starting with '#' are ignored; jobs without a question use --question.
+
+With --per-package, every repository is treated as a monorepo: each
+directory with a package manifest is documented on its own, and an index
+document links them (see pipeline.monorepo). Repositories then run one at a
+time and --parallelism bounds the packages in flight, so no more than
+--parallelism pipelines share the GitHub and OpenRouter budgets.
+
+Every repository gets its own output directory under --output-dir. Jobs run
+on one event loop (or on threads with --mode threads) and share the HTTP
+connection pools of the process. Stage checkpoints are kept, so re-running
+the same batch skips work that already finished.
+
+    python batch.py repos.txt --parallelism 16 --output-dir out/
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from pipeline import parse_repo_url, run_pipeline
+from pipeline.async_runner import arun_pipeline
+from pipeline.monorepo import INDEX_PDF_FILE, run_packages
+from pipeline.modes import DEFAULT_MODE, MODES
+
+DEFAULT_QUESTION = "Generate comprehensive technical documentation for this repository."
+SUMMARY_FILE = "batch_summary.json"
+
+
+@dataclass
+class BatchEntry:
+    """One line of the batch file"""
+    repo_url: str
+    question: str
+    output_dir: Path
+
+
+@dataclass
+class BatchOutcome:
+    """Result of one batch job"""
+    repo_url: str
+    output_dir: str
+    ok: bool
+    seconds: float
+    pdf_file: Optional[str] = None
+    error: Optional[str] = None
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    resumed_stages: List[str] = field(default_factory=list)
+    within_target: Optional[bool] = None
+
+
+def read_batch_file(path, output_dir, default_question: str = DEFAULT_QUESTION) -> List[BatchEntry]:
+    """
+    Parse the batch file into entries with one output directory per repository.
+    Raises ValueError (with the line number) for an unparseable line.
+    """
+    entries = []
+    used_dirs = set()
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    item = json.loads(line)
+                    repo_url, question = item["repo_url"], item.get("question")
+                except (json.JSONDecodeError, KeyError) as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON entry ({e})")
+            else:
+                repo_url, *rest = line.split(None, 1)
+                question = rest[0] if rest else None
+            try:
+                repo_name = parse_repo_url(repo_url)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}")
+
+            # owner/repo -> owner__repo, with a suffix if a repo appears more than once
+            dir_name = base_name = repo_name.replace("/", "__")
+            suffix = 2
+            while dir_name in used_dirs:
+                dir_name = f"{base_name}-{suffix}"
+                suffix += 1
+            used_dirs.add(dir_name)
+
+            entries.append(BatchEntry(
+                repo_url=repo_url,
+                question=(question or "").strip() or default_question,
+                output_dir=Path(output_dir) / dir_name
+            ))
+    return entries
+
+
+def _outcome(entry: BatchEntry, started: float, result=None, error: Exception = None) -> BatchOutcome:
+    outcome = BatchOutcome(
+        repo_url=entry.repo_url,
+        output_dir=str(entry.output_dir),
+        ok=error is None,
+        seconds=time.perf_counter() - started
+    )
+    if error is not None:
+        outcome.error = f"{error.__class__.__name__}: {error}"
+    elif result is not None:
+        outcome.pdf_file = str(result.pdf_file)
+        outcome.stage_timings = result.stage_timings
+        outcome.resumed_stages = result.resumed_stages
+        outcome.within_target = result.within_target
+    return outcome
+
+
+def _progress(outcome: BatchOutcome, done: int, total: int):
+    status = "ok" if outcome.ok else f"FAILED ({outcome.error})"
+    print(f"[{done}/{total}] {outcome.repo_url} {status} in {outcome.seconds:.1f}s", file=sys.stderr)
+
+
+async def run_batch_async(
+    entries: List[BatchEntry],
+    parallelism: int,
+    resume: bool = True,
+    depth: str = DEFAULT_MODE
+) -> List[BatchOutcome]:
+    """Run every entry on the current event loop, at most `parallelism` at a time"""
+    semaphore = asyncio.Semaphore(parallelism)
+    outcomes = []
+
+    async def run_entry(entry: BatchEntry):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await arun_pipeline(
+                    entry.repo_url, entry.question, entry.output_dir, resume=resume, mode=depth
+                )
+                outcome = _outcome(entry, started, result)
+            except Exception as e:
+                outcome = _outcome(entry, started, error=e)
+        outcomes.append(outcome)
+        _progress(outcome, len(outcomes), len(entries))
+        return outcome
+
+    return list(await asyncio.gather(*(run_entry(entry) for entry in entries)))
+
+
+def run_batch_threads(
+    entries: List[BatchEntry],
+    parallelism: int,
+    resume: bool = True,
+    depth: str = DEFAULT_MODE,
+    per_package: bool = False
+) -> List[BatchOutcome]:
+    """
+    Run every entry with the synchronous pipeline on `parallelism` threads
+    (per_package: one entry at a time, each documenting its packages
+    `parallelism` at a time, so at most `parallelism` pipelines run at once)
+    """
+    done = []
+
+    def run_entry(entry: BatchEntry):
+        started = time.perf_counter()
+        try:
+            if per_package:
+                packages = run_packages(entry.repo_url, entry.question, entry.output_dir, depth, parallelism, resume)
+                failed = [package.path for package in packages if package.result is None]
+                if len(failed) == len(packages):
+                    raise RuntimeError(f"every package failed: {', '.join(failed)}")
+                outcome = _outcome(entry, started)
+                outcome.pdf_file = str(entry.output_dir.absolute() / INDEX_PDF_FILE)
+            else:
+                result = run_pipeline(entry.repo_url, entry.question, entry.output_dir, resume=resume, mode=depth)
+                outcome = _outcome(entry, started, result)
+        except Exception as e:
+            outcome = _outcome(entry, started, error=e)
+        done.append(outcome)
+        _progress(outcome, len(done), len(entries))
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=1 if per_package else parallelism, thread_name_prefix="git2doc-batch") as pool:
+        return list(pool.map(run_entry, entries))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(outcomes: List[BatchOutcome], wall_seconds: float) -> dict:
+    """Throughput, latency percentiles and mean stage timings of a batch"""
+    latencies = [o.seconds for o in outcomes if o.ok]
+    stage_totals: Dict[str, List[float]] = {}
+    for outcome in outcomes:
+        for stage, seconds in outcome.stage_timings.items():
+            stage_totals.setdefault(stage, []).append(seconds)
+
+    return {
+        "jobs": len(outcomes),
+        "succeeded": len(latencies),
+        "failed": len(outcomes) - len(latencies),
+        "within_target": sum(1 for o in outcomes if o.within_target),
+        "wall_seconds": round(wall_seconds, 2),
+        "jobs_per_hour": round(len(latencies) / wall_seconds * 3600, 1) if wall_seconds else 0.0,
+        "latency_seconds": {
+            "p50": round(statistics.median(latencies), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "max": round(max(latencies), 2),
+        } if latencies else None,
+        "mean_stage_seconds": {
+            stage: round(statistics.mean(values), 2) for stage, values in sorted(stage_totals.items())
+        },
+    }
+
+
+def print_summary(summary: dict, outcomes: List[BatchOutcome]):
+    print("=" * 60)
+    print(f"Batch finished: {summary['succeeded']}/{summary['jobs']} succeeded in {summary['wall_seconds']:.1f}s")
+    print(f"Throughput: {summary['jobs_per_hour']} repositories/hour")
+    if summary["latency_seconds"]:
+        latency = summary["latency_seconds"]
+        print(f"Latency: p50 {latency['p50']}s, p95 {latency['p95']}s, max {latency['max']}s")
+        print(f"Within the mode's latency target: {summary['within_target']}/{summary['succeeded']}")
+    if summary["mean_stage_seconds"]:
+        stages = ", ".join(f"{stage} {seconds}s" for stage, seconds in summary["mean_stage_seconds"].items())
+        print(f"Mean stage time: {stages}")
+    for outcome in outcomes:
+        if not outcome.ok:
+            print(f"  FAILED {outcome.repo_url}: {outcome.error}")
+    print("=" * 60)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Document many GitHub repositories in one run")
+    parser.add_argument("batch_file", help="File with one repository URL (and optional question) per line")
+    parser.add_argument("--output-dir", default="batch_output", help="Directory that receives one folder per repository")
+    parser.add_argument(
+        "--parallelism", type=int, default=8,
+        help="Repositories processed at the same time (packages of one repository, with --per-package)"
+    )
+    parser.add_argument("--question", default=DEFAULT_QUESTION, help="Question for entries that do not have one")
+    parser.add_argument(
+        "--mode", choices=["async", "threads"], default="async",
+        help="Run jobs on one event loop (async) or one thread per job (threads)"
+    )
+    parser.add_argument(
+        "--depth", choices=list(MODES), default=DEFAULT_MODE,
+        help="Depth mode: files read, models and diagram (see pipeline/modes.py)"
+    )
+    parser.add_argument(
+        "--per-package", action="store_true",
+        help="Document each package of a monorepo separately, plus an index "
+             "(runs on threads, one repository at a time)"
+    )
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints from earlier runs")
+    parser.add_argument("--quiet", action="store_true", help="Hide per-stage pipeline output")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    try:
+        entries = read_batch_file(args.batch_file, args.output_dir, args.question)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+    if not entries:
+        print("Error: the batch file contains no repositories")
+        return 2
+
+    print(
+        f"Documenting {len(entries)} repositories with parallelism {args.parallelism} "
+        f"({args.mode}, {args.depth} mode)"
+    )
+    resume = not args.no_resume
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) if args.quiet else contextlib.nullcontext():
+        if args.mode == "async" and not args.per_package:
+            outcomes = asyncio.run(run_batch_async(entries, args.parallelism, resume, args.depth))
+        else:
+            outcomes = run_batch_threads(entries, args.parallelism, resume, args.depth, args.per_package)
+    summary = summarize(outcomes, time.perf_counter() - started)
+
+    print_summary(summary, outcomes)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / SUMMARY_FILE, "w") as f:
+        json.dump({**summary, "outcomes": [asdict(o) for o in outcomes]}, f, indent=2)
+    print(f"Summary saved to {output_dir / SUMMARY_FILE}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Benchmark: jobs per worker process, synchronous vs async pipeline.
+
+The LLM and GitHub round-trips are simulated with a fixed latency (no API
+keys or network needed); Graphviz is replaced by a tiny PNG, but the PDF is
+rendered for real. Each mode runs the same number of jobs in this process:
+
+- sync:  run_pipeline on a thread pool, one thread per concurrent job
+         (what `python -m api.worker --concurrency N` does)
+- async: arun_pipeline on one event loop, bounded by a semaphore
+         (what `python -m api.worker --async-jobs N` does)
+
+Usage:
+    python benchmark_async.py --jobs 64 --latency 1.0 --sync-threads 4 --async-jobs 64
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+from PIL import Image
+
+from pipeline import agents, planner, run_pipeline, runner, snapshot, snapshot_cache
+from pipeline.async_runner import AsyncPipelineRunner
+
+WORKFLOW_JSON = '{"meta": {"title": "Bench", "layout": "LR"}, "node_types": {}, "nodes": [], "edges": []}'
+
+
+class SimulatedAgent:
+    """Answers after `latency` seconds, blocking in run() and yielding in arun()"""
+
+    def __init__(self, content: str, latency: float):
+        self.content = content
+        self.latency = latency
+
+    def run(self, prompt):
+        time.sleep(self.latency)
+        return SimpleNamespace(content=self.content)
+
+    async def arun(self, prompt):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=self.content)
+
+
+def install_simulation(latency: float):
+    """Swap the agent builders, the planner, snapshots and the diagram renderer for offline stand-ins"""
+    document = "# Docs\n\n" + agents.WORKFLOW_DIAGRAM_PLACEHOLDER + "\n\n## Architecture\n\n" + "Text. " * 400
+    agents.build_analysis_agent = lambda repo_name, use_async=False, **kwargs: SimulatedAgent("analysis", latency)
+    agents.build_documenter = lambda analysis, use_async=False, **kwargs: SimulatedAgent(document, latency)
+    agents.build_workflow_agent = lambda use_async=False, **kwargs: SimulatedAgent(WORKFLOW_JSON, latency)
+
+    def render(input_file, output_file, timeout=30):
+        Image.new("RGB", (40, 20), "white").save(output_file)
+        return str(output_file)
+
+    runner.render_workflow_diagram = render
+    planner.fetch_profile = lambda repo_name, client=None: planner.RepoProfile(repo_name, 100, {"Python": 1000}, [])
+    snapshot.download_snapshot = lambda repo_name, dest, ref=None, client=None: snapshot.RepoSnapshot(dest, repo_name)
+    snapshot_cache.SNAPSHOT_CACHE_MAX_BYTES = 0
+
+
+class ThreadSampler:
+    """Records the peak number of live threads while active"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def bench_sync(jobs: int, threads: int, root: Path):
+    def job(i):
+        return timed(run_pipeline, f"https://github.com/bench/repo{i}", "q", root / f"sync-{i}")
+
+    with ThreadSampler() as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(job, range(jobs)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies, sampler.peak
+
+
+def bench_async(jobs: int, concurrency: int, root: Path):
+    async_runner = AsyncPipelineRunner(max_concurrent_jobs=concurrency)
+    async_runner.start()
+    try:
+        with ThreadSampler() as sampler:
+            started = time.perf_counter()
+            submitted = []
+            for i in range(jobs):
+                submitted.append((time.perf_counter(), async_runner.submit(
+                    f"https://github.com/bench/repo{i}", "q", root / f"async-{i}"
+                )))
+            latencies = []
+            for submitted_at, future in submitted:
+                future.result()
+                latencies.append(time.perf_counter() - submitted_at)
+            elapsed = time.perf_counter() - started
+    finally:
+        async_runner.close()
+    return elapsed, latencies, sampler.peak
+
+
+def report(name: str, jobs: int, elapsed: float, latencies, peak_threads: int):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{name:<24} {jobs / elapsed:>9.2f} {elapsed:>9.1f} "
+        f"{statistics.median(latencies):>9.2f} {p95:>9.2f} {peak_threads:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async pipeline throughput per process")
+    parser.add_argument("--jobs", type=int, default=64, help="Jobs per mode")
+    parser.add_argument("--latency", type=float, default=1.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--sync-threads", type=int, default=4, help="Concurrent jobs on the sync path")
+    parser.add_argument("--async-jobs", type=int, default=64, help="Concurrent jobs on the event loop")
+    args = parser.parse_args()
+
+    install_simulation(args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"{args.jobs} jobs, {args.latency:g}s per LLM call (analysis, then documentation + workflow in parallel)")
+        print(f"{'mode':<24} {'jobs/s':>9} {'wall s':>9} {'p50 s':>9} {'p95 s':>9} {'threads':>8}")
+        # The pipeline's progress output would drown the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync = bench_sync(args.jobs, args.sync_threads, root)
+        report(f"sync ({args.sync_threads} threads)", args.jobs, *sync)
+        with contextlib.redirect_stdout(io.StringIO()):
+            async_ = bench_async(args.jobs, args.async_jobs, root)
+        report(f"async ({args.async_jobs} on 1 loop)", args.jobs, *async_)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Shared pytest fixtures: fake agents so pipeline tests never call an LLM"""
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pipeline import agents
+
+# test_github_tools.py is a manual smoke script that needs a real GitHub token
+collect_ignore = ["test_github_tools.py"]
+
+
+class FakeAgent:
+    """Stands in for agno.Agent; run()/arun() return a canned response after an optional delay"""
+
+    def __init__(self, respond, delay=0.0, calls=None):
+        self.respond = respond
+        self.delay = delay
+        self.calls = calls
+
+    def run(self, prompt):
+        if self.calls is not None:
+            self.calls.append(prompt)
+        if self.delay:
+            time.sleep(self.delay)
+        return SimpleNamespace(content=self.respond(prompt))
+
+    async def arun(self, prompt):
+        if self.calls is not None:
+            self.calls.append(prompt)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=self.respond(prompt))
+
+
+def fake_workflow_json(title):
+    return json.dumps({
+        "meta": {"title": title, "layout": "LR"},
+        "node_types": {"core": {"color": "#2e8b57", "shape": "box"}},
+        "nodes": [{"id": "a", "label": "A", "type": "core", "layer": 1}],
+        "edges": [],
+    })
+
+
+@pytest.fixture
+def fake_agents(monkeypatch):
+    """
+    Replace the agent builders with fakes.
+    The analysis names the repository, and the documentation and workflow
+    outputs echo it, so tests can tell which job produced which artifact.
+    Returns a dict with the recorded LLM calls and a settable delay.
+    """
+    state = {"calls": [], "delay": 0.0, "lock": threading.Lock()}
+
+    def record(kind):
+        def _record(prompt):
+            with state["lock"]:
+                state["calls"].append(kind)
+        return _record
+
+    def analysis_agent(repo_name, use_async=False, **kwargs):
+        def respond(prompt):
+            record("analyze")(prompt)
+            return f"ANALYSIS OF {repo_name}"
+        return FakeAgent(respond, state["delay"])
+
+    def documenter(analysis, use_async=False, **kwargs):
+        def respond(prompt):
+            record("document")(prompt)
+            return (
+                f"```markdown\n# Docs\n\nGenerated from {analysis}\n\n"
+                f"{agents.WORKFLOW_DIAGRAM_PLACEHOLDER}\n\n## Architecture\n\n- item\n```"
+            )
+        return FakeAgent(respond, state["delay"])
+
+    def workflow_agent(use_async=False, **kwargs):
+        def respond(prompt):
+            record("workflow")(prompt)
+            return fake_workflow_json(prompt.split("REPOSITORY ANALYSIS:")[-1].strip().splitlines()[0])
+        return FakeAgent(respond, state["delay"])
+
+    monkeypatch.setattr(agents, "build_analysis_agent", analysis_agent)
+    monkeypatch.setattr(agents, "build_documenter", documenter)
+    monkeypatch.setattr(agents, "build_workflow_agent", workflow_agent)
+    return state
+
+
+@pytest.fixture
+def fake_diagram(monkeypatch):
+    """Render diagrams with Pillow instead of the Graphviz 'dot' binary"""
+    from PIL import Image
+    from pipeline import runner
+
+    def render(input_file, output_file, timeout=30):
+        Image.new("RGB", (40, 20), "white").save(output_file)
+        return str(output_file)
+
+    monkeypatch.setattr(runner, "render_workflow_diagram", render)
+
+
+@pytest.fixture(autouse=True)
+def no_drafts(monkeypatch):
+    """Draft generation calls the GitHub API; tests that need it re-enable it"""
+    from api.services import doc_generator
+
+    monkeypatch.setattr(doc_generator, "DRAFT_ENABLED", False)
+
+
+@pytest.fixture(autouse=True)
+def offline_planner(monkeypatch):
+    """Profile every repository as a small one instead of asking the GitHub API"""
+    from pipeline import planner
+
+    def fetch_profile(repo_name, client=None):
+        return planner.RepoProfile(repo_name=repo_name, size_kb=100, languages={"Python": 1000}, directories=[])
+
+    monkeypatch.setattr(planner, "fetch_profile", fetch_profile)
+    monkeypatch.setattr(planner, "fetch_tree_profile", lambda repo_name, subpath, ref=None, client=None: fetch_profile(repo_name))
+
+
+@pytest.fixture(autouse=True)
+def offline_snapshot(monkeypatch, tmp_path_factory):
+    """Snapshots are empty directories instead of GitHub tarball downloads, cached per test"""
+    from pipeline import snapshot, snapshot_cache
+
+    def download_snapshot(repo_name, dest, ref=None, client=None):
+        dest.mkdir(parents=True, exist_ok=True)
+        return snapshot.RepoSnapshot(root=dest, repo_name=repo_name, sha="0000000")
+
+    monkeypatch.setattr(snapshot, "download_snapshot", download_snapshot)
+    monkeypatch.setattr(snapshot, "resolve_commit_sha", lambda repo_name, ref=None, client=None: "0" * 40)
+    monkeypatch.setattr(snapshot_cache, "_cache", snapshot_cache.SnapshotCache(tmp_path_factory.mktemp("snapshots")))
@@ -30,6 +30,10 @@ def generate_pdf(input_file="content.txt", output_file="simple_document.pdf"):
     with open(input_file, "r", encoding="utf-8") as f:
         text = f.read()
 
+    # Relative image paths in the text are resolved against this directory
+    import os
+    input_dir = os.path.dirname(os.path.abspath(input_file))
+
     # Helper variables for manual layout
     x = base_indent
     y = margin
@@ -318,9 +322,9 @@ def generate_pdf(input_file="content.txt", output_file="simple_document.pdf"):
         try:
             import os
             if not os.path.exists(image_path):
-                # Try relative path from the current directory
+                # Resolve relative paths against the input file's directory (the job workspace)
                 if not os.path.isabs(image_path):
-                    image_path = os.path.join(os.getcwd(), image_path)
+                    image_path = os.path.join(input_dir, image_path)
                 
                 if not os.path.exists(image_path):
                     print(f"Warning: Image not found: {image_path}")
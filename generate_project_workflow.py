@@ -2,10 +2,16 @@
 """
 Helper script to generate workflow diagrams from project_workflow.json
 This is a modified version of workflow.py that uses project_workflow.json instead of workflow.json
+
+render_workflow_diagram() takes explicit input/output paths so each job can
+render into its own workspace; running the script keeps the old behaviour of
+reading and writing in the current directory.
 """
 
 import json
 import os
+import subprocess
+from pathlib import Path
 from graphviz import Digraph
 from collections import defaultdict
 
@@ -21,105 +27,148 @@ if "Graphviz" not in os.environ["PATH"]:
             os.environ["PATH"] += ";" + p
             break
 
-# ---------- 1. Load structured input ----------
-input_file = "project_workflow.json"
-
-if not os.path.exists(input_file):
-    print(f"Error: {input_file} not found!")
-    print("Please run main.py first to generate the workflow JSON.")
-    exit(1)
-
-with open(input_file, "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-meta = data["meta"]
-node_types = data["node_types"]
-nodes = data["nodes"]
-edges = data["edges"]
-
-# ---------- 2. Create graph ----------
-# Calculate dynamic size based on number of nodes and layers
-num_nodes = len(nodes)
-num_layers = len(set(node["layer"] for node in nodes))
-
-# Dynamic height calculation: base height + additional height per layer
-base_height = 10  # Increased from 8
-height_per_layer = 4  # Increased from 3
-calculated_height = base_height + (num_layers * height_per_layer)
-
-# Dynamic width calculation: base width + additional width based on nodes
-base_width = 16  # Increased from 12
-width_factor = max(1, num_nodes / 10)
-calculated_width = base_width + (width_factor * 3)  # Increased multiplier
-
-dot = Digraph(
-    name="ProjectWorkflow",
-    format="png"
-)
-
-# Set global graph attributes with enhanced quality and dynamic sizing
-dot.attr(
-    rankdir=meta.get("layout", "LR"),  # Left-to-right layout by default
-    labelloc="t",
-    fontsize="28",  # Larger title font
-    fontname="Arial Bold",
-    label=meta.get("title", "Project Workflow Diagram"),
-    compound="true",
-    # High-quality rendering settings
-    dpi="300",  # High DPI for crisp, clear output
-    size=f"{calculated_width},{calculated_height}!",  # Dynamic size with ! to force it
-    ratio="auto",
-    # Better spacing for cleaner appearance
-    nodesep="2.5",  # Increased horizontal spacing between nodes
-    ranksep="3.0",  # Increased vertical spacing between ranks/layers
-    # Visual enhancements
-    bgcolor="white",
-    splines="curved",  # Curved edges for smoother, more professional look
-    concentrate="false"  # Don't merge edges
-)
-
-# ---------- 3. Group nodes by layer ----------
-layers = defaultdict(list)
-for node in nodes:
-    layers[node["layer"]].append(node)
-
-# ---------- 4. Draw nodes layer by layer ----------
-for layer in sorted(layers.keys()):
-    with dot.subgraph(name=f"cluster_layer_{layer}") as c:
-        # Crucial: Set label to empty string to prevent inheriting the main title
-        # and ensure rank="same" keeps them aligned horizontally
-        c.attr(rank="same", label="", style="invis") 
-
-        for node in layers[layer]:
-            node_style = node_types.get(node["type"], {})
-            c.node(
-                node["id"],
-                node["label"],
-                style="filled,rounded",
-                shape=node_style.get("shape", "box"),
-                fillcolor=node_style.get("color", "lightgray"),
-                fontname="Arial Bold",  # Bold font for better visibility
-                fontsize="20",  # Larger font for better readability (increased from 16)
-                fontcolor="white" if node["type"] in ["external", "output"] else "black",
-                penwidth="3.0",  # Thicker borders (increased from 2.5)
-                margin="0.6,0.4",  # More padding inside nodes
-                height="1.0",  # Taller nodes (increased from 0.8)
-                width="3.2"  # Wider nodes (increased from 2.5)
-            )
-
-# ---------- 5. Draw edges ----------
-node_ids = {n["id"] for n in nodes}
-
-for edge in edges:
-    src = edge["from"]
-    dst = edge["to"]
-
-    if src in node_ids and dst in node_ids:
-        dot.edge(src, dst)
-
-# ---------- 6. Render ----------
-try:
-    output_path = dot.render("project_workflow_diagram")
-    print(f"Successfully generated: {output_path}")
-except Exception as e:
-    print(f"Error generating diagram: {e}")
+# Default file names used when run as a script
+DEFAULT_INPUT_FILE = "project_workflow.json"
+DEFAULT_OUTPUT_FILE = "project_workflow_diagram.png"
+
+
+def build_workflow_graph(data: dict) -> Digraph:
+    """Build the Graphviz graph for a workflow JSON document"""
+    meta = data["meta"]
+    node_types = data["node_types"]
+    nodes = data["nodes"]
+    edges = data["edges"]
+
+    # ---------- 2. Create graph ----------
+    # Calculate dynamic size based on number of nodes and layers
+    num_nodes = len(nodes)
+    num_layers = len(set(node["layer"] for node in nodes))
+
+    # Dynamic height calculation: base height + additional height per layer
+    base_height = 10  # Increased from 8
+    height_per_layer = 4  # Increased from 3
+    calculated_height = base_height + (num_layers * height_per_layer)
+
+    # Dynamic width calculation: base width + additional width based on nodes
+    base_width = 16  # Increased from 12
+    width_factor = max(1, num_nodes / 10)
+    calculated_width = base_width + (width_factor * 3)  # Increased multiplier
+
+    dot = Digraph(
+        name="ProjectWorkflow",
+        format="png"
+    )
+
+    # Set global graph attributes with enhanced quality and dynamic sizing
+    dot.attr(
+        rankdir=meta.get("layout", "LR"),  # Left-to-right layout by default
+        labelloc="t",
+        fontsize="28",  # Larger title font
+        fontname="Arial Bold",
+        label=meta.get("title", "Project Workflow Diagram"),
+        compound="true",
+        # High-quality rendering settings
+        dpi="300",  # High DPI for crisp, clear output
+        size=f"{calculated_width},{calculated_height}!",  # Dynamic size with ! to force it
+        ratio="auto",
+        # Better spacing for cleaner appearance
+        nodesep="2.5",  # Increased horizontal spacing between nodes
+        ranksep="3.0",  # Increased vertical spacing between ranks/layers
+        # Visual enhancements
+        bgcolor="white",
+        splines="curved",  # Curved edges for smoother, more professional look
+        concentrate="false"  # Don't merge edges
+    )
+
+    # ---------- 3. Group nodes by layer ----------
+    layers = defaultdict(list)
+    for node in nodes:
+        layers[node["layer"]].append(node)
+
+    # ---------- 4. Draw nodes layer by layer ----------
+    for layer in sorted(layers.keys()):
+        with dot.subgraph(name=f"cluster_layer_{layer}") as c:
+            # Crucial: Set label to empty string to prevent inheriting the main title
+            # and ensure rank="same" keeps them aligned horizontally
+            c.attr(rank="same", label="", style="invis") 
+
+            for node in layers[layer]:
+                node_style = node_types.get(node["type"], {})
+                c.node(
+                    node["id"],
+                    node["label"],
+                    style="filled,rounded",
+                    shape=node_style.get("shape", "box"),
+                    fillcolor=node_style.get("color", "lightgray"),
+                    fontname="Arial Bold",  # Bold font for better visibility
+                    fontsize="20",  # Larger font for better readability (increased from 16)
+                    fontcolor="white" if node["type"] in ["external", "output"] else "black",
+                    penwidth="3.0",  # Thicker borders (increased from 2.5)
+                    margin="0.6,0.4",  # More padding inside nodes
+                    height="1.0",  # Taller nodes (increased from 0.8)
+                    width="3.2"  # Wider nodes (increased from 2.5)
+                )
+
+    # ---------- 5. Draw edges ----------
+    node_ids = {n["id"] for n in nodes}
+
+    for edge in edges:
+        src = edge["from"]
+        dst = edge["to"]
+
+        if src in node_ids and dst in node_ids:
+            dot.edge(src, dst)
+
+    return dot
+
+
+def render_workflow_diagram(input_file, output_file, timeout: float = 30) -> str:
+    """
+    Render a workflow JSON file to a PNG diagram.
+
+    Args:
+        input_file: Path to the workflow JSON
+        output_file: Path of the PNG to write
+        timeout: Seconds to allow the Graphviz 'dot' process
+
+    Returns:
+        Path of the rendered PNG
+
+    Raises:
+        FileNotFoundError: If the input file or the 'dot' executable is missing
+        subprocess.TimeoutExpired: If rendering takes longer than timeout
+        RuntimeError: If 'dot' exits with an error
+    """
+    # ---------- 1. Load structured input ----------
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    dot = build_workflow_graph(data)
+
+    # ---------- 6. Render ----------
+    # Pipe the source straight to 'dot' so nothing is written outside output_file
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    result = subprocess.run(
+        ["dot", "-Tpng", "-o", str(output_file)],
+        input=dot.source,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"dot failed: {result.stderr.strip()}")
+    return str(output_file)
+
+
+if __name__ == "__main__":
+    if not os.path.exists(DEFAULT_INPUT_FILE):
+        print(f"Error: {DEFAULT_INPUT_FILE} not found!")
+        print("Please run main.py first to generate the workflow JSON.")
+        exit(1)
+
+    try:
+        output_path = render_workflow_diagram(DEFAULT_INPUT_FILE, DEFAULT_OUTPUT_FILE)
+        print(f"Successfully generated: {output_path}")
+    except Exception as e:
+        print(f"Error generating diagram: {e}")
@@ -0,0 +1,9 @@
+"""Importable Git2Doc documentation pipeline"""
+from pipeline.dag import PipelineCancelled
+from pipeline.runner import PipelineResult, parse_github_url, parse_repo_url, parse_tree_path, run_pipeline
+from pipeline.monorepo import run_packages
+
+__all__ = [
+    "PipelineCancelled", "PipelineResult", "parse_github_url", "parse_repo_url", "parse_tree_path",
+    "run_packages", "run_pipeline",
+]
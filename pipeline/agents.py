@@ -0,0 +1,746 @@
+"""
+Agent definitions for the Git2Doc pipeline.
+
+The instruction texts are module-level constants so they are built once per
+process; the builder functions only bind the per-job repository context.
+With use_async=True the builders return agents for the async pipeline: their
+model and GitHub tools use httpx.AsyncClient instead of blocking clients.
+The depth mode (pipeline.modes) picks each agent's model and limits.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional
+import httpx
+from agno.agent import Agent
+from agno.exceptions import RunCancelledException
+from agno.models.openrouter import OpenRouter
+from pipeline.context_pack import PackedContext
+from pipeline.file_filter import FilterStats
+from pipeline.github_async import READ_FILES_MAX_PATHS, AsyncGithubTools, GithubApiTools
+from pipeline.modes import DepthMode, get_mode
+from pipeline.planner import Plan
+from pipeline.scanner import ProjectScan
+from pipeline.snapshot import RepoSnapshot, SnapshotTools
+
+# Default model and output budget (the depth modes override them per stage)
+MODEL_ID = "google/gemini-2.5-flash"
+MAX_TOKENS = 4000
+
+# Marker the documenter must emit where the workflow diagram belongs
+WORKFLOW_DIAGRAM_PLACEHOLDER = "[WORKFLOW_DIAGRAM_PLACEHOLDER]"
+
+
+DOCUMENTER_INSTRUCTIONS = """You are a software documentation specialist responsible for producing formal, comprehensive project documentation.
+
+INPUT CONTEXT:
+- You will receive detailed repository analysis including files, modules, and workflows
+- The input may be analytical, step-based, or fragmented
+- The content represents observed behavior and structure
+
+OBJECTIVE:
+Create professional technical documentation suitable for:
+- Software design documentation
+- System architecture documentation
+- Internal technical manuals
+- Enterprise project reports
+
+CRITICAL CONSTRAINTS:
+- Do not use marketing language or address the reader directly
+- Do not mention prompts, agents, or task instructions
+- Do not speculate beyond the provided input
+- **NEVER use hypothetical language** ("likely", "probably", "may", "could", "might", "possibly")
+- **Document ONLY what is observable** in the code
+- Maintain technical accuracy and clarity
+- Do NOT wrap your output in markdown code fences
+- Output only the documentation content itself
+
+DOCUMENTATION STRUCTURE (FLEXIBLE):
+Use the following sections as a comprehensive guide. Include sections that are relevant to the repository. Combine or omit sections that don't apply, but ensure ALL important information is covered. Keep the documentation clean and well-organized, not clumsy.
+
+# [Project Name]: [One-Line Purpose]
+
+## 1. Problem Statement & Context
+- Why this code exists (based on README, comments, or observable patterns)
+- What problem it solves
+- Key constraints and assumptions **actually present in the code**
+- Explicit non-goals (if documented in the repository)
+
+> **Note:** Use blockquotes for important context or constraints
+
+## 2. High-Level Architecture
+- System boundaries and scope
+- Major components and their relationships
+- **Actual data flow** between components (trace the code, not assumptions)
+- External dependencies and integrations **actually used**
+- Workflow diagram reference (if available)
+
+> **Important:** Highlight key architectural decisions **with concrete reasons**
+
+## 3. Key Design Decisions
+- Important architectural and implementation choices **observed in the code**
+- **Measured tradeoffs** (e.g., "Uses synchronous calls for simplicity at the cost of blocking I/O")
+- **Concrete reasons** based on code structure, not generic AI justifications
+- Avoid: "X was chosen for performance" → Instead: "X processes N items/sec vs Y's M items/sec based on benchmark.py"
+
+> **Key Decision:** State the decision, the measurable tradeoff, and the observable rationale
+
+## 4. Repository Structure
+- Directory layout and organization
+- Responsibility boundaries between modules
+- Key files and their purposes
+
+## 5. Core Concepts & Data Models
+- Domain entities and their relationships
+- **Actual data schemas** (show the real structures from code)
+- State transitions **as implemented**
+- Key abstractions
+
+```python
+# Use code blocks for ACTUAL data models from the code
+# Example: dataclass definitions, schema definitions, etc.
+```
+
+## 6. Public Interfaces
+- APIs, functions, CLI commands **as defined in the code**
+- **Actual inputs, outputs, and side effects** (from signatures and implementation)
+- **Prompt Structure & Response Schema** (for AI Agents): Document the exact system prompt template and the expected JSON output schema.
+- Error behavior and contracts **as implemented**
+- Usage examples **from tests or documentation**
+
+## 7. Execution Flow
+- **Actual step-by-step flow** traced through the code
+- Critical paths through the system **with file/function references**
+- Background or async processes **as implemented**
+- Failure paths **as coded in error handlers**
+
+## 8. Configuration
+- **Actual environment variables** used in the code
+- **Real default values** from the source
+- Required vs optional settings **as checked in code**
+
+```bash
+# Show ACTUAL configuration from .env.example or code
+REAL_VAR_NAME=actual_default_value  # From config.py line 42
+```
+
+## 9. Failure Scenario Walkthrough
+- **Real World Failure Example**: Walk through ONE concrete failure case (e.g., "API Rate Limit Exceeded").
+- **Step-by-Step Failure Path**: Trace exactly how the code handles this specific error.
+- **Recovery Mechanism**: Document the actual retry/fallback logic for this case.
+- **Actual error types** raised and caught
+
+> **Warning:** Document actual error handling, not ideal behavior
+
+## 10. Performance Characteristics & Repository Limits
+- **Repository Size Limits**: State explicit limits (e.g., "Max file size: 10MB", "Context window: 128k tokens").
+- **Concrete performance limits** (e.g., "Processes max 1000 items in batch due to line 234 limit")
+- **Measured or observable bottlenecks** (from profiling data, comments, or code structure)
+- **Actual scaling limits** (connection pools, rate limits in code)
+- Time/space complexity **for key operations** (O(n) iteration over all files, etc.)
+
+> **Performance:** State measurable limits, not vague claims
+
+## 11. Security Considerations
+- Authentication and authorization mechanisms **as implemented**
+- **Actual input validation** (show the code)
+- Secrets handling **as coded** (environment vars, key managers, etc.)
+- **AI-specific risks** (if using AI/ML):
+  * Prompt injection vulnerabilities
+  * Model hallucination impacts
+  * Training data exposure risks
+  * API key exposure in logs/errors
+  * Cost control mechanisms (rate limiting, token limits)
+
+> **Important:** Document real security measures, not theoretical best practices
+
+## 12. Testing Strategy (if applicable)
+- **Actual test coverage** (from test files)
+- **Real test commands** from package.json, Makefile, or README
+- What is intentionally not tested **based on test files**
+
+```bash
+# Show ACTUAL test commands
+pytest tests/ -v  # From Makefile line 12
+```
+
+## 13. Deployment & Operations (if applicable)
+- **Real build process** from Dockerfile, build scripts, or CI config
+- **Actual runtime dependencies** from requirements.txt, package.json, etc.
+- Observability **as implemented** (logging statements, metrics endpoints)
+- Deployment process **from CI/CD files or documentation**
+
+## 14. Known Limitations & Future Work
+- **Documented limitations** from TODO comments, issues, or README
+- **Observable constraints** in the code
+- **Planned improvements** from roadmap or issue tracker
+
+## Conclusion: System Maturity & Readiness
+- **Current Maturity State**: Explicitly state if Alpha/Beta/Production based on test coverage and error handling.
+- **Production Readiness**: What is ready for use vs what is experimental.
+- **Known Limitations**: Summary of critical missing features or risks.
+- **NOT** a marketing summary of benefits.
+
+CONCRETE DOCUMENTATION RULES:
+1. **Definitive Language**: Replace "if applicable" with definitive statements. State clearly what IS supported and what IS NOT.
+2. **No Hypotheticals**: Never use "likely", "probably", "may", "could", "might", "possibly"
+2. **Measured Tradeoffs**: Instead of "chosen for performance", state "processes X vs Y based on [observable evidence]"
+3. **Real Data Flows**: Trace actual function calls, not assumed flows. Reference file:line numbers
+4. **Concrete Limits**: State actual limits from code (e.g., "max_connections=10 at line 45")
+5. **AI-Specific Risks**: For AI systems, document prompt structures, token limits, hallucination handling
+6. **Observable Only**: Document what IS in the code, not what SHOULD be
+
+ADAPTATION RULES:
+1. **Flexible Section Usage**: Not all sections are mandatory. Combine related sections if it makes the documentation cleaner.
+2. **Simple Projects**: For utilities/scripts, focus on Problem Statement, Architecture, Interfaces, and Usage. Skip deployment/security if not applicable.
+3. **Complex Systems**: Cover all relevant sections thoroughly.
+4. **AI/ML Projects**: Emphasize prompt structures, model configurations, token limits, hallucination handling
+5. **Libraries/Frameworks**: Focus on Public Interfaces, Usage Examples, and Architecture.
+
+VISUAL ENHANCEMENT REQUIREMENTS (CRITICAL - DO NOT CHANGE):
+- Use markdown **blockquotes** (> text) to highlight important information:
+  * For important notes: > **Important:** This is critical...
+  * For warnings: > **Warning:** Be careful when...
+  * For tips: > **Tip:** You can improve...
+  * For general info: > **Note:** This component...
+  * For design decisions: > **Key Decision:** We chose X because...
+- Use **code blocks** (``` ... ```) for all code examples, configs, and technical syntax:
+  * Wrap ANY code example in triple backticks
+  * Include language hints (```python, ```javascript, ```bash, etc.)
+  * Use for API signatures, configuration examples, commands
+
+EXAMPLE VISUAL ELEMENTS:
+> **Important:** API key must be set in OPENROUTER_API_KEY environment variable (checked at main.py:10).
+
+```python
+# Actual code from config.py
+API_KEY = os.getenv("OPENROUTER_API_KEY", None)
+if not API_KEY:
+    raise ValueError("API key required")
+```
+
+> **Key Decision:** Synchronous API calls used for simplicity (main.py:45-60) at cost of 2-3s latency per request vs async's 200ms.
+
+QUALITY REQUIREMENTS:
+- Be comprehensive but concise - include all important information without being verbose
+- Use clear, logical structure - information should flow naturally
+- Maintain professional tone and technical accuracy
+- Ensure the document is COMPLETE - don't cut off mid-section
+- Make it visually scannable with headings, blockquotes, and code blocks
+- Keep it clean and well-organized, not clumsy or overly long
+- **Cite code locations**: Reference file:line when making specific claims"""
+
+
+WORKFLOW_INSTRUCTIONS = """You are a software architecture specialist responsible for analyzing code repositories and generating HIGH-LEVEL workflow diagrams.
+
+INPUT CONTEXT:
+- You will receive detailed repository analysis containing information about files, modules, functions, classes, and dependencies
+- The analysis describes the structure, components, and relationships within the codebase
+
+OBJECTIVE:
+Generate a SIMPLIFIED, HIGH-LEVEL workflow diagram in JSON format that visualizes ONLY the main architecture and data flow.
+
+CRITICAL SIMPLIFICATION RULES:
+- **MAXIMUM 5-10 NODES TOTAL** - Focus on main workflow stages only
+- **EXCLUDE low-level details**: No individual function calls, environment loading, configuration, instruction/prompt nodes, or intermediate variables
+- **INCLUDE only**: Entry points, major processing stages, external services, final outputs
+- Show the BIG PICTURE workflow, not implementation details
+
+JSON STRUCTURE REQUIREMENTS:
+You MUST generate a JSON object with this EXACT structure:
+
+{
+  "meta": {
+    "title": "Project Title Here",
+    "layout": "LR"
+  },
+  "node_types": {
+    "entry": {"color": "#1bbcd6", "shape": "box"},
+    "core": {"color": "#2e8b57", "shape": "box"},
+    "external": {"color": "#d9534f", "shape": "box"},
+    "output": {"color": "#7b2d3a", "shape": "box"}
+  },
+  "nodes": [
+    {"id": "unique_id", "label": "Display Name", "type": "entry|core|external|output", "layer": 1}
+  ],
+  "edges": [
+    {"from": "source_node_id", "to": "target_node_id"}
+  ]
+}
+
+SIMPLIFIED NODE CLASSIFICATION (4 types only):
+1. **entry** (Layer 1): Main entry point (e.g., "main.py", "User Input")
+2. **core** (Layer 2-3): Major processing stages only (e.g., "Repository Analysis", "Documentation Generation", "PDF Creation")
+3. **external** (Layer 2-3): External services/APIs (e.g., "GitHub API", "Gemini AI Model")
+4. **output** (Layer 4): Final deliverables only (e.g., "Technical Documentation", "PDF Report", "Workflow Diagram")
+
+LAYER ASSIGNMENT (Simplified):
+- Layer 1: Entry point (1 node typically)
+- Layer 2-3: Core processing and external services (3-6 nodes)
+- Layer 4: Final outputs (1-3 nodes)
+
+EDGE CREATION RULES:
+- Show only DIRECT, IMPORTANT data flows
+- One arrow per major connection
+- No redundant or circular paths
+- Keep it linear and simple
+
+WHAT TO EXCLUDE (very important):
+- Individual function calls (load_dotenv, agent.run, etc.)
+- Configuration nodes (instructions, prompts, settings)
+- Intermediate variables or responses
+- Helper utilities unless they're a major component
+- Token/credential nodes unless they're a key external service
+- Environment variables
+
+WHAT TO INCLUDE (focus on these):
+- Main entry script
+- Major processing stages (like "Analyze Repository", "Generate Docs")
+- Key external services (GitHub API, AI Model)
+- Final outputs (PDF, Documentation file)
+
+ANALYSIS APPROACH:
+1. Identify the ONE main entry point
+2. Identify 2-4 MAJOR processing stages (not individual functions)
+3. Identify 1-2 KEY external services
+4. Identify 1-3 final outputs
+5. Draw simple, direct connections between them
+6. Generate minimal, clean JSON structure
+
+EXAMPLE for a documentation generator:
+- Entry: "main.py" → Core: "Repository Analyzer" → External: "GitHub API"
+- Core: "Repository Analyzer" → Core: "Documentation Generator" → External: "AI Model"
+- Core: "Documentation Generator" → Output: "Technical PDF"
+Total: ~6 nodes, clean and readable
+
+Remember: Return ONLY valid JSON, nothing else. Keep it SIMPLE and HIGH-LEVEL."""
+
+DOCUMENTATION_PROMPT = """Generate COMPLETE and COMPREHENSIVE technical documentation for the entire repository.
+
+IMPORTANT REQUIREMENTS:
+1. You MUST complete ALL sections - do not stop mid-sentence or mid-section
+2. Include a proper Conclusion section at the end
+3. Ensure the document is fully finished before stopping
+4. Cover ALL files, components, and implementation details
+5. The documentation should be at least 100+ lines long to be comprehensive
+
+Generate the complete documentation now:"""
+
+SUMMARY_PROMPT = """Generate a CONCISE technical summary of the repository (about one to two pages).
+
+IMPORTANT REQUIREMENTS:
+1. Cover only: purpose, high-level architecture, key components, how to run it, and notable limitations
+2. Use short sections and bullet points; skip sections that do not apply
+3. Finish with a short Conclusion section
+
+Generate the summary now:"""
+
+
+def documentation_prompt(mode: DepthMode = None) -> str:
+    """The documenter's task prompt for a depth mode"""
+    return SUMMARY_PROMPT if (mode or get_mode()).concise else DOCUMENTATION_PROMPT
+
+
+def limit_file_reads(max_files: int) -> Callable:
+    """
+    Tool hook that refuses file reads beyond max_files, telling the agent to
+    finish with what it has read instead of failing the run. Each path of a
+    read_files call counts as one read; paths over the limit are dropped.
+    """
+    lock = threading.Lock()
+    reads = [0]
+
+    def file_read_limit(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+        if function_name in ("get_file_content", "read_files"):
+            wanted = 1 if function_name == "get_file_content" else len(arguments.get("paths") or [])
+            with lock:
+                allowed = max(0, min(wanted, max_files - reads[0]))
+                reads[0] += allowed
+            if wanted and not allowed:
+                return json.dumps({
+                    "error": f"File read limit of {max_files} reached. Write the analysis from the files already read."
+                })
+            if allowed < wanted:
+                arguments = {**arguments, "paths": arguments["paths"][:allowed]}
+        return function_call(**arguments)
+
+    return file_read_limit
+
+
+class ToolCallMemo:
+    """
+    Per-run memo of tool calls: an identical call (same tool, same arguments)
+    is answered with the earlier result instead of another GitHub request.
+    Shared by every analysis agent of a run; error results are not kept.
+    Once the run's cancel_event is set, the next tool call ends the agent's
+    run (RunCancelledException) instead of another model turn.
+    """
+
+    def __init__(self, cancel_event: Optional[threading.Event] = None):
+        self.cancel_event = cancel_event
+        self._results: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.memoized = 0
+
+    def _lookup(self, function_name: str, arguments: Dict[str, Any]):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RunCancelledException("Pipeline cancelled")
+        key = f"{function_name}:{json.dumps(arguments, sort_keys=True, default=str)}"
+        with self._lock:
+            self.calls += 1
+            if key in self._results:
+                self.memoized += 1
+                return key, self._results[key]
+        return key, None
+
+    def _remember(self, key: str, result):
+        if isinstance(result, str) and not result.startswith('{\n  "error"') and not result.startswith('{"error"'):
+            with self._lock:
+                self._results[key] = result
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+        key, result = self._lookup(function_name, arguments)
+        if result is None:
+            result = function_call(**arguments)
+            self._remember(key, result)
+        return result
+
+    async def ahook(self, function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+        # In Agent.arun the next step of the chain is a coroutine function
+        key, result = self._lookup(function_name, arguments)
+        if result is None:
+            result = await function_call(**arguments)
+            self._remember(key, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Tool calls the agents made, and how many reached the tools"""
+        with self._lock:
+            return {"requested": self.calls, "memoized": self.memoized, "executed": self.calls - self.memoized}
+
+
+# One keep-alive HTTP client per process, shared by every model instance
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide HTTP client used to reach OpenRouter"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                timeout=httpx.Timeout(600.0, connect=10.0),
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        return _http_client
+
+
+# One async HTTP client per event loop, shared by every async model on it
+_async_http_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the async HTTP client used to reach OpenRouter from the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(600.0, connect=10.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+        _async_http_clients[loop] = client
+    return client
+
+
+def build_model(use_async: bool = False, model_id: str = MODEL_ID, max_tokens: int = MAX_TOKENS):
+    """Create the OpenRouter model client used by the agents"""
+    http_client = get_async_http_client() if use_async else get_http_client()
+    return OpenRouter(id=model_id, max_tokens=max_tokens, http_client=http_client)
+
+
+def warm_up():
+    """
+    Load everything a job needs before the first job arrives: the PDF and
+    diagram libraries, and the shared OpenRouter HTTP client.
+    """
+    import fitz  # noqa: F401
+    import graphviz  # noqa: F401
+    import doc_creation  # noqa: F401
+    import generate_project_workflow  # noqa: F401
+
+    get_http_client()
+    try:
+        build_model().get_client()
+    except Exception:
+        pass  # No API key configured yet; the first job will report it
+
+
+# How the analysis agent should read the repository under each planner strategy
+STRATEGY_GUIDANCE = {
+    "full": "The repository is small: read every source file that matters, within the file limit.",
+    "sampled": (
+        "The repository is too large to read whole: read the README, the dependency files, "
+        "the entry points and one or two representative modules per top-level package."
+    ),
+    "map_reduce": (
+        "You analyze one part of a large repository, given in the task. Stay inside that part "
+        "and describe what it contributes to the whole; other parts are analyzed separately."
+    ),
+}
+
+
+def build_analysis_agent(
+    repo_name: str,
+    use_async: bool = False,
+    mode: DepthMode = None,
+    plan: Plan = None,
+    snapshot: RepoSnapshot = None,
+    memo: ToolCallMemo = None,
+    file_stats: FilterStats = None,
+    ref: Optional[str] = None,
+    subpath: str = "",
+    project_scan: Optional[ProjectScan] = None,
+    packed_context: Optional[PackedContext] = None
+) -> Agent:
+    """
+    Create the agent that explores the repository with GithubTools (or a snapshot of it).
+    Pass the run's ToolCallMemo to share tool results between its agents, and
+    its FilterStats to count the file bytes they did not read. With a subpath
+    the tools only see that directory, as if it were the whole repository
+    (a snapshot must already be scoped to it; see snapshot.scope_snapshot).
+    With a static scan (see pipeline.scanner) the agent starts from its facts
+    and only reads files, in as few tool calls as its file limit allows.
+    With a packed context (see pipeline.context_pack) the highest-ranked files
+    are already in its context, so it only reads what they leave unexplained.
+    """
+    mode = mode or get_mode()
+    max_files = plan.max_files if plan else mode.max_files
+    strategy = plan.strategy if plan else "sampled"
+    if snapshot is not None:
+        # Same tool names and outputs, served from disk
+        github_tools = SnapshotTools(snapshot, stats=file_stats)
+    elif use_async:
+        github_tools = AsyncGithubTools(stats=file_stats, ref=ref, subpath=subpath)
+    else:
+        github_tools = GithubApiTools(stats=file_stats, ref=ref, subpath=subpath)
+    memo = memo or ToolCallMemo()
+    tool_call_limit = mode.max_tool_calls
+    if project_scan is not None:
+        # The facts replace the discovery calls; what is left is reading files
+        tool_call_limit = min(tool_call_limit, math.ceil(max_files / READ_FILES_MAX_PATHS) + 1)
+        steps = [
+            "A static scan of the repository already extracted these facts. Do not call get_repository,",
+            "get_repository_languages or get_repository_tree to rediscover them:",
+            "",
+            project_scan.render(),
+            "",
+            "CRITICAL: You MUST read the ACTUAL files the facts point to.",
+            "Step 1: Read the README, the entry points and manifests listed above and the main modules they use with",
+            f"   ONE read_files(repo_name='{repo_name}', paths=[...]) call",
+            f"   - Read at most {max_files} files in total, so pick the most informative ones",
+            f"   - {STRATEGY_GUIDANCE[strategy]}",
+            "Step 2: Call get_repository_tree() only for a directory the facts do not explain",
+        ]
+    else:
+        steps = [
+            "CRITICAL: You MUST use your tools to analyze the ACTUAL repository.",
+            "Follow these steps IN ORDER:",
+            "",
+            f"Step 1: Call get_repository(repo_name='{repo_name}') to get repository details",
+            f"Step 2: Call get_repository_languages(repo_name='{repo_name}') to identify programming languages",
+            f"Step 3: Call get_repository_tree(repo_name='{repo_name}') ONCE to see every directory and file with sizes",
+            f"Step 4: Based on the files found, read key files with ONE read_files(repo_name='{repo_name}', paths=[...]) call",
+            "   listing every file you need (use get_file_content only for a single file you missed)",
+            "   - Look for README.md, main files (main.py, app.py, index.js, server.js, etc.)",
+            "   - Read package.json, requirements.txt, or similar dependency files",
+            "   - Read key source files to understand the codebase",
+            f"   - Read at most {max_files} files in total, so pick the most informative ones",
+            f"   - {STRATEGY_GUIDANCE[strategy]}",
+            "",
+            "Step 5: Do not list directories one by one; the tree already shows them. Call get_directory_content() only",
+            "   for a directory the tree cut short ('... N more entries') that you need to see in full",
+        ]
+    key_files = ""
+    if packed_context is not None:
+        steps = [
+            "The most important files are already in your context under KEY FILES (ranked by importance).",
+            "Do not read them again; call read_files only for files they reference that are essential to the analysis.",
+            "",
+            *steps,
+        ]
+        key_files = (f"KEY FILES (ranked by importance; {len(packed_context.files)} files, "
+                     f"{packed_context.tokens} tokens):\n\n{packed_context.text}")
+    return Agent(
+        model=build_model(use_async, mode.analysis_model, mode.max_tokens),
+        additional_context=key_files or None,
+        instructions=[
+            f"You are analyzing the GitHub repository: {repo_name}",
+            *([f"Only its `{subpath}/` directory is in scope; your tools show that directory as the repository root."]
+              if subpath else []),
+            "You have GithubTools available to read repository data.",
+            "",
+            *steps,
+            "",
+            "Provide a COMPREHENSIVE analysis including:",
+            "- Repository description and purpose",
+            "- Technologies and frameworks used (from languages and dependency files)",
+            "- Project structure (directories and their purposes)",
+            "- Key files and their roles",
+            "- Main functionality and features (from README and code)",
+            "- Dependencies and integrations",
+            "- Entry points and workflow",
+            "",
+            "DO NOT provide generic descriptions. Use ACTUAL data from the repository you read using your tools.",
+        ],
+        tools=[github_tools],
+        tool_call_limit=tool_call_limit,
+        # The memo comes first, so repeated reads do not count against the file limit
+        tool_hooks=[memo.ahook if use_async else memo.hook, limit_file_reads(max_files)],
+    )
+
+
+def build_analysis_prompt(
+    repo_name: str,
+    question: str,
+    partition: Optional[str] = None,
+    scanned: bool = False,
+    packed: bool = False
+) -> str:
+    """
+    Build the prompt that asks the analysis agent to read the repository.
+    With a partition (map_reduce plans) the agent covers only that directory,
+    or only the top-level files for the root partition "". With scanned, the
+    agent already has the static scan's facts and is only asked to read files.
+    With packed, the key files are already in its context and it is told to
+    start from them.
+    """
+    if partition is not None:
+        scope = f"the directory `{partition}/`" if partition else "the top-level files (not the subdirectories)"
+        listing = (
+            f'get_repository_tree(repo_name="{repo_name}", path="{partition}")' if partition
+            else f'get_directory_content(repo_name="{repo_name}", path="")'
+        )
+        return f"""Analyze {scope} of the GitHub repository **{repo_name}** by actually reading it using your GithubTools.
+
+REQUIRED STEPS (use your tools):
+1. List it: {listing}
+2. Read in ONE read_files(repo_name="{repo_name}", paths=[...]) call its README, entry points
+   and dependency files, if it has any, and its most informative source files
+
+After gathering this data, describe for this part only:
+- Its purpose and role in the repository
+- Technologies used
+- Structure and key files
+- Key features and how they connect to the rest of the repository
+
+{question}
+
+IMPORTANT: Actually call the GitHub tools listed above. Don't skip this step!"""
+
+    key_files = (
+        "\nThe KEY FILES in your context are its most important files: start from them and do not read them again."
+        if packed else ""
+    )
+    if scanned:
+        return f"""Analyze the GitHub repository **{repo_name}** by actually reading it using your GithubTools.{key_files}
+The project facts in your instructions already cover its languages, manifests, entry points,
+environment variables and test commands.
+
+REQUIRED STEP (use your tools):
+1. Read in ONE read_files(repo_name="{repo_name}", paths=[...]) call the README, the entry points
+   and manifests from the facts, and the modules they rely on
+
+After reading them, provide a detailed analysis of the repository's:
+- Purpose and description
+- Technologies used
+- Architecture and structure
+- Key features
+- Dependencies
+
+{question}
+
+IMPORTANT: Actually call read_files. Don't skip this step!"""
+
+    return f"""Analyze the GitHub repository **{repo_name}** by actually reading it using your GithubTools.{key_files}
+
+REQUIRED STEPS (use your tools):
+1. Get repository info: get_repository(repo_name="{repo_name}")
+2. Get languages: get_repository_languages(repo_name="{repo_name}")  
+3. List every file in one call: get_repository_tree(repo_name="{repo_name}")
+4. Read in ONE read_files(repo_name="{repo_name}", paths=[...]) call:
+   - README.md if it exists
+   - main/entry point files
+   - dependency files (package.json, requirements.txt, etc.)
+   - the key files of the important directories shown in the tree
+
+After gathering this data, provide a detailed analysis of the repository's:
+- Purpose and description
+- Technologies used
+- Architecture and structure  
+- Key features
+- Dependencies
+
+{question}
+
+IMPORTANT: Actually call the GitHub tools listed above. Don't skip this step!"""
+
+
+def build_documenter(analysis: str, use_async: bool = False, mode: DepthMode = None, project_facts: str = "") -> Agent:
+    """
+    Create the documentation agent with the repository analysis as context,
+    plus the static scan's facts (see pipeline.scanner), if any
+    """
+    mode = mode or get_mode()
+    facts = f"\n\n{project_facts}\n\nThe project facts are exact; where the analysis disagrees, trust the facts." if project_facts else ""
+    return Agent(
+        name="DocumentationSpecialist",
+        model=build_model(use_async, mode.documentation_model, mode.max_tokens),  # Using Gemini via OpenRouter
+        description="Software documentation specialist that produces formal technical documentation from repository analysis",
+        instructions=DOCUMENTER_INSTRUCTIONS,
+        expected_output="Comprehensive technical documentation in markdown format with clear sections, detailed explanations, and professional technical writing",
+        markdown=True,
+        # Add the repository analysis to additional context instead of knowledge parameter
+        # (knowledge parameter expects Knowledge object, not string)
+        additional_context=f"""REPOSITORY ANALYSIS:
+
+{analysis}{facts}
+
+Use the above repository analysis to generate comprehensive technical documentation.
+
+IMPORTANT: After the Introduction section and before the Architecture/Components sections, you MUST include the following EXACT line on its own line:
+{WORKFLOW_DIAGRAM_PLACEHOLDER}
+
+This placeholder will be replaced with the actual workflow diagram image.""",
+        search_knowledge=False,  # We're using additional_context, not a knowledge base
+    )
+
+
+def build_workflow_agent(use_async: bool = False, mode: DepthMode = None) -> Agent:
+    """Create the agent that turns the analysis into workflow diagram JSON"""
+    mode = mode or get_mode()
+    return Agent(
+        name="WorkflowArchitect",
+        model=build_model(use_async, mode.workflow_model),
+        description="Software architecture specialist that analyzes repository structure and generates workflow diagrams in JSON format",
+        instructions=WORKFLOW_INSTRUCTIONS,
+        expected_output="Valid JSON object representing the workflow diagram with meta, node_types, nodes, and edges",
+        markdown=False,
+        # Note: We pass the repository analysis directly in the prompt
+        # instead of using additional_context, as it's more reliable
+        search_knowledge=False,
+    )
+
+
+def build_workflow_prompt(analysis: str) -> str:
+    """Build the prompt that asks for the workflow diagram JSON"""
+    return f"""Based on the following repository analysis, generate a simplified workflow diagram JSON with 5-10 key nodes showing only the high-level workflow stages.
+
+REPOSITORY ANALYSIS:
+{analysis}
+
+Remember: Return ONLY valid JSON with the structure: meta, node_types, nodes, and edges. Keep it SIMPLE and HIGH-LEVEL."""
@@ -0,0 +1,315 @@
+"""
+Asyncio-native variant of the pipeline.
+
+Almost all of a job's wall time is spent waiting on OpenRouter and the GitHub
+API. arun_pipeline() runs the same stage DAG as run_pipeline(), but with
+async agent calls (Agent.arun) and async GitHub tools, so one process can
+multiplex many jobs on a single event loop. The CPU-bound steps (Graphviz and
+PDF rendering) run on a small dedicated thread pool.
+
+AsyncPipelineRunner owns such a loop in a background thread and exposes a
+blocking run() with the same signature as run_pipeline, so the job queue
+worker can use it instead of one thread per job.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+from pipeline import agents, context_pack
+from pipeline.checkpoints import CheckpointStore
+from pipeline.dag import CANCEL_POLL_SECONDS, PipelineCancelled, Stage, arun_dag
+from pipeline.planner import Plan
+from pipeline.runner import (
+    PipelineJob,
+    PipelineResult,
+    build_result,
+    build_stages,
+    merge_partial_analyses,
+    prepare_job,
+    project_facts,
+    resolve_pack,
+    resolve_plan,
+    resolve_scan,
+    resolve_snapshot,
+    save_document,
+    save_workflow_json,
+    stage_diagram,
+    stage_ingest,
+    stage_pack,
+    stage_plan,
+    stage_render,
+    stage_scan,
+    stage_snapshot,
+    static_analysis,
+)
+
+# Threads for the CPU-bound stages; the event loop never renders anything itself
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+_render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="git2doc-render")
+# Threads for the blocking stages (snapshot download, scan, pack)
+_stage_executor = ThreadPoolExecutor(thread_name_prefix="git2doc-stage")
+
+# Threads started by the current run: cancelling an await does not stop the thread behind it
+_run_threads: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("git2doc_run_threads", default=None)
+
+
+async def _in_thread(executor: ThreadPoolExecutor, func, *args):
+    """Run func on executor (like asyncio.to_thread) and record the thread on the current run"""
+    future = executor.submit(contextvars.copy_context().run, func, *args)
+    threads = _run_threads.get()
+    if threads is not None:
+        threads.append(future)
+    return await asyncio.wrap_future(future)
+
+
+def _resolve_when_done(futures: list, exited: concurrent.futures.Future):
+    """Resolve exited once every one of futures is done"""
+    pending = [future for future in futures if not future.done()]
+    if not pending:
+        exited.set_result(None)
+        return
+    lock = threading.Lock()
+
+    def one_done(_):
+        with lock:
+            pending.pop()
+            if pending:
+                return
+        exited.set_result(None)
+
+    for future in list(pending):
+        future.add_done_callback(one_done)
+
+
+async def _render(func, *args):
+    return await _in_thread(_render_executor, func, *args)
+
+
+async def astage_ingest(job: PipelineJob, inputs: dict) -> str:
+    return stage_ingest(job, inputs)
+
+
+async def astage_plan(job: PipelineJob, inputs: dict) -> dict:
+    # Three small metadata requests on the blocking client
+    return await _in_thread(_stage_executor, stage_plan, job, inputs)
+
+
+async def astage_snapshot(job: PipelineJob, inputs: dict):
+    # Streaming and extracting the tarball blocks, so it runs on a worker thread
+    return await _in_thread(_stage_executor, stage_snapshot, job, inputs)
+
+
+async def astage_scan(job: PipelineJob, inputs: dict):
+    # Parsing files is CPU-bound, so it runs on a worker thread
+    return await _in_thread(_stage_executor, stage_scan, job, inputs)
+
+
+async def astage_pack(job: PipelineJob, inputs: dict):
+    # Ranking reads every source file, so it runs on a worker thread
+    return await _in_thread(_stage_executor, stage_pack, job, inputs)
+
+
+async def astage_analyze(job: PipelineJob, inputs: dict) -> str:
+    """Analyze the repository with the async GitHub tools and return the analysis text"""
+    repo_name = inputs["ingest"]
+    plan = resolve_plan(job, inputs)
+    repo_snapshot = resolve_snapshot(inputs)
+    print(f"Analyzing repository files of {repo_name}...")
+    analysis = static_analysis(job, inputs, plan)
+    if analysis is not None:
+        return analysis
+    project_scan = resolve_scan(inputs)
+    packed = resolve_pack(inputs) if plan.strategy != "map_reduce" else None
+
+    async def analyze(partition: Optional[str] = None) -> str:
+        analysis_agent = agents.build_analysis_agent(
+            repo_name, use_async=True, mode=job.mode, plan=plan, snapshot=repo_snapshot, memo=job.tool_memo,
+            file_stats=job.file_stats, ref=job.ref, subpath=job.subpath, project_scan=project_scan,
+            packed_context=packed
+        )
+        prompt = agents.build_analysis_prompt(
+            repo_name, job.question, partition, scanned=project_scan is not None, packed=packed is not None
+        )
+        response = await analysis_agent.arun(prompt)
+        return str(response.content)
+
+    if plan.strategy != "map_reduce":
+        return await analyze()
+    parts = await asyncio.gather(*(analyze(partition) for partition in plan.partitions))
+    return merge_partial_analyses(plan, list(parts))
+
+
+async def astage_document(job: PipelineJob, inputs: dict):
+    print("Generating documentation...")
+    analysis = context_pack.fit_to_budget(inputs["analyze"], job.mode.context_tokens)
+    documenter = agents.build_documenter(
+        analysis, use_async=True, mode=job.mode, project_facts=project_facts(inputs)
+    )
+    doc_response = await documenter.arun(agents.documentation_prompt(job.mode))
+    return save_document(job, str(doc_response.content))
+
+
+async def astage_workflow_json(job: PipelineJob, inputs: dict):
+    print("Generating Workflow Diagram JSON...")
+    workflow_agent = agents.build_workflow_agent(use_async=True, mode=job.mode)
+    workflow_response = await workflow_agent.arun(agents.build_workflow_prompt(inputs["analyze"]))
+    return save_workflow_json(job, str(workflow_response.content))
+
+
+async def astage_diagram(job: PipelineJob, inputs: dict):
+    return await _render(stage_diagram, job, inputs)
+
+
+async def astage_render(job: PipelineJob, inputs: dict):
+    return await _render(stage_render, job, inputs)
+
+
+ASYNC_STAGE_FUNCS = {
+    "ingest": astage_ingest,
+    "plan": astage_plan,
+    "snapshot": astage_snapshot,
+    "scan": astage_scan,
+    "pack": astage_pack,
+    "analyze": astage_analyze,
+    "document": astage_document,
+    "workflow_json": astage_workflow_json,
+    "diagram": astage_diagram,
+    "render": astage_render,
+}
+
+
+def build_async_stages(job: PipelineJob) -> List[Stage]:
+    """The build_stages DAG (same dependencies and budgets) with async stage functions"""
+    return [
+        dataclasses.replace(stage, func=partial(ASYNC_STAGE_FUNCS[stage.name], job))
+        for stage in build_stages(job)
+    ]
+
+
+async def arun_pipeline(
+    repo_url: str,
+    question: str,
+    output_dir,
+    resume: bool = False,
+    stage_budgets: Optional[Dict[str, float]] = None,
+    mode: Optional[str] = None,
+    plan: Optional[Plan] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> PipelineResult:
+    """
+    Async counterpart of run_pipeline (same arguments and result).
+    Cancel the awaiting task to abort the run; setting cancel_event as well
+    stops its stage threads from writing outputs.
+    """
+    started = time.perf_counter()
+    job, job_key = prepare_job(repo_url, question, output_dir, stage_budgets, mode, plan, cancel_event)
+    run = await arun_dag(
+        build_async_stages(job),
+        checkpoints=CheckpointStore(job.workspace.root),
+        job_key=job_key,
+        resume=resume
+    )
+    return build_result(job, run, time.perf_counter() - started)
+
+
+class AsyncPipelineRunner:
+    """Runs pipelines on one background event loop, at most max_concurrent_jobs at a time"""
+
+    def __init__(self, max_concurrent_jobs: int = 32):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self._stats = {"active": 0, "waiting": 0, "jobs_completed": 0, "jobs_failed": 0, "jobs_cancelled": 0}
+
+    def start(self):
+        """Start the event loop thread"""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="git2doc-async-runner", daemon=True)
+        self._thread.start()
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._stats[key] += delta
+
+    async def _run_limited(self, *args, exited: Optional[concurrent.futures.Future] = None, **kwargs) -> PipelineResult:
+        threads = []
+        _run_threads.set(threads)
+        try:
+            return await self._run_counted(*args, **kwargs)
+        finally:
+            if exited is not None:
+                # No stage starts after this, but threads of cancelled or timed-out stages may still run
+                _resolve_when_done(threads, exited)
+
+    async def _run_counted(self, *args, **kwargs) -> PipelineResult:
+        try:
+            self._count("waiting")
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._count("waiting", -1)
+            self._count("active")
+            try:
+                result = await arun_pipeline(*args, **kwargs)
+            finally:
+                self._count("active", -1)
+                self._semaphore.release()
+        except asyncio.CancelledError:
+            self._count("jobs_cancelled")
+            raise
+        except Exception:
+            self._count("jobs_failed")
+            raise
+        self._count("jobs_completed")
+        return result
+
+    def submit(self, *args, exited: Optional[concurrent.futures.Future] = None, **kwargs) -> concurrent.futures.Future:
+        """
+        Schedule a pipeline run from any thread; returns a concurrent Future.
+        `exited` is resolved once the run and every thread it started are done.
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._run_limited(*args, exited=exited, **kwargs), self._loop)
+
+    def run(self, *args, cancel_event: Optional[threading.Event] = None, **kwargs) -> PipelineResult:
+        """
+        Run a pipeline on the loop and wait for it (blocking).
+        Raises PipelineCancelled if cancel_event was set; the run's tasks are
+        cancelled, and its abandoned future resolves once they have exited.
+        """
+        exited = concurrent.futures.Future()
+        future = self.submit(*args, exited=exited, cancel_event=cancel_event, **kwargs)
+        while True:
+            try:
+                return future.result(timeout=CANCEL_POLL_SECONDS if cancel_event is not None else None)
+            except concurrent.futures.TimeoutError:
+                if cancel_event.is_set():
+                    future.cancel()
+                    raise PipelineCancelled("Pipeline cancelled", abandoned=[exited])
+            except concurrent.futures.CancelledError:
+                raise PipelineCancelled("Pipeline cancelled", abandoned=[exited])
+
+    def stats(self) -> dict:
+        """Concurrency limit, running and queued jobs, and outcome counts"""
+        with self._lock:
+            return {"max_concurrent_jobs": self.max_concurrent_jobs, **self._stats}
+
+    def close(self):
+        """Stop the event loop (running jobs are abandoned)"""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
@@ -0,0 +1,151 @@
+"""
+Stage checkpoints stored inside the job workspace.
+
+After a stage succeeds its output is written to .checkpoints/<stage>.json,
+together with copies of any files it produced and their SHA-256 hashes. Each
+checkpoint is keyed by a hash of the job parameters and the hashes of the
+stage's inputs, so a resumed run reuses a stage only if everything it
+depended on is unchanged, and re-runs it (and everything downstream)
+otherwise. A retried job therefore restarts at the first incomplete stage
+instead of repeating the GitHub analysis and every LLM call.
+"""
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when stage outputs change shape so old checkpoints are ignored
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(value: Any, root: Path) -> Any:
+    """Make a stage output JSON-serializable (Paths become workspace-relative markers)"""
+    if isinstance(value, Path):
+        return {"__path__": str(value.relative_to(root))}
+    if isinstance(value, dict):
+        return {key: _encode(item, root) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, root) for item in value]
+    return value
+
+
+def _decode(value: Any, root: Path) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"__path__"}:
+            return root / value["__path__"]
+        return {key: _decode(item, root) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item, root) for item in value]
+    return value
+
+
+def _output_files(value: Any):
+    """Every Path contained in a stage output"""
+    if isinstance(value, Path):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _output_files(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _output_files(item)
+
+
+def hash_output(value: Any) -> str:
+    """Hash of an output that is not checkpointed (used to key downstream stages)"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def input_key(job_key: str, stage: str, input_hashes: Dict[str, str]) -> str:
+    """Hash identifying a stage run: job parameters plus the hashes of its inputs"""
+    payload = json.dumps(
+        {"version": CHECKPOINT_VERSION, "job": job_key, "stage": stage, "inputs": input_hashes},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CheckpointStore:
+    """Reads and writes stage checkpoints for one workspace"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.dir = self.root / CHECKPOINT_DIR
+
+    def _meta_file(self, stage: str) -> Path:
+        return self.dir / f"{stage}.json"
+
+    def _files_dir(self, stage: str) -> Path:
+        return self.dir / stage
+
+    def load(self, stage: str, key: str) -> Optional[Tuple[Any, str]]:
+        """
+        Return (output, output_hash) for a valid checkpoint, restoring its files
+        into the workspace, or None if there is no usable checkpoint.
+        """
+        meta_file = self._meta_file(stage)
+        if not meta_file.exists():
+            return None
+        try:
+            with open(meta_file, "r") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("key") != key:
+            return None
+
+        # Verify every saved file before touching the workspace
+        files_dir = self._files_dir(stage)
+        for relative, digest in meta["files"].items():
+            saved = files_dir / relative
+            if not saved.exists() or _sha256_file(saved) != digest:
+                return None
+        for relative in meta["files"]:
+            target = self.root / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(files_dir / relative, target)
+
+        return _decode(meta["output"], self.root), meta["output_hash"]
+
+    def save(self, stage: str, key: str, output: Any) -> str:
+        """Persist a stage output (and copies of its files); returns the output hash"""
+        files_dir = self._files_dir(stage)
+        if files_dir.exists():
+            shutil.rmtree(files_dir)
+        files = {}
+        for path in _output_files(output):
+            if not path.exists():
+                continue
+            relative = str(path.relative_to(self.root))
+            (files_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, files_dir / relative)
+            files[relative] = _sha256_file(path)
+
+        encoded = _encode(output, self.root)
+        output_hash = hashlib.sha256(
+            json.dumps({"output": encoded, "files": files}, sort_keys=True).encode()
+        ).hexdigest()
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._meta_file(stage).with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"key": key, "output": encoded, "output_hash": output_hash, "files": files}, f, indent=2)
+        tmp_file.replace(self._meta_file(stage))
+        return output_hash
+
+    def completed_stages(self) -> list:
+        """Names of stages that have a checkpoint (valid or not)"""
+        if not self.dir.exists():
+            return []
+        return sorted(path.stem for path in self.dir.glob("*.json"))
@@ -0,0 +1,347 @@
+"""
+File importance ranking and token-budget context packing.
+
+rank_files() scores every readable file of a snapshot from signals a
+program can compute:
+
+- entry points and manifests found by the static scan (pipeline.scanner)
+- the root README, and files the README mentions
+- import in-degree: how many files of the repository import the file
+  (Python through ast, JavaScript/TypeScript relative imports by regex)
+- path heuristics: central names (main, app, server, api, models, ...)
+  score up; tests, docs, examples, migrations and deep nesting score down
+- size: nearly empty files and files only shown head-only score down
+
+pack_context() then fills a token budget with the highest-scoring files,
+whole where they fit (up to a share of the budget each), and cuts the file
+that crosses the budget. Tokens
+are estimated locally (estimate_tokens), so packing needs no tokenizer
+download and no API. Ties are broken by path and files are read through
+pipeline.file_filter, so the same snapshot and budget always give the same
+text; packs of a commit are kept in a small in-process LRU cache.
+"""
+import ast
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from pipeline.file_filter import FilterStats, classify, read_text
+from pipeline.scanner import SCAN_MAX_FILE_BYTES, ProjectScan, walk_files
+from pipeline.snapshot import EXTENSION_LANGUAGES, RepoSnapshot
+
+# Bump when ranking or packing changes, so cached packs are not reused
+PACK_VERSION = 1
+# Files ranked per snapshot
+RANK_MAX_FILES = int(os.getenv("RANK_MAX_FILES", "5000"))
+# A file is only cut to fit if at least this many tokens are left for it
+MIN_PARTIAL_TOKENS = 300
+# No single file takes more than this share of the budget, so several files fit
+MAX_FILE_SHARE = 0.25
+# Packs kept in memory (keyed by commit, subpath and budget)
+PACK_CACHE_ENTRIES = 32
+
+WEIGHTS = {
+    "readme": 60,
+    "entry point": 50,
+    "manifest": 30,
+    "mentioned in README": 15,
+    "imported": 8,  # Per importing file, up to MAX_IMPORT_SCORE
+    "central name": 10,
+    "top level": 5,
+    "depth": -2,  # Per directory level below the first
+    "test": -25,
+    "docs or examples": -10,
+    "generated data": -30,
+    "nearly empty": -20,
+    "large": -15,
+}
+MAX_IMPORT_SCORE = 40
+NEARLY_EMPTY_BYTES = 64
+LARGE_BYTES = 64 * 1024
+
+CENTRAL_NAMES = {
+    "main", "app", "server", "cli", "core", "api", "config", "settings", "routes", "router",
+    "models", "schema", "schemas", "service", "services", "handlers", "views", "index", "worker", "pipeline",
+}
+CONFIG_NAMES = {"Dockerfile", "Makefile", "Procfile", "docker-compose.yml", "docker-compose.yaml"}
+CONFIG_EXTENSIONS = {".toml", ".cfg", ".ini", ".yaml", ".yml"}
+DOC_EXTENSIONS = {".md", ".rst"}
+TEST_PARTS = {"test", "tests", "__tests__", "spec", "specs", "testing"}
+DOC_PARTS = {"docs", "doc", "examples", "example", "samples", "demo", "benchmarks"}
+DATA_PARTS = {"migrations", "fixtures", "__snapshots__", "testdata", "locale", "locales"}
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".vue")
+JS_IMPORT = re.compile(r"""(?:\bfrom\s+|\brequire\(\s*|\bimport\(\s*|\bimport\s+)['"](\.{1,2}/[^'"]+)['"]""")
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]|\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token count estimate: word characters in runs of up to four, plus
+    every punctuation character and line break. Close to (slightly above)
+    BPE counts for source code, and deterministic.
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def fit_to_budget(text: str, budget_tokens: int, marker: str = "\n... (cut to fit the context budget)") -> str:
+    """text, cut at a line boundary so that it stays within budget_tokens"""
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    budget_tokens -= estimate_tokens(marker)
+    kept, used = [], 0
+    for line in text.splitlines(keepends=True):
+        cost = estimate_tokens(line)
+        if used + cost > budget_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "".join(kept).rstrip("\n") + marker
+
+
+@dataclass
+class RankedFile:
+    path: str
+    size: int
+    score: int
+    reasons: List[str] = field(default_factory=list)
+
+
+def _rankable(path: str) -> bool:
+    """Source, configuration and documentation files (not data or assets)"""
+    name = PurePosixPath(path).name
+    suffix = PurePosixPath(name).suffix.lower()
+    return (
+        suffix in EXTENSION_LANGUAGES or suffix in CONFIG_EXTENSIONS or suffix in DOC_EXTENSIONS
+        or name in CONFIG_NAMES or name.startswith("Dockerfile") or name in ("package.json", "go.mod")
+    )
+
+
+def _python_modules(paths: List[str]) -> Dict[str, str]:
+    """Dotted module name -> file, for every Python file (also without a leading src.)"""
+    modules = {}
+    for path in paths:
+        if not path.endswith(".py"):
+            continue
+        parts = list(PurePosixPath(path).with_suffix("").parts)
+        if parts[-1] == "__init__":
+            parts.pop()
+        if not parts:
+            continue
+        modules[".".join(parts)] = path
+        if parts[0] == "src" and len(parts) > 1:
+            modules.setdefault(".".join(parts[1:]), path)
+    return modules
+
+
+def _python_imports(path: str, source: str, modules: Dict[str, str]) -> set:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+    package = list(PurePosixPath(path).parent.parts)
+    if package and package[0] == "src":
+        package = package[1:]
+
+    def resolve(name: str) -> Optional[str]:
+        # `import a.b.c` uses the innermost of a.b.c, a.b and a that is a file of the repository
+        while name and name not in modules:
+            name = name.rpartition(".")[0]
+        return modules.get(name)
+
+    targets = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found = [resolve(alias.name) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = package[:len(package) - node.level + 1] if node.level else []
+            module = ".".join(base + ([node.module] if node.module else []))
+            # `from a.b import c` uses the module a.b.c if there is one, else a.b
+            found = [modules.get(f"{module}.{alias.name}" if module else alias.name) for alias in node.names]
+            if not any(found):
+                found = [resolve(module)]
+        else:
+            continue
+        targets.update(target for target in found if target and target != path)
+    return targets
+
+
+def _js_imports(path: str, source: str, files: set) -> set:
+    targets = set()
+    folder = PurePosixPath(path).parent
+    for match in JS_IMPORT.finditer(source):
+        base = os.path.normpath(str(folder / match.group(1))).replace(os.sep, "/")
+        candidates = [base] + [base + ext for ext in JS_EXTENSIONS] + [f"{base}/index{ext}" for ext in JS_EXTENSIONS]
+        target = next((candidate for candidate in candidates if candidate in files), None)
+        if target and target != path:
+            targets.add(target)
+    return targets
+
+
+def _path_score(path: str, size: int) -> Dict[str, int]:
+    parts = PurePosixPath(path).parts
+    folders = {part.lower() for part in parts[:-1]}
+    stem = PurePosixPath(parts[-1]).stem.lower()
+    signals = {}
+    if folders & TEST_PARTS or stem.startswith("test_") or stem.endswith(("_test", ".test", ".spec")) or stem == "conftest":
+        signals["test"] = WEIGHTS["test"]
+    if folders & DOC_PARTS:
+        signals["docs or examples"] = WEIGHTS["docs or examples"]
+    if folders & DATA_PARTS:
+        signals["generated data"] = WEIGHTS["generated data"]
+    if stem in CENTRAL_NAMES or (len(parts) > 1 and parts[-2].lower() in CENTRAL_NAMES and stem == "__init__"):
+        signals["central name"] = WEIGHTS["central name"]
+    if len(parts) == 1:
+        signals["top level"] = WEIGHTS["top level"]
+    elif len(parts) > 2:
+        signals["depth"] = WEIGHTS["depth"] * (len(parts) - 2)
+    if size < NEARLY_EMPTY_BYTES:
+        signals["nearly empty"] = WEIGHTS["nearly empty"]
+    elif size > LARGE_BYTES:
+        signals["large"] = WEIGHTS["large"]
+    return signals
+
+
+def rank_files(root, project_scan: Optional[ProjectScan] = None) -> List[RankedFile]:
+    """Readable files of the repository at root, most important first (ties by path)"""
+    root = Path(root)
+    sizes = {}
+    for path, size in walk_files(root):
+        if len(sizes) >= RANK_MAX_FILES:
+            break
+        if _rankable(path) and classify(path, size).action != "skip":
+            sizes[path] = size
+    files = set(sizes)
+    modules = _python_modules(sorted(files))
+
+    in_degree: Dict[str, int] = {}
+    readme_text = ""
+    for path in sorted(files):
+        if sizes[path] > SCAN_MAX_FILE_BYTES:
+            continue
+        if path.lower() in ("readme.md", "readme.rst", "readme"):
+            readme_text = (root / path).read_text(encoding="utf-8", errors="replace")
+            continue
+        if not path.endswith((".py",) + JS_EXTENSIONS):
+            continue
+        try:
+            source = (root / path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        imported = _python_imports(path, source, modules) if path.endswith(".py") else _js_imports(path, source, files)
+        for target in imported:
+            in_degree[target] = in_degree.get(target, 0) + 1
+
+    entry_points = {entry["path"] for entry in project_scan.entry_points} if project_scan else set()
+    manifests = {manifest["path"] for manifest in project_scan.manifests} if project_scan else set()
+    ranked = []
+    for path in sorted(files):
+        signals = _path_score(path, sizes[path])
+        if "/" not in path and PurePosixPath(path).stem.lower() == "readme":
+            signals["readme"] = WEIGHTS["readme"]
+        if path in entry_points:
+            signals["entry point"] = WEIGHTS["entry point"]
+        if path in manifests:
+            signals["manifest"] = WEIGHTS["manifest"]
+        if in_degree.get(path):
+            signals[f"imported by {in_degree[path]}"] = min(WEIGHTS["imported"] * in_degree[path], MAX_IMPORT_SCORE)
+        name = PurePosixPath(path).name
+        if readme_text and "readme" not in signals and (path in readme_text or (len(name) > 6 and name in readme_text)):
+            signals["mentioned in README"] = WEIGHTS["mentioned in README"]
+        ranked.append(RankedFile(path, sizes[path], sum(signals.values()), sorted(signals)))
+    return sorted(ranked, key=lambda item: (-item.score, item.path))
+
+
+@dataclass
+class PackedContext:
+    """Highest-value file contents within a token budget"""
+    text: str = ""
+    tokens: int = 0
+    budget: int = 0
+    files: List[dict] = field(default_factory=list)  # {"path", "score", "reasons", "tokens", "cut"}
+    key: str = ""  # sha256 of the text
+
+    def to_output(self) -> dict:
+        """Stage output form (JSON-serializable, so it hashes deterministically)"""
+        return asdict(self)
+
+    @classmethod
+    def from_output(cls, output: dict) -> "PackedContext":
+        return cls(**output)
+
+    def stats(self) -> dict:
+        return {"files": len(self.files), "tokens": self.tokens, "budget": self.budget}
+
+
+def _block(path: str, content: str) -> str:
+    return f"### {path}\n```\n{content}\n```\n\n"
+
+
+def pack_context(root, ranked: List[RankedFile], budget_tokens: int) -> PackedContext:
+    """
+    Fill budget_tokens with the ranked files in order: whole files while they
+    fit (each cut to MAX_FILE_SHARE of the budget), smaller later files when
+    one does not, and the first file that crosses the budget cut to the space
+    left (if at least MIN_PARTIAL_TOKENS). Files with a score of zero or less
+    are never packed.
+    """
+    root = Path(root)
+    parts, packed, used = [], [], 0
+    stats = FilterStats()
+    per_file = max(MIN_PARTIAL_TOKENS, int(budget_tokens * MAX_FILE_SHARE))
+    for item in ranked:
+        if item.score <= 0 or budget_tokens - used < estimate_tokens(_block(item.path, "")):
+            continue
+        try:
+            content = read_text(item.path, (root / item.path).read_bytes(), stats).get("content")
+        except OSError:
+            continue
+        if not content:
+            continue
+        header = estimate_tokens(_block(item.path, ""))
+        fitted = fit_to_budget(content, per_file - header)
+        block, cut = _block(item.path, fitted), fitted != content
+        cost = estimate_tokens(block)
+        if cost > budget_tokens - used:
+            left = budget_tokens - used
+            if left < MIN_PARTIAL_TOKENS:
+                continue
+            block, cut = _block(item.path, fit_to_budget(content, left - header)), True
+            cost = estimate_tokens(block)
+        parts.append(block)
+        used += cost
+        packed.append({"path": item.path, "score": item.score, "reasons": item.reasons, "tokens": cost, "cut": cut})
+        if budget_tokens - used < MIN_PARTIAL_TOKENS:
+            break
+    text = "".join(parts)
+    return PackedContext(
+        text=text, tokens=used, budget=budget_tokens, files=packed,
+        key=hashlib.sha256(text.encode("utf-8")).hexdigest()
+    )
+
+
+_cache: "OrderedDict[tuple, PackedContext]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def packed_context(snapshot: RepoSnapshot, budget_tokens: int, project_scan: Optional[ProjectScan] = None) -> PackedContext:
+    """Rank and pack a snapshot, reusing the pack of an earlier job at the same commit and budget"""
+    # A working tree can change between jobs (uncommitted edits keep its HEAD sha); a commit cannot
+    cacheable = snapshot.sha and not snapshot.working_tree
+    key = (PACK_VERSION, snapshot.repo_name, snapshot.sha, str(snapshot.root), budget_tokens)
+    if cacheable:
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                return _cache[key]
+    packed = pack_context(snapshot.root, rank_files(snapshot.root, project_scan), budget_tokens)
+    if cacheable:
+        with _cache_lock:
+            _cache[key] = packed
+            while len(_cache) > PACK_CACHE_ENTRIES:
+                _cache.popitem(last=False)
+    return packed
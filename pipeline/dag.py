@@ -0,0 +1,302 @@
+"""
+Minimal stage DAG scheduler.
+
+A pipeline is a list of Stage objects. Each stage runs as soon as all of its
+dependencies have finished, so independent stages (e.g. the documenter and
+the workflow architect, which both only need the analysis) run in parallel.
+A stage function receives a dict of its dependencies' outputs and returns
+its own output, which becomes an input for downstream stages.
+
+With a CheckpointStore, every checkpointable stage's output is persisted
+and, when resuming, restored instead of re-running the stage.
+
+A stage may have a time budget. A required stage that exceeds it fails the
+run; an optional stage that exceeds it (or raises) is "degraded": its output
+becomes None and downstream stages carry on without it.
+
+A run can be cancelled from another thread by setting its cancel event; no
+new stage starts afterwards and stages already running are abandoned. The
+stages should watch the same event and stop early (the agents do, at their
+next tool call); the PipelineCancelled error lists the abandoned stages so
+the caller can tell when they have actually exited.
+
+arun_dag is the asyncio counterpart for stages that are coroutine functions.
+Budgets are enforced with task cancellation and the whole run is cancelled
+like any other task.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pipeline.checkpoints import CheckpointStore, hash_output, input_key
+
+
+@dataclass
+class Stage:
+    """One node of the pipeline DAG"""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Sequence[str] = field(default_factory=tuple)
+    checkpoint: bool = True  # Persist the output so a resumed run can skip this stage
+    timeout: Optional[float] = None  # Seconds this stage may run
+    optional: bool = False  # Degrade to None instead of failing the run
+
+
+@dataclass
+class DagResult:
+    """Outputs and bookkeeping of one DAG run"""
+    outputs: Dict[str, Any]
+    timings: Dict[str, float]
+    resumed: List[str] = field(default_factory=list)  # Stages restored from checkpoints
+    degraded: List[str] = field(default_factory=list)  # Optional stages that timed out or failed
+
+
+class StageError(Exception):
+    """Raised when a stage fails; carries the stage name and the original error"""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageTimeout(Exception):
+    """A stage ran past its time budget"""
+
+
+class PipelineCancelled(Exception):
+    """
+    Raised when a run is cancelled before it finishes. `abandoned` holds the
+    futures of stages still running in the background (empty when nothing
+    was left behind).
+    """
+
+    def __init__(self, message: str = "Pipeline cancelled", abandoned: Sequence[Future] = ()):
+        super().__init__(message)
+        self.abandoned = tuple(abandoned)
+
+
+# How often a cancellable run checks its cancel event (seconds)
+CANCEL_POLL_SECONDS = 0.25
+
+
+def validate_dag(stages: List[Stage]):
+    """Check for unknown dependencies, duplicate names and cycles"""
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate stage names: {names}")
+    known = set(names)
+    for stage in stages:
+        unknown = set(stage.deps) - known
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+
+    # Kahn's algorithm: every stage must become runnable eventually
+    remaining = {stage.name: set(stage.deps) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Cycle between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def critical_path_seconds(deps: Dict[str, Sequence[str]], seconds: Dict[str, float]) -> float:
+    """Wall time of a run in which stage `name` takes seconds[name]: the longest dependency chain"""
+    finish: Dict[str, float] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            start = max((finish_time(dep) for dep in deps[name]), default=0.0)
+            finish[name] = start + seconds.get(name, 0.0)
+        return finish[name]
+
+    return max((finish_time(name) for name in deps), default=0.0)
+
+
+def run_dag(
+    stages: List[Stage],
+    max_workers: int = None,
+    checkpoints: Optional[CheckpointStore] = None,
+    job_key: str = "",
+    resume: bool = False,
+    cancel: Optional[threading.Event] = None
+) -> DagResult:
+    """
+    Run stages respecting dependencies, in parallel where possible.
+
+    Args:
+        stages: The DAG
+        max_workers: Thread limit (default: one per stage)
+        checkpoints: Where to persist stage outputs (None disables checkpointing)
+        job_key: Identifies the job parameters; part of every checkpoint key
+        resume: Reuse valid checkpoints instead of re-running their stages
+        cancel: Event that aborts the run when set
+
+    Raises:
+        StageError: For the first required stage that raises or exceeds its
+            budget; stages not yet started are skipped
+        PipelineCancelled: If cancel is set before the run finishes
+    """
+    validate_dag(stages)
+    by_name = {stage.name: stage for stage in stages}
+    result = DagResult(outputs={}, timings={})
+    output_hashes: Dict[str, str] = {}
+    pending = {stage.name for stage in stages}
+    running = {}
+    deadlines = {}
+    timed_out = []  # Futures of stages abandoned past their budget, still running
+
+    def execute(stage: Stage, inputs: Dict[str, Any], key: str):
+        use_checkpoints = checkpoints is not None and stage.checkpoint
+        if use_checkpoints and resume:
+            restored = checkpoints.load(stage.name, key)
+            if restored is not None:
+                result.resumed.append(stage.name)
+                return restored
+
+        started = time.perf_counter()
+        try:
+            output = stage.func(inputs)
+        finally:
+            result.timings.setdefault(stage.name, time.perf_counter() - started)
+        if cancel is not None and cancel.is_set():
+            # Abandoned stage finishing late: don't write anything more to the workspace
+            raise PipelineCancelled(f"Stage '{stage.name}' finished after cancellation")
+        if use_checkpoints:
+            return output, checkpoints.save(stage.name, key, output)
+        return output, hash_output(output)
+
+    def degrade_or_raise(name: str, error: BaseException):
+        if not by_name[name].optional:
+            raise StageError(name, error) from error
+        print(f"⚠️  Warning: optional stage '{name}' degraded: {error}")
+        result.degraded.append(name)
+        result.outputs[name], output_hashes[name] = None, hash_output(None)
+
+    # Not a context manager: shutting down must not wait for stages that blew their budget
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="git2doc-stage")
+    try:
+        while pending or running:
+            if cancel is not None and cancel.is_set():
+                abandoned = [future for future in [*running, *timed_out] if not future.done()]
+                raise PipelineCancelled("Pipeline cancelled", abandoned)
+
+            # Submit every stage whose dependencies are all done
+            for name in sorted(pending):
+                stage = by_name[name]
+                if all(dep in result.outputs for dep in stage.deps):
+                    inputs = {dep: result.outputs[dep] for dep in stage.deps}
+                    key = input_key(job_key, name, {dep: output_hashes[dep] for dep in stage.deps})
+                    future = pool.submit(execute, stage, inputs, key)
+                    running[future] = name
+                    if stage.timeout is not None:
+                        deadlines[future] = time.monotonic() + stage.timeout
+                    pending.discard(name)
+
+            if not running:
+                continue
+            next_deadline = min((deadlines[f] for f in running if f in deadlines), default=None)
+            wait_timeout = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+            if cancel is not None:
+                wait_timeout = min(wait_timeout, CANCEL_POLL_SECONDS) if wait_timeout is not None else CANCEL_POLL_SECONDS
+            done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    degrade_or_raise(name, error)
+                else:
+                    result.outputs[name], output_hashes[name] = future.result()
+
+            # Stages past their deadline are abandoned (their thread finishes in the background)
+            now = time.monotonic()
+            for future in [f for f in running if f in deadlines and deadlines[f] <= now]:
+                name = running.pop(future)
+                timed_out.append(future)
+                budget = by_name[name].timeout
+                result.timings[name] = budget
+                degrade_or_raise(name, StageTimeout(f"exceeded its {budget:g}s budget"))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return result
+
+
+async def arun_dag(
+    stages: List[Stage],
+    checkpoints: Optional[CheckpointStore] = None,
+    job_key: str = "",
+    resume: bool = False
+) -> DagResult:
+    """
+    Run async stages respecting dependencies, concurrently where possible.
+
+    Same semantics as run_dag, except that a stage that exceeds its budget is
+    cancelled rather than abandoned, and cancelling the calling task cancels
+    every running stage.
+    """
+    validate_dag(stages)
+    by_name = {stage.name: stage for stage in stages}
+    result = DagResult(outputs={}, timings={})
+    output_hashes: Dict[str, str] = {}
+    pending = {stage.name for stage in stages}
+    running = {}
+
+    async def execute(stage: Stage, inputs: Dict[str, Any], key: str):
+        use_checkpoints = checkpoints is not None and stage.checkpoint
+        if use_checkpoints and resume:
+            restored = checkpoints.load(stage.name, key)
+            if restored is not None:
+                result.resumed.append(stage.name)
+                return restored
+
+        started = time.perf_counter()
+        try:
+            output = await asyncio.wait_for(stage.func(inputs), stage.timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeout(f"exceeded its {stage.timeout:g}s budget")
+        finally:
+            result.timings[stage.name] = time.perf_counter() - started
+        if use_checkpoints:
+            return output, checkpoints.save(stage.name, key, output)
+        return output, hash_output(output)
+
+    def degrade_or_raise(name: str, error: BaseException):
+        if not by_name[name].optional:
+            raise StageError(name, error) from error
+        print(f"⚠️  Warning: optional stage '{name}' degraded: {error}")
+        result.degraded.append(name)
+        result.outputs[name], output_hashes[name] = None, hash_output(None)
+
+    try:
+        while pending or running:
+            for name in sorted(pending):
+                stage = by_name[name]
+                if all(dep in result.outputs for dep in stage.deps):
+                    inputs = {dep: result.outputs[dep] for dep in stage.deps}
+                    key = input_key(job_key, name, {dep: output_hashes[dep] for dep in stage.deps})
+                    running[asyncio.ensure_future(execute(stage, inputs, key))] = name
+                    pending.discard(name)
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                error = task.exception()
+                if error is not None:
+                    degrade_or_raise(name, error)
+                else:
+                    result.outputs[name], output_hashes[name] = task.result()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return result
@@ -0,0 +1,118 @@
+"""
+Fast draft tier.
+
+generate_draft() builds a short overview document within seconds from cheap
+inputs only (repository metadata, languages, the README and the root
+listing) without any LLM call. The API shows it while the full pipeline is
+still running and drops it once the full document is ready.
+"""
+import base64
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from doc_creation import generate_pdf
+from pipeline.github_async import get_github_sync_client
+from pipeline.runner import parse_github_url
+from pipeline.workspace import JobWorkspace
+
+# The draft shows at most this much of the README
+README_MAX_CHARS = 12000
+
+def fetch_overview(repo_name: str, client: httpx.Client) -> dict:
+    """Repository metadata, languages, README and root listing (README and listing may be missing)"""
+    repo = client.get(f"/repos/{repo_name}")
+    repo.raise_for_status()
+    languages = client.get(f"/repos/{repo_name}/languages")
+    listing = client.get(f"/repos/{repo_name}/contents/")
+    readme = client.get(f"/repos/{repo_name}/readme")
+
+    readme_text = None
+    if readme.status_code == 200:
+        try:
+            readme_text = base64.b64decode(readme.json().get("content") or "").decode("utf-8")
+        except (ValueError, UnicodeDecodeError):
+            readme_text = None
+
+    return {
+        "repo": repo.json(),
+        "languages": languages.json() if languages.status_code == 200 else {},
+        "listing": listing.json() if listing.status_code == 200 and isinstance(listing.json(), list) else [],
+        "readme": readme_text,
+    }
+
+
+def _demote_headings(text: str) -> str:
+    """Nest README headings under the draft's README section"""
+    lines = []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            level = len(line) - len(line.lstrip("#"))
+            line = "#" * min(level + 2, 6) + line[level:]
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def build_draft_markdown(repo_name: str, overview: dict) -> str:
+    """Render the overview as markdown in the style of the full documentation"""
+    repo = overview["repo"]
+    lines = [
+        f"# {repo_name}: {repo.get('description') or 'Repository Overview'}",
+        "",
+        "> **Note:** This is a draft overview built from repository metadata. "
+        "The full technical documentation replaces it once it is ready.",
+        "",
+        "## 1. Repository Summary",
+        "",
+        f"- **URL:** {repo.get('html_url', f'https://github.com/{repo_name}')}",
+        f"- **Default branch:** {repo.get('default_branch', 'unknown')}",
+        f"- **License:** {(repo.get('license') or {}).get('name') or 'Not specified'}",
+        f"- **Stars / forks / open issues:** {repo.get('stargazers_count', 0)} / "
+        f"{repo.get('forks_count', 0)} / {repo.get('open_issues_count', 0)}",
+        "",
+    ]
+
+    languages = overview["languages"]
+    if languages:
+        total = sum(languages.values()) or 1
+        lines += ["## 2. Languages", ""]
+        for language, size in sorted(languages.items(), key=lambda item: -item[1]):
+            lines.append(f"- **{language}:** {size * 100 / total:.1f}%")
+        lines.append("")
+
+    listing = sorted(overview["listing"], key=lambda item: (item.get("type") != "dir", item.get("name", "").lower()))
+    if listing:
+        lines += ["## 3. Repository Layout", ""]
+        for item in listing:
+            suffix = "/" if item.get("type") == "dir" else ""
+            lines.append(f"- {item.get('name')}{suffix}")
+        lines.append("")
+
+    readme = overview["readme"]
+    if readme:
+        if len(readme) > README_MAX_CHARS:
+            readme = readme[:README_MAX_CHARS] + "\n\n*(README truncated in the draft)*"
+        lines += ["## 4. README", "", _demote_headings(readme), ""]
+
+    return "\n".join(lines)
+
+
+def generate_draft(repo_url: str, output_dir, client: Optional[httpx.Client] = None) -> Path:
+    """
+    Write the draft markdown and PDF into the job's workspace.
+
+    Returns:
+        Path to the draft PDF
+
+    Raises:
+        ValueError: If the repository URL cannot be parsed
+        httpx.HTTPError: If the repository metadata cannot be fetched
+    """
+    repo_name = parse_github_url(repo_url)
+    workspace = JobWorkspace.create(output_dir)
+    overview = fetch_overview(repo_name, client or get_github_sync_client())
+
+    workspace.draft_markdown_file.write_text(build_draft_markdown(repo_name, overview), encoding="utf-8")
+    generate_pdf(input_file=str(workspace.draft_markdown_file), output_file=str(workspace.draft_pdf_file))
+    return workspace.draft_pdf_file
@@ -0,0 +1,193 @@
+"""
+Which repository files are worth reading.
+
+classify() sorts a file by its path, size and first bytes:
+
+- skip: lockfiles, minified bundles, source maps, vendored directories,
+        binaries (by extension or magic bytes) and generated code (by name
+        or by a marker such as "@generated" or "DO NOT EDIT" in its head)
+- head: source files larger than LARGE_FILE_BYTES; only the first
+        HEAD_CHARS characters are shown, followed by the file's size (and
+        line count, when the whole file had to be downloaded anyway)
+- keep: everything else
+
+Snapshots drop skipped files while extracting, and every file tool applies
+the same rules, so none of them cost bandwidth or model context. Files on
+disk are read with read_file(), which only loads the head of large files.
+FilterStats counts the bytes this saves in a run.
+"""
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+# Larger files are shown head-only
+LARGE_FILE_BYTES = int(os.getenv("LARGE_FILE_BYTES", str(64 * 1024)))
+HEAD_CHARS = int(os.getenv("LARGE_FILE_HEAD_CHARS", "6000"))
+# Bytes of a file's head examined for magic numbers and generated-code markers
+SNIFF_BYTES = 1024
+
+LOCKFILES = {
+    "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "bun.lockb",
+    "uv.lock", "poetry.lock", "pipfile.lock", "pdm.lock", "cargo.lock", "gemfile.lock",
+    "composer.lock", "go.sum", "packages.lock.json", "podfile.lock", "pubspec.lock", "mix.lock",
+}
+VENDORED_DIRS = {"node_modules", "vendor", "third_party", "bower_components", ".git", "__pycache__", ".venv", "venv"}
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tiff", ".psd", ".pdf",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".jar", ".war", ".whl", ".egg",
+    ".exe", ".dll", ".so", ".dylib", ".a", ".o", ".obj", ".class", ".pyc", ".pyo", ".wasm",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".mp3", ".mp4", ".mov", ".avi", ".wav", ".ogg",
+    ".sqlite", ".db", ".pkl", ".pickle", ".npy", ".npz", ".h5", ".onnx", ".pt", ".bin", ".parquet",
+}
+GENERATED_NAME = re.compile(
+    r"(\.min\.(js|css|mjs)|\.map|_pb2(_grpc)?\.pyi?|\.pb\.go|\.pb\.(cc|h)|\.g\.dart|\.freezed\.dart"
+    r"|\.generated\.\w+|\.designer\.cs|-bundle\.js|\.bundle\.js|\.chunk\.js)$",
+    re.IGNORECASE
+)
+GENERATED_MARKERS = re.compile(
+    rb"@generated|DO NOT EDIT|Code generated by|[Aa]uto-?generated by"
+    rb"|(?:[Ff]ile|[Cc]ode) (?:is|was) (?:automatically |auto-?)generated"
+)
+# Prose can mention generated code without being generated
+PROSE_EXTENSIONS = {".md", ".rst", ".txt", ".adoc"}
+MAGIC_NUMBERS = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"%PDF", b"PK\x03\x04", b"\x1f\x8b", b"\x7fELF",
+    b"\xca\xfe\xba\xbe", b"\xcf\xfa\xed\xfe", b"BZh", b"7z\xbc\xaf", b"wOFF", b"\x00asm",
+    b"SQLite format 3",
+)
+
+
+@dataclass
+class Verdict:
+    action: str  # "keep", "head" or "skip"
+    reason: str = ""
+
+
+def looks_binary(text: str) -> bool:
+    """Same heuristic as GithubTools: NUL bytes or many control characters"""
+    if "\x00" in text:
+        return True
+    control = sum(
+        1 for c in text[:1000]
+        if c not in "\t\n\r\x0b\x0c" and (ord(c) < 32 or 0x7F <= ord(c) <= 0x9F)
+    )
+    return control > 200
+
+
+def classify(path: str, size: Optional[int] = None, head: bytes = b"") -> Verdict:
+    """
+    Verdict for a file from its path, and its size and first SNIFF_BYTES when
+    known (the path alone already rules out most noise before any download).
+    """
+    parts = PurePosixPath(path.strip("/")).parts
+    name = parts[-1].lower() if parts else ""
+    if any(part in VENDORED_DIRS for part in parts[:-1]):
+        return Verdict("skip", "vendored dependency")
+    if name in LOCKFILES:
+        return Verdict("skip", "lockfile (the manifest lists the dependencies)")
+    if PurePosixPath(name).suffix in BINARY_EXTENSIONS:
+        return Verdict("skip", "binary file")
+    if GENERATED_NAME.search(name):
+        return Verdict("skip", "generated or minified file")
+    if head:
+        if head.startswith(MAGIC_NUMBERS) or b"\x00" in head:
+            return Verdict("skip", "binary file")
+        if PurePosixPath(name).suffix not in PROSE_EXTENSIONS and GENERATED_MARKERS.search(head):
+            return Verdict("skip", "generated file")
+    if size is not None and size > LARGE_FILE_BYTES:
+        return Verdict("head", f"large file ({size} bytes)")
+    return Verdict("keep")
+
+
+def head_only(text: str, size: int, whole: bool = True) -> str:
+    """The first HEAD_CHARS characters of a large file, followed by its stats (text is its head unless whole)"""
+    if not whole:
+        return text[:HEAD_CHARS] + f"\n... (head only: {size} bytes in total)"
+    lines = len(text.splitlines())
+    return text[:HEAD_CHARS] + f"\n... (head only: {size} bytes, {lines} lines in total)"
+
+
+def _decode_head(raw: bytes) -> str:
+    """Decode the head of a file, dropping a UTF-8 character cut in half at the end"""
+    for cut in range(4):
+        try:
+            return raw[:len(raw) - cut].decode("utf-8")
+        except UnicodeDecodeError as e:
+            if e.start < len(raw) - 4:
+                raise
+    raise UnicodeDecodeError("utf-8", raw, 0, len(raw), "invalid head")
+
+
+class FilterStats:
+    """Files a run skipped or cut to their head, and the bytes that saved (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+        self.truncated_files = 0
+        self.truncated_bytes = 0
+
+    def skipped(self, size: int):
+        with self._lock:
+            self.skipped_files += 1
+            self.skipped_bytes += size or 0
+
+    def truncated(self, saved: int):
+        with self._lock:
+            self.truncated_files += 1
+            self.truncated_bytes += max(saved, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "skipped_files": self.skipped_files,
+                "truncated_files": self.truncated_files,
+                "bytes_saved": self.skipped_bytes + self.truncated_bytes,
+            }
+
+
+def read_text(path: str, raw: bytes, stats: Optional[FilterStats] = None, size: Optional[int] = None) -> dict:
+    """
+    {"content": text} for a file worth reading (head-only if large), or
+    {"skipped": reason} for one that is not. Counts the savings in stats.
+    raw may be just the head of a large file whose full size is `size`.
+    """
+    stats = stats or FilterStats()
+    size = max(size or 0, len(raw))
+    whole = size == len(raw)
+    verdict = classify(path, size, raw[:SNIFF_BYTES])
+    if verdict.action != "skip":
+        try:
+            text = raw.decode("utf-8") if whole else _decode_head(raw)
+        except UnicodeDecodeError:
+            verdict = Verdict("skip", "binary file")
+        else:
+            if looks_binary(text):
+                verdict = Verdict("skip", "binary file")
+    if verdict.action == "skip":
+        stats.skipped(size)
+        return {"skipped": verdict.reason}
+    if verdict.action == "head":
+        content = head_only(text, size, whole)
+        stats.truncated(size - len(content.encode("utf-8")))
+        return {"content": content}
+    return {"content": text}
+
+
+def read_file(file: Path, path: str, stats: Optional[FilterStats] = None) -> dict:
+    """read_text for a file on disk; of a large file only enough bytes for HEAD_CHARS characters are read"""
+    stats = stats or FilterStats()
+    size = file.stat().st_size
+    verdict = classify(path, size)
+    if verdict.action == "skip":
+        stats.skipped(size)
+        return {"skipped": verdict.reason}
+    if verdict.action == "head":
+        with open(file, "rb") as f:
+            # A UTF-8 character takes at most 4 bytes
+            return read_text(path, f.read(HEAD_CHARS * 4), stats, size)
+    return read_text(path, file.read_bytes(), stats)
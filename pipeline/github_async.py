@@ -0,0 +1,498 @@
+"""
+GitHub tools and clients for the pipeline.
+
+Same tool names and JSON shapes as the GithubTools calls the analysis prompt
+asks for, plus get_repository_tree (the whole tree from the git trees API in
+one request) and read_files (many files fetched concurrently, returned in one
+tool result), implemented on httpx: GithubApiTools for the threaded pipeline and
+AsyncGithubTools for the async one, so a tool call waiting on the GitHub API
+does not hold a thread while many jobs share one event loop. Both go through
+the process-wide clients, which pool connections, revalidate responses
+with ETags (see pipeline.github_http) and pace requests against the rate
+limit shared by every worker process (see pipeline.github_rate).
+Lockfiles, binaries and generated files are never returned, and are not
+even downloaded when their path gives them away; large files come back
+head-only (see pipeline.file_filter).
+"""
+import asyncio
+import base64
+import json
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import httpx
+from agno.tools import Toolkit
+
+from pipeline.file_filter import FilterStats, classify, read_text
+from pipeline.github_http import POOL_LIMITS, AsyncCachingTransport, CachingTransport
+from pipeline.github_rate import AsyncRateLimitedTransport, RateLimitedTransport
+from pipeline.repo_tree import TreeEntry, render_tree
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# read_files: paths per call, and characters kept from each file
+READ_FILES_MAX_PATHS = 20
+READ_FILES_MAX_CHARS = int(os.getenv("READ_FILES_MAX_CHARS", "12000"))
+
+# One client per event loop (httpx async clients cannot be shared across loops)
+_clients = weakref.WeakKeyDictionary()
+
+# Plus one blocking client per process for the tools, the draft, the planner and snapshots
+_sync_client = None
+_sync_client_lock = threading.Lock()
+
+
+def github_headers() -> dict:
+    """Request headers for the GitHub REST API (the rate governor adds the token of each request)"""
+    return {"Accept": "application/vnd.github+json"}
+
+
+def get_github_client() -> httpx.AsyncClient:
+    """Return the GitHub API client shared by every job on the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=github_headers(),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            transport=AsyncCachingTransport(transport=AsyncRateLimitedTransport(
+                httpx.AsyncHTTPTransport(limits=POOL_LIMITS), GITHUB_API_URL
+            ))
+        )
+        _clients[loop] = client
+    return client
+
+
+def get_github_sync_client() -> httpx.Client:
+    """Process-wide keep-alive blocking client for the GitHub REST API"""
+    global _sync_client
+    with _sync_client_lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(
+                base_url=GITHUB_API_URL,
+                headers=github_headers(),
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                transport=CachingTransport(transport=RateLimitedTransport(
+                    httpx.HTTPTransport(limits=POOL_LIMITS), GITHUB_API_URL
+                ))
+            )
+        return _sync_client
+
+
+def repository_json(repo: dict) -> str:
+    return json.dumps({
+        "name": repo.get("full_name"),
+        "description": repo.get("description"),
+        "url": repo.get("html_url"),
+        "stars": repo.get("stargazers_count"),
+        "forks": repo.get("forks_count"),
+        "open_issues": repo.get("open_issues_count"),
+        "language": repo.get("language"),
+        "license": (repo.get("license") or {}).get("name"),
+        "default_branch": repo.get("default_branch"),
+    }, indent=2)
+
+
+def relative_path(path: Optional[str], subpath: str) -> Optional[str]:
+    """A repository path as seen by tools scoped to subpath"""
+    if subpath and path and path.startswith(subpath + "/"):
+        return path[len(subpath) + 1:]
+    return path
+
+
+def directory_json(contents, path: str, subpath: str = "") -> str:
+    if not isinstance(contents, list):
+        return json.dumps({"error": f"{path} is a file, not a directory"})
+    items = [
+        {
+            "name": item.get("name"),
+            "path": relative_path(item.get("path"), subpath),
+            "type": item.get("type"),
+            "size": item.get("size"),
+            "sha": item.get("sha"),
+            "url": item.get("html_url"),
+            "download_url": item.get("download_url"),
+        }
+        for item in contents
+    ]
+    items.sort(key=lambda x: (x["type"] != "dir", (x["name"] or "").lower()))
+    return json.dumps(items, indent=2)
+
+
+def file_dict(item, path: str, stats: Optional[FilterStats] = None, subpath: str = "") -> dict:
+    """File metadata and content; "skipped" instead of content for files not worth reading"""
+    if isinstance(item, list):
+        return {"error": f"{path} is a directory, not a file"}
+    try:
+        raw = base64.b64decode(item.get("content") or "")
+    except ValueError:
+        raw = b"\x00"
+
+    return {
+        "name": item.get("name"),
+        "path": relative_path(item.get("path"), subpath),
+        "sha": item.get("sha"),
+        "size": item.get("size"),
+        "type": item.get("type"),
+        "url": item.get("html_url"),
+        **read_text(item.get("path") or path, raw, stats),
+    }
+
+
+def file_json(item, path: str, stats: Optional[FilterStats] = None, subpath: str = "") -> str:
+    return json.dumps(file_dict(item, path, stats, subpath), indent=2)
+
+
+def skipped_by_path(path: str, stats: FilterStats) -> Optional[dict]:
+    """The tool result for a file the path alone rules out (never downloaded), or None"""
+    verdict = classify(path)
+    if verdict.action != "skip":
+        return None
+    stats.skipped(0)
+    return {"path": path, "skipped": verdict.reason}
+
+
+def files_json(results: List[dict], paths: List[str]) -> str:
+    """
+    One read_files result: path, size and content of each file, with the
+    content cut at READ_FILES_MAX_CHARS.
+    """
+    files = []
+    for path, result in zip(paths, results):
+        if "error" in result:
+            files.append({"path": path, "error": result["error"]})
+            continue
+        if "skipped" in result:
+            files.append({"path": path, "size": result.get("size"), "skipped": result["skipped"]})
+            continue
+        content = result["content"]
+        if len(content) > READ_FILES_MAX_CHARS:
+            content = content[:READ_FILES_MAX_CHARS] + f"\n... (truncated, {len(result['content'])} chars in total)"
+        files.append({"path": result.get("path") or path, "size": result.get("size"), "content": content})
+    skipped = paths[len(results):]
+    if skipped:
+        files.append({"error": f"At most {READ_FILES_MAX_PATHS} files per call; not read: {', '.join(skipped)}"})
+    return json.dumps(files, indent=2)
+
+
+# Git object types of the trees API, as the tree listing names them
+TREE_TYPES = {"blob": "file", "tree": "dir", "commit": "submodule"}
+
+
+def tree_text(tree: dict, repo_name: str, ref: Optional[str], path: str) -> str:
+    entries = [
+        TreeEntry(item["path"], TREE_TYPES.get(item.get("type"), "file"), item.get("size") or 0)
+        for item in tree.get("tree", [])
+    ]
+    return render_tree(entries, f"{repo_name}@{ref or 'HEAD'}", path, incomplete=bool(tree.get("truncated")))
+
+
+def _error(e: Exception) -> str:
+    return json.dumps({"error": str(e)})
+
+
+class GithubApiTools(Toolkit):
+    """Read-only repository tools for the analysis agent (blocking)"""
+
+    def __init__(
+        self,
+        client: Optional[httpx.Client] = None,
+        stats: Optional[FilterStats] = None,
+        ref: Optional[str] = None,
+        subpath: str = ""
+    ):
+        self._client = client
+        self.stats = stats or FilterStats()
+        # Scope: the ref read by default, and the directory the tools treat as the repository root
+        self.ref = ref
+        self.subpath = subpath.strip("/")
+        super().__init__(
+            name="github",
+            tools=[
+                self.get_repository,
+                self.get_repository_languages,
+                self.get_repository_tree,
+                self.get_directory_content,
+                self.get_file_content,
+                self.read_files,
+            ]
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        return self._client or get_github_sync_client()
+
+    def _scoped(self, path: str) -> str:
+        return "/".join(part for part in (self.subpath, (path or "").strip("/")) if part)
+
+    def _contents(self, repo_name: str, path: str) -> str:
+        return f"/repos/{repo_name}/contents/{self._scoped(path)}"
+
+    def _get(self, path: str, ref: Optional[str] = None):
+        ref = ref or self.ref
+        response = self.client.get(path, params={"ref": ref} if ref else None)
+        response.raise_for_status()
+        return response.json()
+
+    def get_repository(self, repo_name: str) -> str:
+        """Get details of a specific repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing repository details.
+        """
+        try:
+            return repository_json(self._get(f"/repos/{repo_name}"))
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    def get_repository_languages(self, repo_name: str) -> str:
+        """Get the languages used in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing the list of languages.
+        """
+        try:
+            return json.dumps(self._get(f"/repos/{repo_name}/languages"), indent=2)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    def get_repository_tree(self, repo_name: str, path: str = "", ref: Optional[str] = None) -> str:
+        """Get every directory and file of a repository, recursively, in one call.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str, optional): Only list this directory. Defaults to the whole repository.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to repository's default branch.
+
+        Returns:
+            An indented listing with file sizes and per-directory totals (truncated for huge repositories).
+        """
+        try:
+            ref = ref or self.ref
+            response = self.client.get(f"/repos/{repo_name}/git/trees/{ref or 'HEAD'}", params={"recursive": "1"})
+            response.raise_for_status()
+            return tree_text(response.json(), repo_name, ref, self._scoped(path))
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    def get_directory_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the contents of a directory in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the directory in the repository. Use empty string for root.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing a list of directory contents.
+        """
+        try:
+            return directory_json(self._get(self._contents(repo_name, path), ref), path, self.subpath)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    def get_file_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the content of a file in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the file in the repository.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to the repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing the file content and metadata.
+        """
+        skipped = skipped_by_path(path, self.stats)
+        if skipped:
+            return json.dumps(skipped, indent=2)
+        try:
+            return file_json(self._get(self._contents(repo_name, path), ref), path, self.stats, self.subpath)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    def _file(self, repo_name: str, path: str, ref: Optional[str]) -> dict:
+        skipped = skipped_by_path(path, self.stats)
+        if skipped:
+            return skipped
+        try:
+            return file_dict(self._get(self._contents(repo_name, path), ref), path, self.stats, self.subpath)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    def read_files(self, repo_name: str, paths: List[str], ref: Optional[str] = None) -> str:
+        """Get the contents of several files in one call. Prefer this to repeated get_file_content calls.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            paths (List[str]): The paths of the files in the repository (at most 20).
+            ref (str, optional): The name of the commit/branch/tag. Defaults to the repository's default branch.
+
+        Returns:
+            A JSON-formatted list with the path, size and content of each file (long files are truncated).
+        """
+        wanted = paths[:READ_FILES_MAX_PATHS]
+        if not wanted:
+            return files_json([], paths)
+        with ThreadPoolExecutor(max_workers=min(len(wanted), 8)) as pool:
+            results = list(pool.map(lambda path: self._file(repo_name, path, ref), wanted))
+        return files_json(results, paths)
+
+
+class AsyncGithubTools(Toolkit):
+    """Read-only repository tools for the analysis agent (async)"""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        stats: Optional[FilterStats] = None,
+        ref: Optional[str] = None,
+        subpath: str = ""
+    ):
+        self._client = client
+        self.stats = stats or FilterStats()
+        # Scope: the ref read by default, and the directory the tools treat as the repository root
+        self.ref = ref
+        self.subpath = subpath.strip("/")
+        super().__init__(
+            name="github",
+            tools=[
+                self.get_repository,
+                self.get_repository_languages,
+                self.get_repository_tree,
+                self.get_directory_content,
+                self.get_file_content,
+                self.read_files,
+            ]
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_github_client()
+
+    def _scoped(self, path: str) -> str:
+        return "/".join(part for part in (self.subpath, (path or "").strip("/")) if part)
+
+    def _contents(self, repo_name: str, path: str) -> str:
+        return f"/repos/{repo_name}/contents/{self._scoped(path)}"
+
+    async def _get(self, path: str, ref: Optional[str] = None):
+        ref = ref or self.ref
+        response = await self.client.get(path, params={"ref": ref} if ref else None)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_repository(self, repo_name: str) -> str:
+        """Get details of a specific repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing repository details.
+        """
+        try:
+            return repository_json(await self._get(f"/repos/{repo_name}"))
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    async def get_repository_languages(self, repo_name: str) -> str:
+        """Get the languages used in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing the list of languages.
+        """
+        try:
+            return json.dumps(await self._get(f"/repos/{repo_name}/languages"), indent=2)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    async def get_repository_tree(self, repo_name: str, path: str = "", ref: Optional[str] = None) -> str:
+        """Get every directory and file of a repository, recursively, in one call.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str, optional): Only list this directory. Defaults to the whole repository.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to repository's default branch.
+
+        Returns:
+            An indented listing with file sizes and per-directory totals (truncated for huge repositories).
+        """
+        try:
+            ref = ref or self.ref
+            response = await self.client.get(f"/repos/{repo_name}/git/trees/{ref or 'HEAD'}", params={"recursive": "1"})
+            response.raise_for_status()
+            return tree_text(response.json(), repo_name, ref, self._scoped(path))
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    async def get_directory_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the contents of a directory in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the directory in the repository. Use empty string for root.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing a list of directory contents.
+        """
+        try:
+            return directory_json(await self._get(self._contents(repo_name, path), ref), path, self.subpath)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    async def get_file_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the content of a file in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the file in the repository.
+            ref (str, optional): The name of the commit/branch/tag. Defaults to the repository's default branch.
+
+        Returns:
+            A JSON-formatted string containing the file content and metadata.
+        """
+        skipped = skipped_by_path(path, self.stats)
+        if skipped:
+            return json.dumps(skipped, indent=2)
+        try:
+            return file_json(await self._get(self._contents(repo_name, path), ref), path, self.stats, self.subpath)
+        except httpx.HTTPError as e:
+            return _error(e)
+
+    async def _file(self, repo_name: str, path: str, ref: Optional[str]) -> dict:
+        skipped = skipped_by_path(path, self.stats)
+        if skipped:
+            return skipped
+        try:
+            return file_dict(await self._get(self._contents(repo_name, path), ref), path, self.stats, self.subpath)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    async def read_files(self, repo_name: str, paths: List[str], ref: Optional[str] = None) -> str:
+        """Get the contents of several files in one call. Prefer this to repeated get_file_content calls.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            paths (List[str]): The paths of the files in the repository (at most 20).
+            ref (str, optional): The name of the commit/branch/tag. Defaults to the repository's default branch.
+
+        Returns:
+            A JSON-formatted list with the path, size and content of each file (long files are truncated).
+        """
+        wanted = paths[:READ_FILES_MAX_PATHS]
+        results = await asyncio.gather(*(self._file(repo_name, path, ref) for path in wanted))
+        return files_json(list(results), paths)
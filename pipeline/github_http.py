@@ -0,0 +1,152 @@
+"""
+Shared HTTP layer for the GitHub REST API.
+
+Every GitHub client in the process sends its requests through a caching
+transport. That covers the blocking client used by the tools, the planner
+and the snapshots, and the per-event-loop async clients.
+
+- Connections are pooled and kept alive across jobs.
+- JSON responses that carry an ETag are remembered. The next identical GET
+  sends If-None-Match, and a 304 reply is answered from the stored body.
+  GitHub does not count 304s against the rate limit.
+
+stats() reports how many requests went out and how many of them were
+revalidated.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import httpx
+
+# Remembered responses (least recently used are dropped)
+ETAG_CACHE_ENTRIES = int(os.getenv("GITHUB_ETAG_CACHE_ENTRIES", "5000"))
+# Larger bodies are not worth keeping in memory
+ETAG_CACHE_MAX_BODY = 1024 * 1024
+
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+@dataclass
+class _Stored:
+    etag: str
+    headers: list
+    content: bytes
+
+
+class ETagStore:
+    """Thread-safe LRU map of request -> last ETag-bearing response"""
+
+    def __init__(self, max_entries: int = ETAG_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _Stored]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "not_modified": 0, "stored": 0}
+
+    @staticmethod
+    def key(request: httpx.Request) -> Optional[Tuple[str, str]]:
+        if request.method != "GET":
+            return None
+        return str(request.url), request.headers.get("Accept", "")
+
+    def prepare(self, request: httpx.Request) -> Optional[_Stored]:
+        """Add If-None-Match to the request if a response for it is stored"""
+        key = self.key(request)
+        with self._lock:
+            self._stats["requests"] += 1
+            stored = self._entries.get(key) if key else None
+            if stored is not None:
+                self._entries.move_to_end(key)
+        if stored is not None:
+            request.headers["If-None-Match"] = stored.etag
+        return stored
+
+    def revalidated(self, request: httpx.Request, stored: _Stored) -> httpx.Response:
+        """The stored response, for a request GitHub answered with 304"""
+        with self._lock:
+            self._stats["not_modified"] += 1
+        return httpx.Response(200, headers=stored.headers, content=stored.content, request=request)
+
+    def cacheable(self, request: httpx.Request, response: httpx.Response) -> bool:
+        return (
+            self.key(request) is not None
+            and response.status_code == 200
+            and "etag" in response.headers
+            and response.headers.get("content-type", "").startswith("application/json")
+            and int(response.headers.get("content-length") or 0) <= ETAG_CACHE_MAX_BODY
+        )
+
+    def store(self, request: httpx.Request, response: httpx.Response):
+        """Remember a read (200, ETag, JSON) response"""
+        if len(response.content) > ETAG_CACHE_MAX_BODY:
+            return
+        # httpx has already decoded the body, so drop the headers describing the encoding
+        headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        with self._lock:
+            self._entries[self.key(request)] = _Stored(response.headers["etag"], headers, response.content)
+            self._entries.move_to_end(self.key(request))
+            self._stats["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+# One store for the whole process, shared by the blocking and async clients
+etag_store = ETagStore()
+
+
+class CachingTransport(httpx.BaseTransport):
+    """Pooled transport with ETag revalidation (blocking clients)"""
+
+    def __init__(self, store: ETagStore = None, transport: httpx.BaseTransport = None):
+        self.store = store or etag_store
+        self._transport = transport or httpx.HTTPTransport(limits=POOL_LIMITS)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        stored = self.store.prepare(request)
+        response = self._transport.handle_request(request)
+        if stored is not None and response.status_code == 304:
+            response.close()
+            return self.store.revalidated(request, stored)
+        if self.store.cacheable(request, response):
+            response.read()
+            self.store.store(request, response)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncCachingTransport(httpx.AsyncBaseTransport):
+    """Pooled transport with ETag revalidation (async clients)"""
+
+    def __init__(self, store: ETagStore = None, transport: httpx.AsyncBaseTransport = None):
+        self.store = store or etag_store
+        self._transport = transport or httpx.AsyncHTTPTransport(limits=POOL_LIMITS)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stored = self.store.prepare(request)
+        response = await self._transport.handle_async_request(request)
+        if stored is not None and response.status_code == 304:
+            await response.aclose()
+            return self.store.revalidated(request, stored)
+        if self.store.cacheable(request, response):
+            await response.aread()
+            self.store.store(request, response)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def stats() -> dict:
+    """Requests sent, 304 revalidations and stored responses of this process"""
+    return etag_store.stats()
@@ -0,0 +1,316 @@
+"""
+GitHub rate-limit governor shared by every worker process on the host.
+
+GitHub allows each token 5000 REST requests an hour (60 without a token).
+Every response reports what is left (X-RateLimit-Remaining) and when the
+window resets (X-RateLimit-Reset). The governor keeps that budget, for
+every token of the pool, in a small JSON file under GITHUB_RATE_STATE_DIR,
+guarded by an advisory file lock, so all workers draw from the same count:
+
+- a request takes the token with the earliest free slot (the one with the
+  most budget left, when several are free), so the pool is used evenly
+- while a token has more than RESERVE_FRACTION of its limit left, its
+  requests go out at once
+- below that, its remaining requests are spread evenly until the reset
+- with nothing left, requests queue until the window resets, unless that
+  is more than MAX_WAIT_SECONDS away: they fail with RateLimitExhausted, as
+  a sleeping tool call holds its job (and its lease) and ignores cancellation
+- a conditional request answered with 304 Not Modified gives its slot
+  back, as GitHub does not count it
+
+A request GitHub still rejects (403/429 with no budget left, or a
+Retry-After) updates the budget and is sent again once the governor allows,
+so jobs slow down instead of failing. The token pool comes from
+GITHUB_TOKENS (comma-separated), else GITHUB_ACCESS_TOKEN; state files
+only ever hold a hash of each token.
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import httpx
+
+GITHUB_RATE_STATE_DIR = Path(os.getenv(
+    "GITHUB_RATE_STATE_DIR", str(Path(__file__).parent.parent.absolute() / "storage" / "github_rate")
+))
+# Share of a token's hourly limit below which its requests are paced
+RESERVE_FRACTION = float(os.getenv("GITHUB_RATE_RESERVE_FRACTION", "0.05"))
+# Longer waits fail the request instead of blocking its tool call
+MAX_WAIT_SECONDS = float(os.getenv("GITHUB_RATE_MAX_WAIT_SECONDS", "60"))
+# Times a rate-limited request is sent again
+RATE_LIMIT_RETRIES = 3
+
+AUTHENTICATED_LIMIT = 5000
+ANONYMOUS_LIMIT = 60
+WINDOW_SECONDS = 3600
+
+
+class RateLimitExhausted(httpx.RequestError):
+    """No token has budget left within MAX_WAIT_SECONDS"""
+
+
+@contextmanager
+def _locked(path: Path):
+    """Exclusive advisory lock on a file, shared by every process on the host"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def configured_tokens() -> List[Optional[str]]:
+    """Token pool from GITHUB_TOKENS, else GITHUB_ACCESS_TOKEN, else [None] (anonymous)"""
+    pool = [token for token in os.getenv("GITHUB_TOKENS", "").replace(",", " ").split() if token]
+    if not pool and os.getenv("GITHUB_ACCESS_TOKEN"):
+        pool = [os.getenv("GITHUB_ACCESS_TOKEN")]
+    return pool or [None]
+
+
+def token_id(token: Optional[str]) -> str:
+    return "anonymous" if token is None else hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+def rejected(response: httpx.Response) -> bool:
+    """Whether GitHub turned the request down for rate limiting (not for permissions)"""
+    return response.status_code in (403, 429) and (
+        response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers
+    )
+
+
+class RateGovernor:
+    """Cross-process budget of a token pool; acquire() before a request, update() after it"""
+
+    def __init__(
+        self,
+        tokens: Optional[List[Optional[str]]] = None,
+        state_dir=None,
+        reserve_fraction: float = None,
+        max_wait: float = None,
+        clock=time.time
+    ):
+        self.tokens = list(tokens) if tokens else configured_tokens()
+        self.root = Path(state_dir or GITHUB_RATE_STATE_DIR)
+        self.reserve_fraction = RESERVE_FRACTION if reserve_fraction is None else reserve_fraction
+        self.max_wait = MAX_WAIT_SECONDS if max_wait is None else max_wait
+        self.clock = clock
+
+    @property
+    def _lock_file(self) -> Path:
+        return self.root / "state.lock"
+
+    @property
+    def _state_file(self) -> Path:
+        return self.root / "state.json"
+
+    def _read(self) -> dict:
+        try:
+            state = json.loads(self._state_file.read_text())
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("tokens", {})
+        state.setdefault("stats", {})
+        for key in ("requests", "paced", "waited_seconds", "rejected", "revalidated"):
+            state["stats"].setdefault(key, 0)
+        return state
+
+    def _write(self, state: dict):
+        # Readers (stats()) do not take the lock, so replace the file atomically
+        staging = self._state_file.with_suffix(f".{os.getpid()}.tmp")
+        staging.write_text(json.dumps(state))
+        os.replace(staging, self._state_file)
+
+    def _bucket(self, state: dict, token: Optional[str], now: float) -> dict:
+        """Budget of a token, refilled if its window has reset"""
+        bucket = state["tokens"].get(token_id(token))
+        if bucket is None or now >= bucket["reset"]:
+            limit = bucket["limit"] if bucket else AUTHENTICATED_LIMIT if token else ANONYMOUS_LIMIT
+            bucket = {"limit": limit, "remaining": limit, "reset": now + WINDOW_SECONDS, "next_at": 0.0}
+            state["tokens"][token_id(token)] = bucket
+        return bucket
+
+    def _reserve(self, bucket: dict) -> int:
+        return int(bucket["limit"] * self.reserve_fraction)
+
+    def _slot(self, bucket: dict, now: float) -> float:
+        """Earliest time the token may send its next request"""
+        if bucket["remaining"] <= 0:
+            return max(bucket["reset"], bucket["next_at"])
+        return max(now, bucket["next_at"])
+
+    def acquire(self) -> Tuple[Optional[str], float]:
+        """
+        (token, seconds to wait before sending) for the next request. The
+        request is counted against the token right away, so concurrent
+        callers in any process see it. Raises RateLimitExhausted.
+        """
+        with _locked(self._lock_file):
+            state = self._read()
+            now = self.clock()
+            # Earliest slot first; among free tokens, the one with the most budget left
+            token, slot, _ = min(
+                (
+                    (token, self._slot(bucket, now), -bucket["remaining"])
+                    for token, bucket in ((token, self._bucket(state, token, now)) for token in self.tokens)
+                ),
+                key=lambda choice: choice[1:]
+            )
+            wait = max(slot - now, 0.0)
+            if wait > self.max_wait:
+                raise RateLimitExhausted(f"GitHub rate limit exhausted for the next {wait:.0f}s on every token")
+            bucket = self._bucket(state, token, now)
+            bucket["remaining"] = max(bucket["remaining"] - 1, 0)
+            # Spread what is left of a low budget evenly until the reset
+            low = 0 < bucket["remaining"] <= self._reserve(bucket)
+            bucket["next_at"] = slot + ((bucket["reset"] - slot) / bucket["remaining"] if low else 0.0)
+            stats = state["stats"]
+            stats["requests"] += 1
+            if wait:
+                stats["paced"] += 1
+                stats["waited_seconds"] = round(stats["waited_seconds"] + wait, 3)
+            self._write(state)
+        return token, wait
+
+    def update(self, token: Optional[str], response: httpx.Response):
+        """
+        Correct the token's budget from the rate-limit headers of a response,
+        refunding the slot of a 304 (ETag revalidations are free on GitHub)
+        """
+        headers = response.headers
+        # Search, GraphQL and other resources have budgets of their own
+        if headers.get("x-ratelimit-resource", "core") != "core":
+            return
+        remaining, reset = headers.get("x-ratelimit-remaining"), headers.get("x-ratelimit-reset")
+        is_rejected = rejected(response)
+        revalidated = response.status_code == 304
+        if remaining is None and not is_rejected and not revalidated:
+            return
+        with _locked(self._lock_file):
+            state = self._read()
+            now = self.clock()
+            bucket = self._bucket(state, token, now)
+            if remaining is not None and reset is not None:
+                if headers.get("x-ratelimit-limit"):
+                    bucket["limit"] = int(headers["x-ratelimit-limit"])
+                if int(reset) != int(bucket["reset"]):
+                    bucket["reset"] = int(reset)
+                    bucket["remaining"] = int(remaining)
+                else:
+                    # Requests granted since GitHub counted this one are already deducted
+                    bucket["remaining"] = min(bucket["remaining"] + revalidated, int(remaining))
+            elif revalidated:
+                bucket["remaining"] = min(bucket["remaining"] + 1, bucket["limit"])
+            if revalidated:
+                state["stats"]["revalidated"] += 1
+            if is_rejected:
+                state["stats"]["rejected"] += 1
+                retry_after = headers.get("retry-after")
+                if retry_after and retry_after.isdigit():
+                    bucket["next_at"] = max(bucket["next_at"], now + int(retry_after))
+            self._write(state)
+
+    def stats(self) -> dict:
+        """Budget of every token (by hash) and how often requests were paced or rejected"""
+        state = self._read()
+        now = self.clock()
+        return {
+            **state["stats"],
+            "tokens": [
+                {
+                    "token": token_id(token),
+                    **{key: state["tokens"][token_id(token)][key] for key in ("limit", "remaining")},
+                    "resets_in_seconds": max(round(state["tokens"][token_id(token)]["reset"] - now), 0),
+                }
+                for token in self.tokens if token_id(token) in state["tokens"]
+            ],
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> RateGovernor:
+    """Governor of this process's token pool (its state is shared with every process)"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateGovernor()
+        return _governor
+
+
+def _authorize(request: httpx.Request, token: Optional[str]):
+    if token:
+        request.headers["Authorization"] = f"Bearer {token}"
+    else:
+        request.headers.pop("Authorization", None)
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Paces requests to api_url through the governor (blocking clients); other hosts pass through"""
+
+    def __init__(self, transport: httpx.BaseTransport, api_url: str, governor: RateGovernor = None):
+        self._transport = transport
+        self.host = httpx.URL(api_url).host
+        self.governor = governor
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        # Tarball downloads are redirected to codeload, which is not rate limited
+        if request.url.host != self.host:
+            return self._transport.handle_request(request)
+        governor = self.governor or get_governor()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            token, wait = governor.acquire()
+            if wait:
+                time.sleep(wait)
+            _authorize(request, token)
+            response = self._transport.handle_request(request)
+            governor.update(token, response)
+            if not rejected(response) or attempt == RATE_LIMIT_RETRIES:
+                return response
+            response.close()
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Paces requests to api_url through the governor (async clients); other hosts pass through"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, api_url: str, governor: RateGovernor = None):
+        self._transport = transport
+        self.host = httpx.URL(api_url).host
+        self.governor = governor
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host != self.host:
+            return await self._transport.handle_async_request(request)
+        governor = self.governor or get_governor()
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            # The governor blocks on a file lock shared with other processes; keep it off the event loop
+            token, wait = await asyncio.to_thread(governor.acquire)
+            if wait:
+                await asyncio.sleep(wait)
+            _authorize(request, token)
+            response = await self._transport.handle_async_request(request)
+            await asyncio.to_thread(governor.update, token, response)
+            if not rejected(response) or attempt == RATE_LIMIT_RETRIES:
+                return response
+            await response.aclose()
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def stats() -> dict:
+    """Shared budget of this process's token pool"""
+    return get_governor().stats()
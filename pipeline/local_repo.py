@@ -0,0 +1,186 @@
+"""
+Repositories on the local disk instead of GitHub.
+
+A repository URL that is a file:// URL or an explicit path (/srv/code/app,
+./app, ~/app) is read locally: the files git does not ignore are copied out
+of a working tree, and a bare git repository is exported with `git archive`,
+into the job workspace. Either way the analysis agent gets SnapshotTools
+over that copy (never .git, .env or other ignored files), so these jobs make
+no GitHub requests at all, which also makes them the offline path for
+benchmarks.
+
+The API only accepts local repositories under one of the LOCAL_REPO_ROOTS
+(os.pathsep-separated); the CLI and batch runner accept any path.
+"""
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from pipeline.file_filter import SNIFF_BYTES, classify
+from pipeline.snapshot import SNAPSHOT_MAX_BYTES, RepoSnapshot, SnapshotTooLarge, extract_archive
+
+# Prefix of the repository name of local jobs (in place of the GitHub owner)
+LOCAL_OWNER = "local"
+
+LOCAL_REPO_ROOTS = [Path(root).resolve() for root in os.getenv("LOCAL_REPO_ROOTS", "").split(os.pathsep) if root]
+
+GIT_TIMEOUT_SECONDS = 60
+
+
+def local_repo_path(url: str) -> Optional[Path]:
+    """
+    Directory of a local repository URL, or None for a GitHub URL.
+    Raises ValueError if the URL is local but the directory does not exist.
+    """
+    url = url.strip()
+    if url.startswith("file://"):
+        path = Path(unquote(urlparse(url).path))
+    elif url.startswith(("/", "./", "../", "~")) or url in (".", ".."):
+        path = Path(url).expanduser()
+    else:
+        return None
+    path = path.resolve()
+    if not path.is_dir():
+        raise ValueError(f"Local repository not found: {url}")
+    return path
+
+
+def local_repo_name(path: Path) -> str:
+    """local/<directory name>, without a .git suffix (path/to/app.git -> local/app)"""
+    name = path.parent.name if path.name == ".git" else path.name
+    return f"{LOCAL_OWNER}/{name[:-4] if name.endswith('.git') else name}"
+
+
+def allowed_in_api(path: Path) -> bool:
+    """Whether the API may read this directory (it must be under LOCAL_REPO_ROOTS)"""
+    return any(path == root or root in path.parents for root in LOCAL_REPO_ROOTS)
+
+
+def is_bare(path: Path) -> bool:
+    return (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+
+
+def _git(path: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", f"--git-dir={path}", *args],
+        capture_output=True, text=True, check=True, timeout=GIT_TIMEOUT_SECONDS
+    )
+    return result.stdout
+
+
+def work_tree(path: Path) -> Optional[Path]:
+    """Root of the git working tree that contains path (e.g. a monorepo package), or None"""
+    return next((directory for directory in (path, *path.parents) if (directory / ".git").exists()), None)
+
+
+def head_sha(path: Path) -> str:
+    """Commit checked out in the repository, or "working-tree" if it is not a git repository"""
+    root = work_tree(path)
+    git_dir = path if is_bare(path) else root / ".git" if root else None
+    if git_dir is None:
+        return "working-tree"
+    try:
+        return _git(git_dir, "rev-parse", "HEAD").strip()
+    except (OSError, subprocess.SubprocessError):
+        return "working-tree"
+
+
+def list_files(path: Path) -> Iterator[Tuple[str, int]]:
+    """
+    (relative path, size) of every file: HEAD's tree for a bare repository,
+    the files git does not ignore for a working tree or a directory inside
+    one (its repository's .gitignore applies), else every file.
+    """
+    if is_bare(path):
+        # <mode> <type> <sha> <size>\t<path>
+        for line in _git(path, "ls-tree", "-r", "-l", "HEAD").splitlines():
+            meta, name = line.split("\t", 1)
+            size = meta.split()[3]
+            if size != "-":
+                yield name, int(size)
+        return
+    root = work_tree(path)
+    if root is not None:
+        names = _git(
+            root / ".git", "--literal-pathspecs", f"--work-tree={root}",
+            "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", path.relative_to(root).as_posix()
+        )
+        files = (root / name for name in names.split("\0") if name)
+    else:
+        files = (Path(current) / name for current, _, names in os.walk(path) for name in names)
+    for file in files:
+        if file.is_file() and ".git" not in file.relative_to(path).parts:
+            yield file.relative_to(path).as_posix(), file.stat().st_size
+
+
+def top_level_directories(path: Path) -> List[str]:
+    if is_bare(path):
+        return _git(path, "ls-tree", "-d", "--name-only", "HEAD").splitlines()
+    return sorted(entry.name for entry in path.iterdir() if entry.is_dir() and entry.name != ".git")
+
+
+def export_files(path: Path, dest: Path, repo_name: str) -> RepoSnapshot:
+    """
+    Copy the files list_files sees (less those pipeline.file_filter skips)
+    into dest, replacing its contents. Raises SnapshotTooLarge.
+    """
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+
+    snapshot = RepoSnapshot(root=dest, repo_name=repo_name)
+    for name, size in list_files(path):
+        if classify(name, size).action == "skip":
+            snapshot.skipped_files += 1
+            snapshot.skipped_bytes += size
+            continue
+        with open(path / name, "rb") as source:
+            head = source.read(SNIFF_BYTES)
+            if classify(name, size, head).action == "skip":
+                snapshot.skipped_files += 1
+                snapshot.skipped_bytes += size
+                continue
+            snapshot.bytes += size
+            if snapshot.bytes > SNAPSHOT_MAX_BYTES:
+                raise SnapshotTooLarge(f"{repo_name} is larger than {SNAPSHOT_MAX_BYTES} bytes")
+            target = dest / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(head)
+                shutil.copyfileobj(source, f)
+        snapshot.files += 1
+    return snapshot
+
+
+def open_snapshot(path: Path, dest: Path, repo_name: str) -> RepoSnapshot:
+    """
+    RepoSnapshot of a local repository in dest: a working tree's files that
+    git does not ignore, or a bare repository's HEAD (raises SnapshotTooLarge).
+    """
+    sha = head_sha(path)
+    if not is_bare(path):
+        # Not the directory itself: the tools would read .git, .env and node_modules from it
+        snapshot = export_files(path, dest, repo_name)
+        snapshot.sha, snapshot.working_tree = sha, True
+        return snapshot
+
+    # Same layout as GitHub's tarballs: one top-level folder named <repo>-<sha>
+    archive = subprocess.Popen(
+        ["git", f"--git-dir={path}", "archive", "--format=tar.gz", f"--prefix={path.name}-{sha}/", "HEAD"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        snapshot = extract_archive(archive.stdout, dest, repo_name)
+    except BaseException:
+        archive.kill()
+        raise
+    finally:
+        archive.stdout.close()
+        archive.wait(timeout=GIT_TIMEOUT_SECONDS)
+    if archive.returncode != 0:
+        raise subprocess.CalledProcessError(archive.returncode, "git archive", stderr=archive.stderr.read())
+    snapshot.sha = sha
+    return snapshot
@@ -0,0 +1,89 @@
+"""
+Depth modes for document generation.
+
+A mode trades depth for latency: it sets how many files the analysis agent
+may read, how many tool calls (exploration rounds) it gets, which model and
+output budget each stage uses, how many tokens of context the models get,
+whether the workflow diagram is produced, whether the static scan may
+replace the LLM analysis, and the end-to-end latency the mode is expected
+to meet.
+"""
+from dataclasses import dataclass, field
+from typing import Dict
+
+FAST_MODEL_ID = "google/gemini-2.5-flash-lite"
+STANDARD_MODEL_ID = "google/gemini-2.5-flash"
+DEEP_MODEL_ID = "google/gemini-2.5-pro"
+
+
+@dataclass(frozen=True)
+class DepthMode:
+    """Generation settings for one depth mode"""
+    name: str
+    max_files: int  # Files the analysis may read, each read_files path counting once (enforced by agents.limit_file_reads)
+    max_tool_calls: int  # Exploration rounds for the analysis agent
+    analysis_model: str
+    documentation_model: str
+    workflow_model: str
+    max_tokens: int  # Output budget of the documentation model
+    diagram: bool  # Produce the workflow JSON and diagram
+    concise: bool  # Ask for a short summary instead of the full manual
+    latency_target_seconds: float  # End-to-end target for a typical repository
+    stage_budgets: Dict[str, float] = field(default_factory=dict)  # Overrides of DEFAULT_STAGE_BUDGETS
+    static_analysis: bool = False  # Analyze with the static scan alone (no LLM) when it found enough
+    context_tokens: int = 20000  # Budget of the packed key files and of the documenter's analysis context
+
+
+MODES = {
+    "fast": DepthMode(
+        name="fast",
+        max_files=5,
+        max_tool_calls=8,
+        analysis_model=FAST_MODEL_ID,
+        documentation_model=FAST_MODEL_ID,
+        workflow_model=FAST_MODEL_ID,
+        max_tokens=1500,
+        diagram=False,
+        concise=True,
+        latency_target_seconds=30,
+        stage_budgets={"analysis": 20, "documentation": 20, "render": 15},
+        static_analysis=True,
+        context_tokens=6000,
+    ),
+    "standard": DepthMode(
+        name="standard",
+        max_files=25,
+        max_tool_calls=40,
+        analysis_model=STANDARD_MODEL_ID,
+        documentation_model=STANDARD_MODEL_ID,
+        workflow_model=STANDARD_MODEL_ID,
+        max_tokens=4000,
+        diagram=True,
+        concise=False,
+        latency_target_seconds=180,
+    ),
+    "deep": DepthMode(
+        name="deep",
+        max_files=80,
+        max_tool_calls=120,
+        analysis_model=DEEP_MODEL_ID,
+        documentation_model=DEEP_MODEL_ID,
+        workflow_model=STANDARD_MODEL_ID,
+        max_tokens=12000,
+        diagram=True,
+        concise=False,
+        latency_target_seconds=600,
+        stage_budgets={"analysis": 900, "documentation": 600, "workflow": 240, "diagram": 60, "render": 120},
+        context_tokens=60000,
+    ),
+}
+
+DEFAULT_MODE = "standard"
+
+
+def get_mode(name: str = None) -> DepthMode:
+    """Look up a mode by name (None means the default). Raises ValueError for unknown modes."""
+    name = name or DEFAULT_MODE
+    if name not in MODES:
+        raise ValueError(f"Unknown mode '{name}'; expected one of {sorted(MODES)}")
+    return MODES[name]
@@ -0,0 +1,174 @@
+"""
+Per-package documentation of monorepos.
+
+find_packages() takes a repository's file list and returns the directories
+holding a package manifest (pyproject.toml, package.json, go.mod, ...).
+run_packages() documents each of them as its own pipeline job, scoped to
+the package directory (.../tree/<ref>/<package>), several at a time, and
+writes an index document linking the per-package PDFs:
+
+    output_dir/
+        index.md, index.pdf
+        packages/services__billing/technical_documentation.pdf
+        packages/web/technical_documentation.pdf
+
+A package that fails does not stop the others; it is listed as failed in
+the index.
+"""
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterable, List, Optional
+
+from doc_creation import generate_pdf
+from pipeline import local_repo
+from pipeline.file_filter import VENDORED_DIRS
+from pipeline.github_async import get_github_sync_client
+from pipeline.runner import PipelineResult, parse_repo_url, parse_tree_path, run_pipeline
+
+PACKAGE_MANIFESTS = {
+    "pyproject.toml", "setup.py", "setup.cfg", "package.json", "go.mod", "Cargo.toml",
+    "pom.xml", "build.gradle", "build.gradle.kts", "composer.json", "Gemfile", "mix.exs", "pubspec.yaml",
+}
+# More packages than this are not documented one by one (the first ones, by path, are)
+MAX_PACKAGES = int(os.getenv("MONOREPO_MAX_PACKAGES", "20"))
+
+PACKAGES_DIR = "packages"
+INDEX_MARKDOWN_FILE = "index.md"
+INDEX_PDF_FILE = "index.pdf"
+
+
+@dataclass
+class PackageOutcome:
+    """Result of documenting one package"""
+    path: str
+    result: Optional[PipelineResult] = None
+    error: Optional[str] = None
+
+
+def find_packages(paths: Iterable[str], limit: Optional[int] = None) -> List[str]:
+    """
+    Directories (relative to the repository root) that contain a package
+    manifest, sorted. The root itself and vendored directories do not count.
+    """
+    limit = MAX_PACKAGES if limit is None else limit
+    packages = set()
+    for path in paths:
+        parts = PurePosixPath(path).parts
+        if len(parts) < 2 or parts[-1] not in PACKAGE_MANIFESTS:
+            continue
+        if any(part in VENDORED_DIRS or part.startswith(".") for part in parts[:-1]):
+            continue
+        packages.add("/".join(parts[:-1]))
+    found = sorted(packages)
+    if len(found) > limit:
+        print(f"⚠️  Warning: {len(found)} packages found, documenting the first {limit}")
+    return found[:limit]
+
+
+def repository_files(repo_url: str) -> List[str]:
+    """Paths of every file of a repository (one git trees request for GitHub)"""
+    path = local_repo.local_repo_path(repo_url)
+    if path is not None:
+        return [name for name, _ in local_repo.list_files(path)]
+    repo_name = parse_repo_url(repo_url)
+    ref, subpath = parse_tree_path(repo_url)
+    response = get_github_sync_client().get(f"/repos/{repo_name}/git/trees/{ref or 'HEAD'}", params={"recursive": "1"})
+    response.raise_for_status()
+    prefix = f"{subpath}/" if subpath else ""
+    return [
+        item["path"][len(prefix):] for item in response.json().get("tree", [])
+        if item.get("type") == "blob" and item["path"].startswith(prefix)
+    ]
+
+
+def package_url(repo_url: str, package: str) -> str:
+    """
+    URL of a pipeline job scoped to one package of the repository. A local
+    package is its directory; pipeline.local_repo still lists it from the
+    enclosing repository (its .gitignore and HEAD).
+    """
+    path = local_repo.local_repo_path(repo_url)
+    if path is not None:
+        return str(path / package)
+    ref, subpath = parse_tree_path(repo_url)
+    scoped = "/".join(part for part in (subpath, package) if part)
+    return f"https://github.com/{parse_repo_url(repo_url)}/tree/{ref or 'HEAD'}/{scoped}"
+
+
+def write_index(repo_url: str, outcomes: List[PackageOutcome], output_dir: Path) -> Path:
+    """Index document of a per-package run (markdown and PDF); returns the PDF"""
+    lines = [
+        f"# {parse_repo_url(repo_url)}: package documentation", "",
+        f"{len(outcomes)} packages, each documented on its own.", "",
+    ]
+    for outcome in outcomes:
+        lines.append(f"## {outcome.path}")
+        lines.append("")
+        if outcome.result is None:
+            lines.append(f"- Failed: {outcome.error}")
+        else:
+            lines.append(f"- Documentation: {outcome.result.pdf_file.relative_to(output_dir)}")
+            lines.append(f"- Strategy: {outcome.result.strategy or 'full'} ({outcome.result.mode} mode)")
+            summary = first_paragraph(outcome.result.content_file)
+            if summary:
+                lines += ["", summary]
+        lines.append("")
+    markdown_file = output_dir / INDEX_MARKDOWN_FILE
+    markdown_file.write_text("\n".join(lines), encoding="utf-8")
+    pdf_file = output_dir / INDEX_PDF_FILE
+    generate_pdf(input_file=str(markdown_file), output_file=str(pdf_file))
+    return pdf_file
+
+
+def first_paragraph(content_file: Path) -> str:
+    """First prose paragraph of a generated document (its headings and images skipped)"""
+    try:
+        text = content_file.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    for block in text.split("\n\n"):
+        block = block.strip()
+        if block and not block.startswith(("#", "!", "```", "-", "*", "|")):
+            return block
+    return ""
+
+
+def run_packages(
+    repo_url: str,
+    question: str,
+    output_dir,
+    mode: Optional[str] = None,
+    parallelism: int = 4,
+    resume: bool = True
+) -> List[PackageOutcome]:
+    """
+    Document every package of a monorepo in parallel, then write the index.
+    Raises ValueError if the repository URL is invalid or holds no packages.
+    """
+    parse_repo_url(repo_url)
+    packages = find_packages(repository_files(repo_url))
+    if not packages:
+        raise ValueError(f"No packages found in {repo_url} (looked for {', '.join(sorted(PACKAGE_MANIFESTS))})")
+    output_dir = Path(output_dir).absolute()
+    print(f"Documenting {len(packages)} packages: {', '.join(packages)}")
+
+    def document(package: str) -> PackageOutcome:
+        try:
+            result = run_pipeline(
+                package_url(repo_url, package), question,
+                output_dir / PACKAGES_DIR / package.replace("/", "__"), resume=resume, mode=mode
+            )
+            return PackageOutcome(package, result=result)
+        except Exception as e:
+            traceback.print_exc()
+            return PackageOutcome(package, error=f"{e.__class__.__name__}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="git2doc-package") as pool:
+        outcomes = list(pool.map(document, packages))
+    index = write_index(repo_url, outcomes, output_dir)
+    failed = [outcome.path for outcome in outcomes if outcome.result is None]
+    print(f"Index saved to {index}" + (f" ({len(failed)} failed: {', '.join(failed)})" if failed else ""))
+    return outcomes
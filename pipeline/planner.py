@@ -0,0 +1,212 @@
+"""
+Analysis strategy planner.
+
+Before any LLM call, plan_job() looks at cheap repository signals (size,
+language mix and the top-level directories, three GitHub requests) and picks
+how the analysis stage reads the repository:
+
+- full:       small repositories; read every file that matters
+- sampled:    larger ones; README, manifests, entry points and a few
+              representative modules
+- map_reduce: large repositories with several packages; one analysis agent
+              per top-level directory in parallel, merged into one analysis
+
+Local repositories (see pipeline.local_repo) are profiled from the disk.
+The plan never makes a job fail: if the metadata cannot be fetched the job
+falls back to the sampled strategy.
+"""
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from pipeline import local_repo
+from pipeline.github_async import get_github_sync_client
+from pipeline.modes import DepthMode, get_mode
+from pipeline.snapshot import EXTENSION_LANGUAGES
+
+STRATEGIES = ("full", "sampled", "map_reduce")
+
+# Repository size (GitHub's "size", in KB) up to which everything is read
+FULL_MAX_KB = 1024
+# Repository size from which the analysis is split per top-level directory
+MAP_REDUCE_MIN_KB = 20_000
+# More languages than this means a mixed codebase that is sampled, not read whole
+FULL_MAX_LANGUAGES = 3
+
+# Every partition needs a few file reads to say anything useful
+MIN_FILES_PER_PARTITION = 4
+MAX_PARTITIONS = 6
+
+# Directories that describe or support the code rather than being part of it
+SKIP_DIRS = {
+    "docs", "doc", "test", "tests", "examples", "example", "assets", "static",
+    "vendor", "node_modules", "dist", "build", "third_party",
+}
+# Looked at first when there are more directories than partitions
+SOURCE_DIRS = ("src", "lib", "app", "api", "core", "pkg", "cmd", "packages", "services")
+
+
+@dataclass
+class RepoProfile:
+    """Cheap repository signals the planner decides on"""
+    repo_name: str
+    size_kb: int
+    languages: Dict[str, int]  # Bytes of code per language
+    directories: List[str]  # Top-level directories
+    repository_kb: int = 0  # Whole repository, when the profile covers only a subpath of it
+
+
+@dataclass
+class Plan:
+    """How the analysis stage reads the repository (JSON-serializable for checkpoints)"""
+    strategy: str
+    max_files: int  # File reads per analysis agent
+    partitions: List[str] = field(default_factory=list)  # map_reduce only; "" is the repository root
+    size_kb: int = 0
+    languages: List[str] = field(default_factory=list)
+    reason: str = ""
+    repository_kb: int = 0  # Whole repository of a subpath plan (the snapshot downloads all of it)
+
+
+def fetch_profile(repo_name: str, client: Optional[httpx.Client] = None) -> RepoProfile:
+    """Fetch size, languages and top-level directories (raises httpx.HTTPError)"""
+    client = client or get_github_sync_client()
+    repo = client.get(f"/repos/{repo_name}")
+    repo.raise_for_status()
+    languages = client.get(f"/repos/{repo_name}/languages")
+    listing = client.get(f"/repos/{repo_name}/contents/")
+
+    entries = listing.json() if listing.status_code == 200 else []
+    return RepoProfile(
+        repo_name=repo_name,
+        size_kb=int(repo.json().get("size") or 0),
+        languages=languages.json() if languages.status_code == 200 else {},
+        directories=[
+            item["name"] for item in entries
+            if isinstance(entries, list) and item.get("type") == "dir"
+        ],
+    )
+
+
+def fetch_tree_profile(
+    repo_name: str,
+    subpath: str,
+    ref: Optional[str] = None,
+    client: Optional[httpx.Client] = None
+) -> RepoProfile:
+    """
+    Profile of one directory of a repository, from a single git trees request,
+    plus the size of the whole repository (raises httpx.HTTPError)
+    """
+    client = client or get_github_sync_client()
+    response = client.get(f"/repos/{repo_name}/git/trees/{ref or 'HEAD'}", params={"recursive": "1"})
+    response.raise_for_status()
+    tree = response.json()
+    prefix = subpath.strip("/") + "/"
+    entries = [
+        {**item, "path": item["path"][len(prefix):]}
+        for item in tree.get("tree", []) if item["path"].startswith(prefix)
+    ]
+    if not entries:
+        raise ValueError(f"{subpath} is not a directory of {repo_name}")
+    profile = profile_from_files(
+        repo_name,
+        [(item["path"], item.get("size") or 0) for item in entries if item.get("type") == "blob"],
+        [item["path"] for item in entries if item.get("type") == "tree" and "/" not in item["path"]],
+    )
+    profile.repository_kb = sum(item.get("size") or 0 for item in tree.get("tree", [])) // 1024
+    if tree.get("truncated"):
+        # GitHub cut the listing short, so the sum is a lower bound; the metadata has the real size
+        repo = client.get(f"/repos/{repo_name}")
+        repo.raise_for_status()
+        profile.repository_kb = max(profile.repository_kb, int(repo.json().get("size") or 0))
+    return profile
+
+
+def profile_from_files(repo_name: str, files, directories: List[str]) -> RepoProfile:
+    """Profile from (path, size) pairs, with languages guessed from the extensions"""
+    size, languages = 0, {}
+    for name, file_size in files:
+        size += file_size
+        language = EXTENSION_LANGUAGES.get(Path(name).suffix.lower())
+        if language:
+            languages[language] = languages.get(language, 0) + file_size
+    return RepoProfile(repo_name=repo_name, size_kb=size // 1024, languages=languages, directories=directories)
+
+
+def local_profile(repo_name: str, path: Path) -> RepoProfile:
+    """Size, languages and top-level directories of a local repository"""
+    return profile_from_files(repo_name, local_repo.list_files(path), local_repo.top_level_directories(path))
+
+
+def choose_partitions(directories: List[str], limit: int) -> List[str]:
+    """Pick up to `limit` source directories, the usual source folders first"""
+    candidates = [
+        name for name in directories
+        if not name.startswith(".") and name.lower() not in SKIP_DIRS
+    ]
+    candidates.sort(key=lambda name: (name.lower() not in SOURCE_DIRS, name.lower()))
+    return candidates[:limit]
+
+
+def choose_plan(profile: RepoProfile, mode: Optional[DepthMode] = None) -> Plan:
+    """Pick the analysis strategy for a repository within the mode's file budget"""
+    mode = mode or get_mode()
+    languages = sorted(profile.languages, key=profile.languages.get, reverse=True)
+
+    if profile.size_kb <= FULL_MAX_KB and len(languages) <= FULL_MAX_LANGUAGES:
+        return Plan(
+            strategy="full", max_files=mode.max_files, size_kb=profile.size_kb, languages=languages,
+            reason=f"small repository ({profile.size_kb} KB, {len(languages)} languages)"
+        )
+
+    # The root is always one partition (README, manifests, entry points)
+    slots = min(MAX_PARTITIONS, mode.max_files // MIN_FILES_PER_PARTITION) - 1
+    directories = choose_partitions(profile.directories, slots) if slots > 0 else []
+    if profile.size_kb >= MAP_REDUCE_MIN_KB and len(directories) >= 2:
+        partitions = [""] + directories
+        return Plan(
+            strategy="map_reduce", max_files=mode.max_files // len(partitions), partitions=partitions,
+            size_kb=profile.size_kb, languages=languages,
+            reason=f"large repository ({profile.size_kb} KB) split into {len(partitions)} parts"
+        )
+
+    return Plan(
+        strategy="sampled", max_files=mode.max_files, size_kb=profile.size_kb, languages=languages,
+        reason=f"{profile.size_kb} KB, {len(languages)} languages: reading a representative sample"
+    )
+
+
+def default_plan(mode: Optional[DepthMode] = None, reason: str = "no repository metadata") -> Plan:
+    """The plan used when the repository could not be profiled"""
+    return Plan(strategy="sampled", max_files=(mode or get_mode()).max_files, reason=reason)
+
+
+def plan_job(
+    repo_name: str,
+    mode: Optional[DepthMode] = None,
+    client: Optional[httpx.Client] = None,
+    local_path: Optional[Path] = None,
+    ref: Optional[str] = None,
+    subpath: str = ""
+) -> Plan:
+    """
+    Profile the repository (on disk if local_path is set, only its subpath
+    directory if one is given) and choose a plan (never raises)
+    """
+    try:
+        if local_path:
+            profile = local_profile(repo_name, local_path)
+        elif subpath:
+            profile = fetch_tree_profile(repo_name, subpath, ref, client)
+        else:
+            profile = fetch_profile(repo_name, client)
+    except (httpx.HTTPError, ValueError, OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️  Warning: Could not profile {repo_name}, using the default strategy: {e}")
+        return default_plan(mode, reason=f"profiling failed: {e}")
+    plan = choose_plan(profile, mode)
+    plan.repository_kb = profile.repository_kb
+    return plan
@@ -0,0 +1,124 @@
+"""
+Compact recursive listing of a repository, for the get_repository_tree tool.
+
+One call shows the agent every directory instead of one get_directory_content
+call (one LLM turn and one GitHub request) per folder. Each directory line
+carries the number of files and bytes below it, so the agent can see where
+the code is even when the listing is truncated:
+
+    src/  (42 files, 310.2K)
+      api/  (12 files, 80.0K)
+        routes.py  4.1K
+      ... 9 more entries
+
+Entries are taken breadth-first up to TREE_MAX_ENTRIES, so a huge repository
+still shows all of its top levels. Dependency and build directories are
+summarized on one line and never expanded.
+"""
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+# Lines in one listing (roughly 10 tokens each)
+TREE_MAX_ENTRIES = int(os.getenv("TREE_MAX_ENTRIES", "1500"))
+
+# Shown with their totals, never expanded
+COLLAPSED_DIRS = {
+    ".git", "node_modules", "vendor", "third_party", "dist", "build",
+    "__pycache__", ".venv", "venv", ".tox", ".next", "target",
+}
+
+
+@dataclass
+class TreeEntry:
+    path: str
+    type: str  # "file", "dir" or "submodule"
+    size: int = 0
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "K", "M"):
+        if size < 1024 or unit == "M":
+            return f"{size}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def _parent(path: str) -> str:
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def render_tree(
+    entries: Iterable[TreeEntry],
+    title: str,
+    path: str = "",
+    max_entries: int = TREE_MAX_ENTRIES,
+    incomplete: bool = False
+) -> str:
+    """
+    Render the entries under path (all of them for "") as an indented listing.
+    incomplete marks a source listing that was itself cut short (GitHub's
+    trees API stops at 100,000 entries).
+    """
+    prefix = f"{path.strip('/')}/" if path.strip("/") else ""
+    entries = [
+        TreeEntry(e.path[len(prefix):], e.type, e.size)
+        for e in entries if e.path.startswith(prefix) and e.path != prefix.rstrip("/")
+    ]
+
+    # Files and bytes below each directory
+    totals: Dict[str, List[int]] = {}
+    children: Dict[str, List[TreeEntry]] = {}
+    for entry in entries:
+        children.setdefault(_parent(entry.path), []).append(entry)
+        if entry.type == "file":
+            directory = _parent(entry.path)
+            while directory:
+                total = totals.setdefault(directory, [0, 0])
+                total[0] += 1
+                total[1] += entry.size
+                directory = _parent(directory)
+
+    # Breadth-first selection, so shallow entries win when the listing is cut
+    selected = set()
+    queue = deque([""])
+    while queue and len(selected) < max_entries:
+        directory = queue.popleft()
+        for entry in sorted(children.get(directory, []), key=lambda e: (e.type != "dir", e.path.lower())):
+            if len(selected) >= max_entries:
+                break
+            selected.add(entry.path)
+            if entry.type == "dir" and entry.path.rsplit("/", 1)[-1] not in COLLAPSED_DIRS:
+                queue.append(entry.path)
+
+    lines = []
+
+    def walk(directory: str, depth: int):
+        listed = [e for e in children.get(directory, []) if e.path in selected]
+        listed.sort(key=lambda e: (e.type != "dir", e.path.lower()))
+        for entry in listed:
+            name = entry.path.rsplit("/", 1)[-1]
+            indent = "  " * depth
+            if entry.type == "dir":
+                files, size = totals.get(entry.path, [0, 0])
+                note = ", not expanded" if name in COLLAPSED_DIRS and (files or children.get(entry.path)) else ""
+                lines.append(f"{indent}{name}/  ({files} files, {format_size(size)}{note})")
+                if not note:
+                    walk(entry.path, depth + 1)
+            elif entry.type == "submodule":
+                lines.append(f"{indent}{name}  (submodule)")
+            else:
+                lines.append(f"{indent}{name}  {format_size(entry.size)}")
+        hidden = len(children.get(directory, [])) - len(listed)
+        if hidden:
+            lines.append(f"{'  ' * depth}... {hidden} more entries")
+
+    walk("", 0)
+
+    files = [e for e in entries if e.type == "file"]
+    header = f"{title}{' ' + prefix if prefix else ''}: {len(files)} files, {format_size(sum(e.size for e in files))}"
+    if len(selected) >= max_entries or incomplete:
+        header += f" (listing truncated to {len(selected)} of {len(entries)}{'+' if incomplete else ''} entries)"
+    if not entries:
+        return f"{header}\n(empty)"
+    return "\n".join([header, *lines])
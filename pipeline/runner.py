@@ -0,0 +1,712 @@
+"""
+In-process Git2Doc pipeline.
+
+run_pipeline() performs the full analysis -> documentation -> workflow ->
+diagram -> PDF flow that main.py used to run as a top-level script, so the
+API worker and the CLI can share one warm interpreter. The flow is a DAG of
+stages (see build_stages) executed by pipeline.dag. All files go to the
+job's JobWorkspace, never to the current working directory.
+
+pipeline.async_runner runs the same stages on an event loop.
+"""
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from doc_creation import generate_pdf
+from generate_project_workflow import render_workflow_diagram
+from pipeline import agents, context_pack, local_repo, planner, scanner, snapshot, snapshot_cache
+from pipeline.checkpoints import CheckpointStore
+from pipeline.file_filter import FilterStats
+from pipeline.dag import DagResult, PipelineCancelled, Stage, run_dag
+from pipeline.modes import DepthMode, get_mode
+from pipeline.planner import Plan
+from pipeline.workspace import JobWorkspace
+
+# Default per-stage time budgets in seconds; any of them can be overridden per job
+DEFAULT_STAGE_BUDGETS = {
+    "planning": 15,
+    "snapshot": 60,
+    "scan": 20,
+    "pack": 20,
+    "analysis": 300,
+    "documentation": 240,
+    "workflow": 120,
+    "diagram": 30,
+    "render": 60,
+}
+
+DEFAULT_NODE_TYPES = {
+    "entry": {"color": "#1bbcd6", "shape": "box"},
+    "core": {"color": "#2e8b57", "shape": "box"},
+    "tool": {"color": "#d6c44f", "shape": "box"},
+    "external": {"color": "#d9534f", "shape": "box"},
+    "compatibility": {"color": "#4f8a8b", "shape": "box"},
+    "output": {"color": "#7b2d3a", "shape": "box"}
+}
+
+
+@dataclass
+class PipelineResult:
+    """Artifacts and metadata produced by one pipeline run"""
+    repo_name: str
+    output_dir: Path
+    content_file: Path
+    pdf_file: Path
+    workflow_json_file: Optional[Path] = None
+    diagram_file: Optional[Path] = None
+    analysis: str = ""
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    resumed_stages: List[str] = field(default_factory=list)
+    degraded_stages: List[str] = field(default_factory=list)
+    subpath: str = ""
+    mode: str = ""
+    strategy: str = ""
+    tool_calls: Dict[str, int] = field(default_factory=dict)
+    file_filter: Dict[str, int] = field(default_factory=dict)
+    context: Dict[str, int] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+    latency_target_seconds: float = 0.0
+
+    @property
+    def within_target(self) -> bool:
+        return self.elapsed_seconds <= self.latency_target_seconds
+
+
+def parse_github_url(url: str) -> str:
+    """
+    Extract owner/repo from GitHub URL.
+    Examples:
+        https://github.com/owner/repo -> owner/repo
+        github.com/owner/repo -> owner/repo
+        https://github.com/owner/repo.git -> owner/repo
+    """
+    # Remove protocol
+    url = url.replace('https://', '').replace('http://', '')
+    # Remove github.com
+    url = url.replace('github.com/', '')
+    # Remove .git suffix
+    url = url.replace('.git', '')
+    # Get owner/repo (strip trailing slashes and take first two parts)
+    parts = url.strip('/').split('/')
+    if len(parts) >= 2:
+        return f"{parts[0]}/{parts[1]}"
+    raise ValueError(f"Invalid GitHub URL format: {url}")
+
+
+def parse_tree_path(url: str) -> Tuple[Optional[str], str]:
+    """
+    Ref and subpath of a GitHub URL pointing into a repository (monorepo packages).
+    Examples:
+        https://github.com/org/mono/tree/main/services/billing -> ("main", "services/billing")
+        https://github.com/org/mono -> (None, "")
+    A branch name containing '/' cannot be told apart from the path: the
+    first segment after tree/ is always taken as the ref.
+    """
+    parts = [part for part in url.replace('https://', '').replace('http://', '').replace('github.com/', '').split('/') if part]
+    if len(parts) >= 4 and parts[2] == "tree":
+        return parts[3], "/".join(parts[4:])
+    return None, ""
+
+
+def parse_repo_url(url: str) -> str:
+    """
+    Repository name of a GitHub URL (owner/repo) or of a local repository
+    path or file:// URL (local/<directory>; see pipeline.local_repo).
+    """
+    path = local_repo.local_repo_path(url)
+    return local_repo.local_repo_name(path) if path else parse_github_url(url)
+
+
+def clean_doc_content(content: str) -> str:
+    """Strip markdown code fences the model sometimes wraps around its output"""
+    content = re.sub(r'^```markdown\s*', '', content.strip())
+    content = re.sub(r'^```\s*', '', content)
+    content = re.sub(r'\s*```$', '', content)
+    return content.strip()
+
+
+def parse_workflow_json(raw: str) -> dict:
+    """
+    Parse and validate the workflow agent's JSON output.
+    Missing top-level keys are filled with defaults; raises json.JSONDecodeError
+    if the response is not JSON at all.
+    """
+    workflow_json_str = raw.strip()
+
+    # Remove markdown code fences if present
+    workflow_json_str = re.sub(r'^```json\s*', '', workflow_json_str)
+    workflow_json_str = re.sub(r'^```\s*', '', workflow_json_str)
+    workflow_json_str = re.sub(r'\s*```$', '', workflow_json_str)
+    workflow_json_str = workflow_json_str.strip()
+
+    workflow_data = json.loads(workflow_json_str)
+
+    # Validate required keys
+    required_keys = ["meta", "node_types", "nodes", "edges"]
+    missing_keys = [key for key in required_keys if key not in workflow_data]
+
+    if missing_keys:
+        print(f"Warning: Generated JSON is missing required keys: {missing_keys}")
+        print("Attempting to fix...")
+
+        # Add missing keys with defaults
+        if "meta" not in workflow_data:
+            workflow_data["meta"] = {"title": "Project Workflow", "layout": "TB"}
+        if "node_types" not in workflow_data:
+            workflow_data["node_types"] = dict(DEFAULT_NODE_TYPES)
+        if "nodes" not in workflow_data:
+            workflow_data["nodes"] = []
+        if "edges" not in workflow_data:
+            workflow_data["edges"] = []
+
+    # Validate node structure
+    for node in workflow_data.get("nodes", []):
+        required_node_keys = ["id", "label", "type", "layer"]
+        missing_node_keys = [key for key in required_node_keys if key not in node]
+        if missing_node_keys:
+            print(f"⚠️  Warning: Node {node.get('id', 'unknown')} is missing keys: {missing_node_keys}")
+
+    # Validate edges reference existing nodes
+    node_ids = {node["id"] for node in workflow_data.get("nodes", []) if "id" in node}
+    for edge in workflow_data.get("edges", []):
+        if edge.get("from") not in node_ids:
+            print(f"⚠️  Warning: Edge references non-existent node: {edge.get('from')}")
+        if edge.get("to") not in node_ids:
+            print(f"⚠️  Warning: Edge references non-existent node: {edge.get('to')}")
+
+    return workflow_data
+
+
+def insert_workflow_diagram(doc_content: str, diagram_path: str) -> str:
+    """Replace the diagram placeholder (or pick a sensible spot) with the diagram markdown"""
+    diagram_markdown = f"\n## Workflow Diagram\n\n![Project Workflow Diagram]({diagram_path})\n\n*Figure: High-level workflow architecture of the project*\n"
+
+    # Replace placeholder if it exists, otherwise insert after Introduction
+    if agents.WORKFLOW_DIAGRAM_PLACEHOLDER in doc_content:
+        print("Workflow diagram placeholder replaced")
+        return doc_content.replace(agents.WORKFLOW_DIAGRAM_PLACEHOLDER, diagram_markdown)
+
+    # Try to insert after Introduction section
+    # Look for common patterns: "## Overview", "## Architecture", "## Components"
+    insertion_patterns = [
+        ("\n## Overview\n", diagram_markdown + "\n## Overview\n"),
+        ("\n## Architecture\n", diagram_markdown + "\n## Architecture\n"),
+        ("\n## Components\n", diagram_markdown + "\n## Components\n"),
+        ("\n## Implementation\n", diagram_markdown + "\n## Implementation\n"),
+    ]
+
+    for pattern, replacement in insertion_patterns:
+        if pattern in doc_content:
+            print(f"✅ Workflow diagram inserted before {pattern.strip()}")
+            return doc_content.replace(pattern, replacement, 1)
+
+    # Fallback: insert after first major heading
+    lines = doc_content.split('\n')
+    insert_index = -1
+    for i, line in enumerate(lines):
+        if line.startswith('## ') and i > 0:
+            insert_index = i
+            break
+
+    if insert_index > 0:
+        lines.insert(insert_index, diagram_markdown.strip())
+        print("✅ Workflow diagram inserted after Introduction")
+        return '\n'.join(lines)
+
+    # Last resort: append to end of document
+    print("⚠️  Workflow diagram appended to end of document")
+    return doc_content + "\n\n" + diagram_markdown
+
+
+def embed_workflow_diagram(workspace: JobWorkspace) -> bool:
+    """
+    Rewrite the workspace's content file with the diagram inserted.
+    Returns False (leaving the content untouched) if no diagram was rendered.
+    """
+    if not workspace.diagram_file.exists():
+        return False
+
+    with open(workspace.content_file, "r") as f:
+        doc_content = f.read()
+    doc_content = insert_workflow_diagram(doc_content, str(workspace.diagram_file))
+    with open(workspace.content_file, "w") as f:
+        f.write(doc_content)
+    return True
+
+
+@dataclass
+class PipelineJob:
+    """Inputs shared by every stage of one pipeline run"""
+    repo_url: str
+    question: str
+    workspace: JobWorkspace
+    repo_name: str = ""
+    budgets: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_STAGE_BUDGETS))
+    mode: DepthMode = field(default_factory=get_mode)
+    plan: Optional[Plan] = None  # Chosen up front by the caller; planned by stage_plan otherwise
+    local_path: Optional[Path] = None  # Set for local repositories, which are never read through GitHub
+    ref: Optional[str] = None  # Branch, tag or commit from a .../tree/<ref>/... URL
+    subpath: str = ""  # Directory the job is restricted to (a monorepo package); "" for the whole repository
+    tool_memo: agents.ToolCallMemo = field(default_factory=agents.ToolCallMemo)
+    file_stats: FilterStats = field(default_factory=FilterStats)
+    cancel_event: Optional[threading.Event] = None  # Set to stop the run; the agents stop at their next tool call
+
+
+def raise_if_cancelled(job: PipelineJob, what: str):
+    """Stop a stage that outlived its run's cancellation before it writes to the workspace"""
+    if job.cancel_event is not None and job.cancel_event.is_set():
+        raise PipelineCancelled(f"Cancelled before saving the {what}")
+
+
+def stage_ingest(job: PipelineJob, inputs: dict) -> str:
+    """Resolve the repository to analyze"""
+    job.repo_name = parse_repo_url(job.repo_url)
+    scope = f" ({job.local_path})" if job.local_path else f" at {job.ref}: {job.subpath or '/'}" if job.ref else ""
+    print(f"Repository: {job.repo_name}{scope}")
+    return job.repo_name
+
+
+def stage_plan(job: PipelineJob, inputs: dict) -> dict:
+    """Choose the analysis strategy from the repository's size and languages"""
+    plan = job.plan or planner.plan_job(
+        inputs["ingest"], job.mode, local_path=job.local_path, ref=job.ref, subpath=job.subpath
+    )
+    print(f"Strategy: {plan.strategy} ({plan.reason})")
+    return asdict(plan)
+
+
+def resolve_plan(job: PipelineJob, inputs: dict) -> Plan:
+    """The plan stage's output, or the default plan if planning was skipped"""
+    if inputs.get("plan") is None:
+        return planner.default_plan(job.mode, reason="planning skipped")
+    return Plan(**inputs["plan"])
+
+
+def stage_snapshot(job: PipelineJob, inputs: dict) -> Optional[dict]:
+    """Download the repository once, so the analysis reads files from disk instead of the API"""
+    repo_name = inputs["ingest"]
+    if job.local_path:
+        repo_snapshot = local_repo.open_snapshot(job.local_path, job.workspace.snapshot_dir, repo_name)
+        print(f"Local repository: {repo_snapshot.files} files at {repo_snapshot.sha}")
+        return repo_snapshot.to_output()
+    plan = resolve_plan(job, inputs)
+    # The whole repository is downloaded even for a subpath, so its size decides
+    size_kb = plan.repository_kb if job.subpath else plan.size_kb
+    if size_kb > snapshot.SNAPSHOT_MAX_KB:
+        print(f"Repository too large for a snapshot ({size_kb} KB), reading it through the API")
+        return None
+    cache = snapshot_cache.get_cache()
+    if cache is None:
+        print(f"Downloading snapshot of {repo_name}...")
+        repo_snapshot = snapshot.download_snapshot(repo_name, job.workspace.snapshot_dir, ref=job.ref)
+    else:
+        sha = snapshot.resolve_commit_sha(repo_name, ref=job.ref)
+        repo_snapshot, hit = cache.get_or_fetch(
+            repo_name, sha, lambda dest: snapshot.download_snapshot(repo_name, dest, ref=sha)
+        )
+        print(f"Snapshot cache {'hit' if hit else 'miss'} for {repo_name}@{sha[:12]}")
+    # The whole repository is downloaded (and cached, so sibling packages share it); the tools see the subpath
+    repo_snapshot = snapshot.scope_snapshot(repo_snapshot, job.subpath)
+    print(f"Snapshot: {repo_snapshot.files} files at {repo_snapshot.sha}")
+    return repo_snapshot.to_output()
+
+
+def resolve_snapshot(inputs: dict) -> Optional[snapshot.RepoSnapshot]:
+    """The snapshot stage's output, or None to read the repository through the API"""
+    if inputs.get("snapshot") is None:
+        return None
+    return snapshot.RepoSnapshot.from_output(inputs["snapshot"])
+
+
+def stage_scan(job: PipelineJob, inputs: dict) -> Optional[dict]:
+    """Extract manifests, entry points, env vars and test commands from the snapshot (no LLM)"""
+    repo_snapshot = resolve_snapshot(inputs)
+    if repo_snapshot is None:
+        print("No snapshot to scan; the analysis discovers the project facts itself")
+        return None
+    started = time.perf_counter()
+    project_scan = scanner.scan_repository(repo_snapshot.root)
+    print(f"Static scan: {len(project_scan.manifests)} manifests, {len(project_scan.entry_points)} entry points, "
+          f"{len(project_scan.env_vars)} env vars in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return project_scan.to_output()
+
+
+def resolve_scan(inputs: dict) -> Optional[scanner.ProjectScan]:
+    """The scan stage's output, or None if there was nothing to scan or it found nothing to go on"""
+    if inputs.get("scan") is None:
+        return None
+    project_scan = scanner.ProjectScan.from_output(inputs["scan"])
+    return project_scan if project_scan.has_facts else None
+
+
+def stage_pack(job: PipelineJob, inputs: dict) -> Optional[dict]:
+    """Rank the snapshot's files by importance and pack the best into the mode's token budget"""
+    repo_snapshot = resolve_snapshot(inputs)
+    if repo_snapshot is None:
+        print("No snapshot to pack; the analysis picks the files to read itself")
+        return None
+    packed = context_pack.packed_context(repo_snapshot, job.mode.context_tokens, resolve_scan(inputs))
+    print(f"Context: {len(packed.files)} files packed into {packed.tokens}/{packed.budget} tokens")
+    return packed.to_output()
+
+
+def resolve_pack(inputs: dict) -> Optional[context_pack.PackedContext]:
+    """The pack stage's output, or None if there was nothing to pack or nothing was worth packing"""
+    if inputs.get("pack") is None:
+        return None
+    packed = context_pack.PackedContext.from_output(inputs["pack"])
+    return packed if packed.files else None
+
+
+def static_analysis(job: PipelineJob, inputs: dict, plan: Plan) -> Optional[str]:
+    """The analysis from the scan alone (and the packed key files), if the mode allows it and the scan found enough"""
+    project_scan = resolve_scan(inputs)
+    # Large repositories need the per-part analysis to be covered at all
+    if not job.mode.static_analysis or project_scan is None or plan.strategy == "map_reduce":
+        return None
+    print("   Note: Analysis built from the static scan (no LLM call)")
+    packed = resolve_pack(inputs)
+    if packed is None:
+        return scanner.static_analysis(project_scan, resolve_snapshot(inputs).root)
+    return f"{project_scan.render()}\n\nKEY FILES (ranked by importance):\n\n{packed.text}"
+
+
+def project_facts(inputs: dict) -> str:
+    """Scan facts for the documenter, unless the analysis already is the scan"""
+    project_scan = resolve_scan(inputs)
+    if project_scan is None:
+        return ""
+    facts = project_scan.render()
+    return "" if facts in inputs["analyze"] else facts
+
+
+def merge_partial_analyses(plan: Plan, parts: List[str]) -> str:
+    """Join the per-partition analyses of a map_reduce plan into one analysis"""
+    sections = [
+        f"## Part: {partition + '/' if partition else 'repository root'}\n\n{part}"
+        for partition, part in zip(plan.partitions, parts)
+    ]
+    return "\n\n".join(sections)
+
+
+def stage_analyze(job: PipelineJob, inputs: dict) -> str:
+    """Analyze the repository with GithubTools and return the analysis text"""
+    repo_name = inputs["ingest"]
+    plan = resolve_plan(job, inputs)
+    repo_snapshot = resolve_snapshot(inputs)
+    print("Analyzing repository files...")
+    print(f"   Note: Reading {repo_name} from {'its snapshot' if repo_snapshot else 'the GitHub API'}")
+    analysis = static_analysis(job, inputs, plan)
+    if analysis is not None:
+        return analysis
+    project_scan = resolve_scan(inputs)
+    # Each partition of a map_reduce plan reads its own files; the packed ones are repository-wide
+    packed = resolve_pack(inputs) if plan.strategy != "map_reduce" else None
+
+    def analyze(partition: Optional[str] = None) -> str:
+        analysis_agent = agents.build_analysis_agent(
+            repo_name, mode=job.mode, plan=plan, snapshot=repo_snapshot, memo=job.tool_memo,
+            file_stats=job.file_stats, ref=job.ref, subpath=job.subpath, project_scan=project_scan,
+            packed_context=packed
+        )
+        prompt = agents.build_analysis_prompt(
+            repo_name, job.question, partition, scanned=project_scan is not None, packed=packed is not None
+        )
+        return str(analysis_agent.run(prompt).content)
+
+    if plan.strategy != "map_reduce":
+        return analyze()
+    # Map: one agent per partition, all at once; reduce: the documenter reads the merged parts
+    with ThreadPoolExecutor(max_workers=len(plan.partitions), thread_name_prefix="git2doc-partition") as pool:
+        parts = list(pool.map(analyze, plan.partitions))
+    return merge_partial_analyses(plan, parts)
+
+
+def stage_document(job: PipelineJob, inputs: dict) -> Path:
+    """Generate the documentation body (with the diagram placeholder) into the content file"""
+    print("Generating documentation...")
+    # A merged map_reduce analysis can outgrow the context; keep the documenter's prompt within the mode's budget
+    analysis = context_pack.fit_to_budget(inputs["analyze"], job.mode.context_tokens)
+    documenter = agents.build_documenter(analysis, mode=job.mode, project_facts=project_facts(inputs))
+    doc_response = documenter.run(agents.documentation_prompt(job.mode))
+    return save_document(job, str(doc_response.content))
+
+
+def save_document(job: PipelineJob, raw: str) -> Path:
+    """Clean the documenter's output and write it to the content file"""
+    raise_if_cancelled(job, "documentation")
+    doc_content = clean_doc_content(raw)
+
+    # Save the documentation (with placeholder for now)
+    with open(job.workspace.content_file, "w") as f:
+        f.write(doc_content)
+    print(f"Documentation saved to {job.workspace.content_file}")
+    return job.workspace.content_file
+
+
+def stage_workflow_json(job: PipelineJob, inputs: dict) -> Optional[Path]:
+    """Generate the workflow diagram JSON; returns None if the model's output is not JSON"""
+    print("Generating Workflow Diagram JSON...")
+    workflow_agent = agents.build_workflow_agent(mode=job.mode)
+    workflow_response = workflow_agent.run(agents.build_workflow_prompt(inputs["analyze"]))
+    return save_workflow_json(job, str(workflow_response.content))
+
+
+def save_workflow_json(job: PipelineJob, workflow_raw: str) -> Optional[Path]:
+    """Validate the workflow agent's output and write it as JSON; None if it is not JSON"""
+    raise_if_cancelled(job, "workflow JSON")
+    try:
+        workflow_data = parse_workflow_json(workflow_raw)
+    except json.JSONDecodeError as e:
+        print(f"Error: Failed to parse workflow JSON: {e}")
+        print("Raw response:")
+        print(workflow_raw[:500])  # Print first 500 chars for debugging
+
+        # Save the raw response for debugging
+        with open(job.workspace.workflow_debug_file, "w") as f:
+            f.write(workflow_raw)
+        print(f"Raw response saved to {job.workspace.workflow_debug_file} for debugging")
+        return None
+
+    with open(job.workspace.workflow_json_file, "w") as f:
+        json.dump(workflow_data, f, indent=4)
+
+    print(f"✅ Workflow JSON saved to {job.workspace.workflow_json_file}")
+    print(f"   - Nodes: {len(workflow_data.get('nodes', []))}")
+    print(f"   - Edges: {len(workflow_data.get('edges', []))}")
+    print(f"   - Title: {workflow_data.get('meta', {}).get('title', 'N/A')}")
+    return job.workspace.workflow_json_file
+
+
+def stage_diagram(job: PipelineJob, inputs: dict) -> Optional[Path]:
+    """Render the workflow diagram; diagram problems are warnings, not failures"""
+    workflow_json_file = inputs["workflow_json"]
+    if workflow_json_file is None:
+        print("⚠️  Warning: No workflow JSON, skipping diagram")
+        return None
+
+    print("Generating workflow diagram...")
+    try:
+        output_path = render_workflow_diagram(
+            workflow_json_file, job.workspace.diagram_file, timeout=job.budgets["diagram"]
+        )
+        print(f"Successfully generated: {output_path}")
+        return Path(output_path)
+    except subprocess.TimeoutExpired:
+        print("⚠️  Warning: Workflow diagram generation timed out")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not generate workflow diagram: {e}")
+    return None
+
+
+def stage_render(job: PipelineJob, inputs: dict) -> Path:
+    """Insert the diagram (if any) into the documentation and render the PDF"""
+    if inputs.get("diagram") is not None and embed_workflow_diagram(job.workspace):
+        print(f"Updated documentation saved to {job.workspace.content_file}")
+        print("Generating final PDF with workflow diagram...")
+    else:
+        print("Warning: Workflow diagram not found, generating PDF without it")
+    generate_pdf(input_file=str(inputs["document"]), output_file=str(job.workspace.pdf_file))
+    return job.workspace.pdf_file
+
+
+def build_stages(job: PipelineJob) -> List[Stage]:
+    """
+    The pipeline DAG:
+
+        ingest -> plan -> snapshot -> scan -> pack -> analyze -> document ----------------------> render
+                                                              -> workflow_json -> diagram ------/
+
+    document and workflow_json both only need the analysis, so they run in parallel.
+    The plan, snapshot, scan and pack stages are optional: without a plan the
+    analysis uses the default strategy, without a snapshot it reads files through
+    the API, without a scan it discovers the project facts with its tools, and
+    without a pack it picks the files to read itself.
+    Local repositories have no API to fall back to, so their snapshot is required.
+    The workflow stages are optional: if they run out of time the PDF is
+    rendered without a diagram. Modes without a diagram leave them out.
+    """
+    budgets = job.budgets
+    stages = [
+        Stage("ingest", partial(stage_ingest, job), checkpoint=False),
+        Stage("plan", partial(stage_plan, job), deps=("ingest",), checkpoint=False,
+              timeout=budgets["planning"], optional=True),
+        Stage("snapshot", partial(stage_snapshot, job), deps=("ingest", "plan"), checkpoint=False,
+              timeout=budgets["snapshot"], optional=job.local_path is None),
+        Stage("scan", partial(stage_scan, job), deps=("snapshot",), checkpoint=False,
+              timeout=budgets["scan"], optional=True),
+        Stage("pack", partial(stage_pack, job), deps=("snapshot", "scan"), checkpoint=False,
+              timeout=budgets["pack"], optional=True),
+        Stage("analyze", partial(stage_analyze, job), deps=("ingest", "plan", "snapshot", "scan", "pack"),
+              timeout=budgets["analysis"]),
+        Stage("document", partial(stage_document, job), deps=("analyze", "scan"), timeout=budgets["documentation"]),
+    ]
+    if not job.mode.diagram:
+        return stages + [
+            Stage("render", partial(stage_render, job), deps=("document",), timeout=budgets["render"]),
+        ]
+    return stages + [
+        Stage("workflow_json", partial(stage_workflow_json, job), deps=("analyze",),
+              timeout=budgets["workflow"], optional=True),
+        Stage("diagram", partial(stage_diagram, job), deps=("workflow_json",),
+              timeout=budgets["diagram"], optional=True),
+        Stage("render", partial(stage_render, job), deps=("document", "diagram"), timeout=budgets["render"]),
+    ]
+
+
+def stage_dependencies(mode: Optional[DepthMode] = None) -> Dict[str, Tuple[str, ...]]:
+    """Stage names and their dependencies in a mode's DAG (for ETA estimates)"""
+    job = PipelineJob(repo_url="", question="", workspace=None, mode=mode or get_mode())
+    return {stage.name: stage.deps for stage in build_stages(job)}
+
+
+def resolve_budgets(
+    stage_budgets: Optional[Dict[str, float]] = None,
+    mode: Optional[DepthMode] = None
+) -> Dict[str, float]:
+    """Merge the mode's budgets and then per-job overrides over the defaults, rejecting unknown stages"""
+    budgets = dict(DEFAULT_STAGE_BUDGETS)
+    budgets.update((mode or get_mode()).stage_budgets)
+    for name, seconds in (stage_budgets or {}).items():
+        if name not in budgets:
+            raise ValueError(f"Unknown stage budget '{name}'; expected one of {sorted(budgets)}")
+        if seconds is None or seconds <= 0:
+            raise ValueError(f"Stage budget '{name}' must be a positive number of seconds")
+        budgets[name] = float(seconds)
+    return budgets
+
+
+def run_pipeline(
+    repo_url: str,
+    question: str,
+    output_dir,
+    resume: bool = False,
+    stage_budgets: Optional[Dict[str, float]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    mode: Optional[str] = None,
+    plan: Optional[Plan] = None
+) -> PipelineResult:
+    """
+    Generate documentation for a GitHub repository.
+
+    Args:
+        repo_url: GitHub repository URL (or owner/repo), optionally pointing into
+            it (.../tree/<ref>/<subpath>), or a local directory, bare git
+            repository or file:// URL
+        question: User question / focus for the analysis
+        output_dir: Directory that receives all generated files
+        resume: Restart from the first stage without a valid checkpoint in output_dir
+        stage_budgets: Per-stage time limits in seconds overriding DEFAULT_STAGE_BUDGETS
+        cancel_event: Set from another thread to abort the run; running agents
+            stop at their next tool call and nothing more is saved
+        mode: Depth mode name (fast, standard or deep; see pipeline.modes)
+        plan: Analysis strategy chosen by the caller (see pipeline.planner);
+            planned from the repository metadata if omitted
+
+    Returns:
+        PipelineResult describing the generated artifacts
+
+    Raises:
+        ValueError: If the repository URL, a stage budget or the mode is invalid
+        StageError: If a required stage fails or runs out of time
+        PipelineCancelled: If cancel_event is set before the run finishes
+    """
+    started = time.perf_counter()
+    job, job_key = prepare_job(repo_url, question, output_dir, stage_budgets, mode, plan, cancel_event)
+    run = run_dag(
+        build_stages(job),
+        checkpoints=CheckpointStore(job.workspace.root),
+        job_key=job_key,
+        resume=resume,
+        cancel=cancel_event
+    )
+    return build_result(job, run, time.perf_counter() - started)
+
+
+def prepare_job(
+    repo_url: str,
+    question: str,
+    output_dir,
+    stage_budgets: Optional[Dict[str, float]] = None,
+    mode: Optional[str] = None,
+    plan: Optional[Plan] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> Tuple[PipelineJob, str]:
+    """Validate the inputs and create the job and its checkpoint key"""
+    # Fail fast on bad input, before any workspace or thread is created
+    parse_repo_url(repo_url)
+    depth_mode = get_mode(mode)
+    budgets = resolve_budgets(stage_budgets, depth_mode)
+
+    job = PipelineJob(
+        repo_url=repo_url,
+        question=question,
+        workspace=JobWorkspace.create(output_dir),
+        budgets=budgets,
+        mode=depth_mode,
+        plan=plan,
+        local_path=local_repo.local_repo_path(repo_url),
+        tool_memo=agents.ToolCallMemo(cancel_event),
+        cancel_event=cancel_event
+    )
+    if job.local_path is None:
+        job.ref, job.subpath = parse_tree_path(repo_url)
+    job_key = hashlib.sha256(f"{repo_url}\n{question}\n{depth_mode.name}".encode()).hexdigest()
+    return job, job_key
+
+
+def build_result(job: PipelineJob, run: DagResult, elapsed_seconds: float) -> PipelineResult:
+    """Summarize a finished DAG run as a PipelineResult"""
+    # An uncached snapshot is only read during the run; do not leave a copy of the repository behind
+    shutil.rmtree(job.workspace.snapshot_dir, ignore_errors=True)
+    if run.resumed:
+        print(f"Resumed from checkpoints: {', '.join(run.resumed)}")
+    if run.degraded:
+        print(f"Degraded stages: {', '.join(run.degraded)}")
+    tool_calls = job.tool_memo.stats()
+    if tool_calls["requested"]:
+        print(f"Tool calls: {tool_calls['requested']} requested, {tool_calls['executed']} executed "
+              f"({tool_calls['memoized']} answered from the run memo)")
+    file_filter = job.file_stats.stats()
+    snapshot_output = run.outputs.get("snapshot") or {}
+    file_filter["skipped_files"] += snapshot_output.get("skipped_files", 0)
+    file_filter["bytes_saved"] += snapshot_output.get("skipped_bytes", 0)
+    if file_filter["skipped_files"] or file_filter["truncated_files"]:
+        print(f"Files: {file_filter['skipped_files']} skipped, {file_filter['truncated_files']} read head-only "
+              f"({file_filter['bytes_saved'] / 1024:.1f} KB kept out of the analysis)")
+    context = context_pack.PackedContext.from_output(run.outputs["pack"]).stats() if run.outputs.get("pack") else {}
+    target = job.mode.latency_target_seconds
+    verdict = "within" if elapsed_seconds <= target else "over"
+    print(f"Finished in {elapsed_seconds:.1f}s, {verdict} the {job.mode.name} mode target of {target:g}s")
+    outputs = run.outputs
+
+    return PipelineResult(
+        repo_name=job.repo_name,
+        output_dir=job.workspace.root,
+        content_file=job.workspace.content_file,
+        pdf_file=outputs["render"],
+        workflow_json_file=outputs.get("workflow_json"),
+        diagram_file=outputs.get("diagram"),
+        analysis=outputs["analyze"],
+        stage_timings=run.timings,
+        resumed_stages=run.resumed,
+        degraded_stages=run.degraded,
+        subpath=job.subpath,
+        mode=job.mode.name,
+        strategy=(outputs.get("plan") or {}).get("strategy", ""),
+        tool_calls=tool_calls,
+        file_filter=file_filter,
+        context=context,
+        elapsed_seconds=elapsed_seconds,
+        latency_target_seconds=job.mode.latency_target_seconds,
+    )
@@ -0,0 +1,447 @@
+"""
+Static repository scanner.
+
+scan_repository() reads an extracted repository directly, without an LLM
+or a network request, and collects the facts the analysis agent used to
+spend its first tool calls discovering:
+
+- languages (bytes per language) and the top-level directories
+- dependency manifests: requirements*.txt, pyproject.toml, Pipfile,
+  setup.py, package.json, go.mod and Cargo.toml
+- entry points: `if __name__ == "__main__"` blocks, FastAPI/Flask apps,
+  console scripts, package.json bin/start scripts, Dockerfile CMD and
+  ENTRYPOINT, Procfile and Compose commands, uvicorn/gunicorn command lines
+  and Go main packages
+- environment variables read through os.getenv/os.environ, process.env,
+  os.Getenv, Dockerfile ENV and .env.example files
+- test commands (pytest, tox, npm test, go test, cargo test, make test)
+
+Python is parsed with ast and TOML with tomllib; the other formats are
+simple enough for line-based parsing. A scan takes milliseconds for
+typical repositories, and ProjectScan.render() puts the result into the
+analysis and documentation context as ready-made facts.
+"""
+import ast
+import json
+import os
+import re
+import tomllib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+
+from pipeline.file_filter import classify
+from pipeline.snapshot import EXTENSION_LANGUAGES
+
+# Files looked at per scan, and the largest file parsed
+SCAN_MAX_FILES = int(os.getenv("SCAN_MAX_FILES", "5000"))
+SCAN_MAX_FILE_BYTES = 256 * 1024
+# Characters of the README kept by static_analysis()
+README_HEAD_CHARS = 3000
+
+# Items shown per list by render()
+RENDER_MAX_ITEMS = 30
+
+APP_CONSTRUCTORS = {
+    "FastAPI": "uvicorn {module}:{name}",
+    "Starlette": "uvicorn {module}:{name}",
+    "Flask": "flask --app {module}:{name} run",
+    "Quart": "quart --app {module}:{name} run",
+    "Typer": "python -m {module}",
+}
+ENV_CALLS = {"os.getenv", "getenv", "os.environ.get", "environ.get", "os.environ.setdefault"}
+JS_ENV = re.compile(r"process\.env\.([A-Za-z_]\w*)|process\.env\[['\"](\w+)['\"]\]|import\.meta\.env\.([A-Za-z_]\w*)")
+GO_ENV = re.compile(r"os\.(?:Getenv|LookupEnv)\(\"(\w+)\"\)")
+SERVER_COMMAND = re.compile(
+    r"\b(?:uvicorn|gunicorn|hypercorn|daphne|streamlit run|celery -A|flask run|fastapi (?:run|dev))\b[^\n\"'`]*"
+)
+ENV_EXAMPLE_NAMES = {".env.example", ".env.sample", ".env.template", ".env.dist", "env.example"}
+JS_EXTENSIONS = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".vue", ".svelte"}
+DEFAULT_NPM_TEST = "no test specified"
+
+
+@dataclass
+class ProjectScan:
+    """Facts about a repository that a program can extract exactly"""
+    files: int = 0
+    languages: Dict[str, int] = field(default_factory=dict)  # Bytes per language
+    directories: Dict[str, int] = field(default_factory=dict)  # Top-level directory -> files in it
+    manifests: List[dict] = field(default_factory=list)  # {"path", "kind", "name", "dependencies"}
+    entry_points: List[dict] = field(default_factory=list)  # {"path", "kind", "detail"}
+    env_vars: Dict[str, List[str]] = field(default_factory=dict)  # Name -> files that read it
+    test_commands: List[str] = field(default_factory=list)
+
+    @property
+    def has_facts(self) -> bool:
+        """Whether the scan found enough to stand in for an exploratory analysis"""
+        return bool(self.manifests or self.entry_points)
+
+    def to_output(self) -> dict:
+        """Stage output form (sorted, so it hashes deterministically)"""
+        return asdict(self)
+
+    @classmethod
+    def from_output(cls, output: dict) -> "ProjectScan":
+        return cls(**output)
+
+    def render(self) -> str:
+        """Compact plain-text summary for an LLM context"""
+        lines = [f"PROJECT FACTS (static scan of {self.files} files; exact, not inferred):"]
+        total = sum(self.languages.values())
+        if total:
+            shares = sorted(self.languages.items(), key=lambda item: (-item[1], item[0]))
+            lines.append("Languages: " + ", ".join(f"{name} {size * 100 // total}%" for name, size in shares[:8]))
+        if self.directories:
+            lines.append("Top-level directories: " + ", ".join(
+                f"{name}/ ({count} files)" for name, count in list(self.directories.items())[:RENDER_MAX_ITEMS]
+            ))
+        if self.manifests:
+            lines.append("Manifests:")
+            for manifest in self.manifests:
+                name = f" `{manifest['name']}`" if manifest.get("name") else ""
+                dependencies = manifest["dependencies"]
+                shown = ", ".join(dependencies[:RENDER_MAX_ITEMS])
+                more = f" (+{len(dependencies) - RENDER_MAX_ITEMS} more)" if len(dependencies) > RENDER_MAX_ITEMS else ""
+                lines.append(f"- {manifest['path']} ({manifest['kind']}{name}): "
+                             f"{len(dependencies)} dependencies{': ' + shown + more if dependencies else ''}")
+        if self.entry_points:
+            lines.append("Entry points:")
+            lines += [
+                f"- {entry['path']}: {entry['kind']}" + (f" -> {entry['detail']}" if entry.get("detail") else "")
+                for entry in self.entry_points[:RENDER_MAX_ITEMS]
+            ]
+        if self.env_vars:
+            names = list(self.env_vars.items())
+            lines.append("Environment variables: " + ", ".join(
+                f"{name} ({', '.join(paths[:2])}{', ...' if len(paths) > 2 else ''})"
+                for name, paths in names[:RENDER_MAX_ITEMS * 2]
+            ))
+        if self.test_commands:
+            lines.append("Test commands: " + "; ".join(self.test_commands))
+        return "\n".join(lines)
+
+
+def _dotted(node: ast.AST) -> str:
+    """a.b.c for a Name/Attribute chain, else an empty string"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr}" if base else ""
+    return ""
+
+
+def _string(node: Optional[ast.AST]) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _is_main_guard(test: ast.AST) -> bool:
+    return (
+        isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == "__name__"
+        and len(test.comparators) == 1 and _string(test.comparators[0]) == "__main__"
+    )
+
+
+class _Collector:
+    """Accumulates facts while walking the files"""
+
+    def __init__(self):
+        self.manifests: List[dict] = []
+        self.entry_points = set()
+        self.env_vars: Dict[str, set] = {}
+        self.test_commands = set()
+
+    def entry(self, path: str, kind: str, detail: str = ""):
+        self.entry_points.add((path, kind, (detail or "").strip()))
+
+    def env(self, name: str, path: str):
+        if name:
+            self.env_vars.setdefault(name, set()).add(path)
+
+    def manifest(self, path: str, kind: str, name: Optional[str], dependencies):
+        self.manifests.append({
+            "path": path, "kind": kind, "name": str(name or ""),
+            "dependencies": sorted({str(dep) for dep in dependencies if dep}, key=lambda dep: (dep.lower(), dep)),
+        })
+
+    def test(self, command: str, path: str):
+        folder = str(PurePosixPath(path).parent)
+        self.test_commands.add(command if folder == "." else f"{command} (in {folder}/)")
+
+
+def _module_name(path: str) -> str:
+    parts = list(PurePosixPath(path).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _scan_python(path: str, source: str, found: _Collector):
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return
+    for node in ast.walk(tree):
+        if isinstance(node, ast.If) and _is_main_guard(node.test):
+            found.entry(path, "__main__ block", f"python {path}")
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            constructor = _dotted(node.value.func).rsplit(".", 1)[-1]
+            if constructor in APP_CONSTRUCTORS and isinstance(node.targets[0], ast.Name):
+                command = APP_CONSTRUCTORS[constructor].format(module=_module_name(path), name=node.targets[0].id)
+                found.entry(path, f"{constructor} app `{node.targets[0].id}`", command)
+        elif isinstance(node, ast.Call):
+            name = _dotted(node.func)
+            if name in ENV_CALLS and node.args:
+                found.env(_string(node.args[0]), path)
+            elif name == "uvicorn.run":
+                found.entry(path, "uvicorn.run()", _string(node.args[0]) if node.args else "")
+            elif name == "setup" and PurePosixPath(path).name == "setup.py":
+                _scan_setup_call(path, node, found)
+        elif isinstance(node, ast.Subscript) and _dotted(node.value) in ("os.environ", "environ"):
+            found.env(_string(node.slice), path)
+
+
+def _scan_setup_call(path: str, call: ast.Call, found: _Collector):
+    keywords = {keyword.arg: keyword.value for keyword in call.keywords if keyword.arg}
+    requires = keywords.get("install_requires")
+    dependencies = [_requirement_name(_string(item) or "") for item in getattr(requires, "elts", [])]
+    found.manifest(path, "python (setup.py)", _string(keywords.get("name")), dependencies)
+    entry_points = keywords.get("entry_points")
+    if isinstance(entry_points, ast.Dict):
+        for key, value in zip(entry_points.keys, entry_points.values):
+            if _string(key) == "console_scripts":
+                for item in getattr(value, "elts", []):
+                    found.entry(path, "console script", _string(item) or "")
+
+
+def _requirement_name(line: str) -> str:
+    """Distribution name of a requirement specifier ("fastapi[all]>=0.1" -> "fastapi")"""
+    return re.split(r"[<>=!~;\[\s@(]", line.strip(), maxsplit=1)[0]
+
+
+def _scan_requirements(path: str, text: str, found: _Collector):
+    names = [
+        _requirement_name(line) for line in text.splitlines()
+        if line.strip() and not line.strip().startswith(("#", "-", "git+", "http"))
+    ]
+    found.manifest(path, "python requirements", None, names)
+    if any(name.lower() == "pytest" for name in names):
+        found.test("pytest", path)
+
+
+def _scan_pyproject(path: str, text: str, found: _Collector):
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        return
+    project = data.get("project", {})
+    poetry = data.get("tool", {}).get("poetry", {})
+    dependencies = [_requirement_name(dep) for dep in project.get("dependencies", [])]
+    dependencies += [name for name in poetry.get("dependencies", {}) if name.lower() != "python"]
+    found.manifest(path, "python (pyproject.toml)", project.get("name") or poetry.get("name"), dependencies)
+    for name, target in {**project.get("scripts", {}), **poetry.get("scripts", {})}.items():
+        found.entry(path, f"console script `{name}`", str(target))
+    optional = " ".join(" ".join(deps) for deps in project.get("optional-dependencies", {}).values())
+    if "pytest" in data.get("tool", {}) or "pytest" in optional or any(d.lower() == "pytest" for d in dependencies):
+        found.test("pytest", path)
+    if "tox" in data.get("tool", {}):
+        found.test("tox", path)
+
+
+def _scan_pipfile(path: str, text: str, found: _Collector):
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        return
+    found.manifest(path, "python (Pipfile)", None, list(data.get("packages", {})))
+
+
+def _scan_package_json(path: str, text: str, found: _Collector):
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return
+    if not isinstance(data, dict):
+        return
+    found.manifest(path, "node (package.json)", data.get("name"), list(data.get("dependencies") or {}))
+    scripts = data.get("scripts") or {}
+    for script in ("start", "dev", "serve"):
+        if script in scripts:
+            found.entry(path, f"npm {'start' if script == 'start' else 'run ' + script}", scripts[script])
+    bins = data.get("bin")
+    for name, target in (bins.items() if isinstance(bins, dict) else [(data.get("name"), bins)] if bins else []):
+        found.entry(path, f"bin `{name}`", str(target))
+    if data.get("main") and "start" not in scripts:
+        found.entry(path, "main module", str(data["main"]))
+    if "test" in scripts and DEFAULT_NPM_TEST not in scripts["test"]:
+        found.test("npm test", path)
+
+
+def _scan_go_mod(path: str, text: str, found: _Collector):
+    module, requires, in_block = None, [], False
+    for line in text.splitlines():
+        line = line.split("//", 1)[0].strip()
+        if line.startswith("module "):
+            module = line.split()[1]
+        elif line.startswith("require ("):
+            in_block = True
+        elif in_block and line == ")":
+            in_block = False
+        elif in_block and line:
+            requires.append(line.split()[0])
+        elif line.startswith("require "):
+            requires.append(line.split()[1])
+    found.manifest(path, "go (go.mod)", module, requires)
+
+
+def _scan_cargo(path: str, text: str, found: _Collector):
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError:
+        return
+    found.manifest(path, "rust (Cargo.toml)", data.get("package", {}).get("name"), list(data.get("dependencies", {})))
+    for binary in data.get("bin", []):
+        found.entry(path, f"binary `{binary.get('name', '')}`", binary.get("path", ""))
+    found.test("cargo test", path)
+
+
+def _scan_dockerfile(path: str, text: str, found: _Collector):
+    for line in text.replace("\\\n", " ").splitlines():
+        instruction, _, rest = line.strip().partition(" ")
+        instruction = instruction.upper()
+        if instruction in ("CMD", "ENTRYPOINT"):
+            try:
+                command = " ".join(json.loads(rest)) if rest.strip().startswith("[") else rest
+            except ValueError:
+                command = rest
+            found.entry(path, f"Docker {instruction}", command)
+        elif instruction == "ENV":
+            # ENV KEY=value KEY2=value, or the legacy ENV KEY value
+            pairs = re.findall(r"([A-Za-z_]\w*)=", rest) or rest.split()[:1]
+            for name in pairs:
+                found.env(name, path)
+
+
+def _scan_commands(path: str, text: str, found: _Collector):
+    """Server start commands in Procfiles, Compose files, Makefiles and shell scripts"""
+    name = PurePosixPath(path).name
+    for line in text.splitlines():
+        line = line.strip()
+        if name == "Procfile" and ":" in line:
+            process, command = line.split(":", 1)
+            found.entry(path, f"Procfile `{process.strip()}`", command)
+            continue
+        match = SERVER_COMMAND.search(line)
+        if match:
+            found.entry(path, "command", match.group(0))
+    if name == "Makefile" and re.search(r"^test\s*:", text, re.MULTILINE):
+        found.test("make test", path)
+
+
+def _scan_env_example(path: str, text: str, found: _Collector):
+    for line in text.splitlines():
+        match = re.match(r"\s*(?:export\s+)?([A-Za-z_]\w*)\s*=", line)
+        if match:
+            found.env(match.group(1), path)
+
+
+def _scan_file(path: str, text: str, found: _Collector):
+    name = PurePosixPath(path).name
+    suffix = PurePosixPath(name).suffix.lower()
+    if suffix == ".py":
+        _scan_python(path, text, found)
+        if name.startswith("test_") or name.endswith("_test.py") or name == "conftest.py":
+            found.test("pytest", path)
+    elif name == "pyproject.toml":
+        _scan_pyproject(path, text, found)
+    elif re.fullmatch(r"requirements[\w.-]*\.txt", name):
+        _scan_requirements(path, text, found)
+    elif name == "Pipfile":
+        _scan_pipfile(path, text, found)
+    elif name == "package.json":
+        _scan_package_json(path, text, found)
+    elif name == "go.mod":
+        _scan_go_mod(path, text, found)
+    elif name == "Cargo.toml":
+        _scan_cargo(path, text, found)
+    elif name == "Dockerfile" or name.startswith("Dockerfile.") or name.endswith(".Dockerfile"):
+        _scan_dockerfile(path, text, found)
+    elif name in ("Procfile", "Makefile") or suffix == ".sh" or re.fullmatch(r"(docker-)?compose[\w.-]*\.ya?ml", name):
+        _scan_commands(path, text, found)
+    elif name in ENV_EXAMPLE_NAMES:
+        _scan_env_example(path, text, found)
+    elif name in ("tox.ini", "pytest.ini"):
+        found.test(name.split(".")[0], path)
+    elif suffix in JS_EXTENSIONS:
+        for match in JS_ENV.finditer(text):
+            found.env(next(group for group in match.groups() if group), path)
+    elif suffix == ".go":
+        if re.search(r"^package main\b", text, re.MULTILINE) and re.search(r"^func main\(\)", text, re.MULTILINE):
+            found.entry(path, "Go main package", f"go run ./{PurePosixPath(path).parent}")
+        if name.endswith("_test.go"):
+            found.test("go test ./...", path)
+        for match in GO_ENV.finditer(text):
+            found.env(match.group(1), path)
+
+
+def walk_files(root: Path):
+    """(relative path, size) of every file, sorted, without vendored and hidden directories (except .github)"""
+    for current, dirs, names in os.walk(root):
+        dirs[:] = sorted(
+            d for d in dirs
+            if (d == ".github" or not d.startswith(".")) and classify(f"{d}/x").action != "skip"
+        )
+        for name in sorted(names):
+            file = Path(current) / name
+            if file.is_file() and not file.is_symlink():
+                yield file.relative_to(root).as_posix(), file.stat().st_size
+
+
+def scan_repository(root) -> ProjectScan:
+    """Scan an extracted repository (or a local working tree) at root"""
+    root = Path(root)
+    found = _Collector()
+    languages: Dict[str, int] = {}
+    directories: Dict[str, int] = {}
+    files = 0
+    for path, size in walk_files(root):
+        files += 1
+        if files > SCAN_MAX_FILES:
+            break
+        language = EXTENSION_LANGUAGES.get(PurePosixPath(path).suffix.lower())
+        if language:
+            languages[language] = languages.get(language, 0) + size
+        if "/" in path:
+            top = path.split("/", 1)[0]
+            directories[top] = directories.get(top, 0) + 1
+        if size > SCAN_MAX_FILE_BYTES or classify(path, size).action == "skip":
+            continue
+        try:
+            text = (root / path).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        _scan_file(path, text, found)
+
+    return ProjectScan(
+        files=min(files, SCAN_MAX_FILES),
+        languages=dict(sorted(languages.items())),
+        directories=dict(sorted(directories.items())),
+        manifests=sorted(found.manifests, key=lambda manifest: manifest["path"]),
+        entry_points=[
+            {"path": path, "kind": kind, "detail": detail} for path, kind, detail in sorted(found.entry_points)
+        ],
+        env_vars={name: sorted(paths) for name, paths in sorted(found.env_vars.items())},
+        test_commands=sorted(found.test_commands),
+    )
+
+
+def static_analysis(project_scan: ProjectScan, root) -> str:
+    """Analysis text built from the scan and the README alone (no LLM call)"""
+    sections = [project_scan.render()]
+    for name in ("README.md", "README.rst", "README.txt", "README"):
+        readme = Path(root) / name
+        if readme.is_file():
+            text = readme.read_text(encoding="utf-8", errors="replace")
+            sections.append(f"{name} (first {README_HEAD_CHARS} characters):\n\n{text[:README_HEAD_CHARS]}")
+            break
+    return "\n\n".join(sections)
@@ -0,0 +1,346 @@
+"""
+Whole-repository snapshots.
+
+Instead of one GitHub request per directory listing and per file, the
+snapshot stage downloads the repository tarball for a ref once and streams
+it to disk inside the job workspace. SnapshotTools then answers the analysis
+agent's tool calls (same names and JSON shapes as GithubTools) from that
+copy, so the whole exploration costs a single GitHub round trip.
+"""
+import io
+import json
+import os
+import shutil
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Iterator, List, Optional
+
+import httpx
+from agno.tools import Toolkit
+
+from pipeline.file_filter import SNIFF_BYTES, FilterStats, classify, read_file
+from pipeline.github_async import READ_FILES_MAX_PATHS, files_json, get_github_sync_client
+from pipeline.repo_tree import TreeEntry, render_tree
+
+# Larger repositories are explored through the API instead (GitHub's size, in KB)
+SNAPSHOT_MAX_KB = int(os.getenv("SNAPSHOT_MAX_KB", "100000"))
+# Hard cap on the extracted bytes, whatever the metadata said
+SNAPSHOT_MAX_BYTES = int(os.getenv("SNAPSHOT_MAX_BYTES", str(300 * 1024 * 1024)))
+
+# Coarse language detection for get_repository_languages (bytes per extension)
+EXTENSION_LANGUAGES = {
+    ".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".ts": "TypeScript",
+    ".tsx": "TypeScript", ".go": "Go", ".rs": "Rust", ".java": "Java", ".kt": "Kotlin",
+    ".rb": "Ruby", ".php": "PHP", ".c": "C", ".h": "C", ".cc": "C++", ".cpp": "C++",
+    ".hpp": "C++", ".cs": "C#", ".swift": "Swift", ".scala": "Scala", ".sh": "Shell",
+    ".html": "HTML", ".css": "CSS", ".scss": "SCSS", ".vue": "Vue", ".dart": "Dart",
+    ".ipynb": "Jupyter Notebook",
+}
+
+
+class SnapshotTooLarge(Exception):
+    """The archive holds more than SNAPSHOT_MAX_BYTES"""
+
+
+@dataclass
+class RepoSnapshot:
+    """A repository extracted to disk at one commit"""
+    root: Path
+    repo_name: str
+    sha: str = ""
+    files: int = 0
+    bytes: int = 0
+    skipped_files: int = 0  # Left out while extracting (see pipeline.file_filter)
+    skipped_bytes: int = 0
+    working_tree: bool = False  # Copied from a local working tree, so it may differ from the commit at sha
+
+    def to_output(self) -> dict:
+        """Stage output form (JSON-serializable, so it hashes deterministically)"""
+        return {"root": str(self.root), "repo_name": self.repo_name, "sha": self.sha,
+                "files": self.files, "bytes": self.bytes,
+                "skipped_files": self.skipped_files, "skipped_bytes": self.skipped_bytes,
+                "working_tree": self.working_tree}
+
+    @classmethod
+    def from_output(cls, output: dict) -> "RepoSnapshot":
+        return cls(**{**output, "root": Path(output["root"])})
+
+
+class _IterStream(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks (for streaming tarfile)"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _member_path(name: str) -> Optional[PurePosixPath]:
+    """Path of an archive member below GitHub's top-level '<owner>-<repo>-<sha>/' folder, or None if unsafe"""
+    parts = PurePosixPath(name).parts[1:]
+    if not parts or any(part in ("..", "") for part in parts) or name.startswith("/"):
+        return None
+    return PurePosixPath(*parts)
+
+
+def extract_archive(fileobj, dest: Path, repo_name: str) -> RepoSnapshot:
+    """
+    Stream a .tar.gz repository archive into dest (replacing its contents).
+    Only regular files and directories are extracted, and only the files
+    pipeline.file_filter does not skip. Raises SnapshotTooLarge.
+    """
+    dest = Path(dest)
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+
+    snapshot = RepoSnapshot(root=dest, repo_name=repo_name)
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as archive:
+        for member in archive:
+            if not snapshot.sha:
+                # GitHub names the top-level folder <owner>-<repo>-<short sha>
+                snapshot.sha = PurePosixPath(member.name).parts[0].rsplit("-", 1)[-1]
+            path = _member_path(member.name)
+            if path is None or not (member.isfile() or member.isdir()):
+                continue
+            target = dest / path
+            if member.isdir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            if classify(path.as_posix(), member.size).action == "skip":
+                snapshot.skipped_files += 1
+                snapshot.skipped_bytes += member.size
+                continue
+            with archive.extractfile(member) as source:
+                head = source.read(SNIFF_BYTES)
+                if classify(path.as_posix(), member.size, head).action == "skip":
+                    snapshot.skipped_files += 1
+                    snapshot.skipped_bytes += member.size
+                    continue
+                snapshot.bytes += member.size
+                if snapshot.bytes > SNAPSHOT_MAX_BYTES:
+                    raise SnapshotTooLarge(f"{repo_name} is larger than {SNAPSHOT_MAX_BYTES} bytes")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with open(target, "wb") as f:
+                    f.write(head)
+                    shutil.copyfileobj(source, f)
+            snapshot.files += 1
+    return snapshot
+
+
+def download_snapshot(
+    repo_name: str,
+    dest: Path,
+    ref: Optional[str] = None,
+    client: Optional[httpx.Client] = None
+) -> RepoSnapshot:
+    """Download the tarball of repo_name at ref (default branch if None) into dest"""
+    client = client or get_github_sync_client()
+    url = f"/repos/{repo_name}/tarball" + (f"/{ref}" if ref else "")
+    with client.stream("GET", url, follow_redirects=True, timeout=httpx.Timeout(60.0, connect=10.0)) as response:
+        response.raise_for_status()
+        return extract_archive(_IterStream(response.iter_bytes()), dest, repo_name)
+
+
+def resolve_commit_sha(repo_name: str, ref: Optional[str] = None, client: Optional[httpx.Client] = None) -> str:
+    """Commit SHA that ref (default branch if None) points to; a few bytes of response"""
+    client = client or get_github_sync_client()
+    response = client.get(
+        f"/repos/{repo_name}/commits/{ref or 'HEAD'}",
+        headers={"Accept": "application/vnd.github.sha"}
+    )
+    response.raise_for_status()
+    return response.text.strip()
+
+
+def scope_snapshot(snapshot: RepoSnapshot, subpath: str) -> RepoSnapshot:
+    """The part of a snapshot under subpath, as a snapshot of its own (raises ValueError if missing)"""
+    subpath = subpath.strip("/")
+    if not subpath:
+        return snapshot
+    root = (snapshot.root / subpath).resolve()
+    if snapshot.root.resolve() not in root.parents or not root.is_dir():
+        raise ValueError(f"{subpath} is not a directory of {snapshot.repo_name}")
+    files = [file for file in root.rglob("*") if file.is_file()]
+    return RepoSnapshot(
+        root=root, repo_name=snapshot.repo_name, sha=snapshot.sha,
+        files=len(files), bytes=sum(file.stat().st_size for file in files), working_tree=snapshot.working_tree
+    )
+
+
+def load_snapshot(archive_path, dest: Path, repo_name: str) -> RepoSnapshot:
+    """Extract a local .tar.gz archive (same layout as GitHub's tarballs) into dest"""
+    with open(archive_path, "rb") as f:
+        return extract_archive(f, dest, repo_name)
+
+
+class SnapshotTools(Toolkit):
+    """GithubTools look-alike that reads a RepoSnapshot instead of calling the API"""
+
+    def __init__(self, snapshot: RepoSnapshot, stats: Optional[FilterStats] = None):
+        self.snapshot = snapshot
+        self.stats = stats or FilterStats()
+        super().__init__(
+            name="github",
+            tools=[
+                self.get_repository,
+                self.get_repository_languages,
+                self.get_repository_tree,
+                self.get_directory_content,
+                self.get_file_content,
+                self.read_files,
+            ]
+        )
+
+    def _resolve(self, path: str) -> Optional[Path]:
+        """Absolute path inside the snapshot, or None if it escapes it"""
+        root = self.snapshot.root.resolve()
+        target = (root / (path or "").strip("/")).resolve()
+        return target if target == root or root in target.parents else None
+
+    def _languages(self) -> dict:
+        languages = {}
+        for file in self.snapshot.root.rglob("*"):
+            language = EXTENSION_LANGUAGES.get(file.suffix.lower())
+            if language and file.is_file():
+                languages[language] = languages.get(language, 0) + file.stat().st_size
+        return dict(sorted(languages.items(), key=lambda item: item[1], reverse=True))
+
+    def get_repository(self, repo_name: str) -> str:
+        """Get details of a specific repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing repository details.
+        """
+        languages = self._languages()
+        return json.dumps({
+            "name": self.snapshot.repo_name,
+            "commit": self.snapshot.sha,
+            "files": self.snapshot.files,
+            "size_bytes": self.snapshot.bytes,
+            "language": next(iter(languages), None),
+        }, indent=2)
+
+    def get_repository_languages(self, repo_name: str) -> str:
+        """Get the languages used in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+
+        Returns:
+            A JSON-formatted string containing the list of languages.
+        """
+        return json.dumps(self._languages(), indent=2)
+
+    def get_repository_tree(self, repo_name: str, path: str = "", ref: Optional[str] = None) -> str:
+        """Get every directory and file of a repository, recursively, in one call.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str, optional): Only list this directory. Defaults to the whole repository.
+            ref (str, optional): Ignored; the snapshot is of a single commit.
+
+        Returns:
+            An indented listing with file sizes and per-directory totals (truncated for huge repositories).
+        """
+        directory = self._resolve(path)
+        if directory is None or not directory.is_dir():
+            return json.dumps({"error": f"{path} is not a directory"})
+
+        root = self.snapshot.root.resolve()
+        entries = []
+        for current, dirs, files in os.walk(directory):
+            base = Path(current).relative_to(root)
+            entries += [TreeEntry((base / name).as_posix(), "dir") for name in dirs]
+            entries += [
+                TreeEntry((base / name).as_posix(), "file", (Path(current) / name).stat().st_size)
+                for name in files
+            ]
+        return render_tree(entries, f"{self.snapshot.repo_name}@{self.snapshot.sha}", path)
+
+    def get_directory_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the contents of a directory in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the directory in the repository. Use empty string for root.
+            ref (str, optional): Ignored; the snapshot is of a single commit.
+
+        Returns:
+            A JSON-formatted string containing a list of directory contents.
+        """
+        directory = self._resolve(path)
+        if directory is None or not directory.exists():
+            return json.dumps({"error": f"{path} not found"})
+        if not directory.is_dir():
+            return json.dumps({"error": f"{path} is a file, not a directory"})
+
+        root = self.snapshot.root.resolve()
+        items = [
+            {
+                "name": entry.name,
+                "path": entry.relative_to(root).as_posix(),
+                "type": "dir" if entry.is_dir() else "file",
+                "size": 0 if entry.is_dir() else entry.stat().st_size,
+            }
+            for entry in directory.iterdir()
+        ]
+        items.sort(key=lambda x: (x["type"] != "dir", x["name"].lower()))
+        return json.dumps(items, indent=2)
+
+    def get_file_content(self, repo_name: str, path: str, ref: Optional[str] = None) -> str:
+        """Get the content of a file in a repository.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            path (str): The path to the file in the repository.
+            ref (str, optional): Ignored; the snapshot is of a single commit.
+
+        Returns:
+            A JSON-formatted string containing the file content and metadata.
+        """
+        result = self._file(path)
+        return json.dumps(result, indent=2 if "content" in result else None)
+
+    def read_files(self, repo_name: str, paths: List[str], ref: Optional[str] = None) -> str:
+        """Get the contents of several files in one call. Prefer this to repeated get_file_content calls.
+
+        Args:
+            repo_name (str): The full name of the repository (e.g., 'owner/repo').
+            paths (List[str]): The paths of the files in the repository (at most 20).
+            ref (str, optional): Ignored; the snapshot is of a single commit.
+
+        Returns:
+            A JSON-formatted list with the path, size and content of each file (long files are truncated).
+        """
+        return files_json([self._file(path) for path in paths[:READ_FILES_MAX_PATHS]], paths)
+
+    def _file(self, path: str) -> dict:
+        file = self._resolve(path)
+        if file is None or not file.exists():
+            return {"error": f"{path} not found"}
+        if file.is_dir():
+            return {"error": f"{path} is a directory, not a file"}
+
+        relative = file.relative_to(self.snapshot.root.resolve()).as_posix()
+        size = file.stat().st_size
+        # Skipped files are never opened, and large ones are read head-only
+        result = read_file(file, relative, self.stats)
+        return {"name": file.name, "path": relative, "size": size, "type": "file", **result}
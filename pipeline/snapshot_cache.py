@@ -0,0 +1,183 @@
+"""
+On-disk cache of repository snapshots, keyed by owner/repo@commit_sha.
+
+Popular repositories are documented again and again; with the cache, a job
+only asks GitHub which commit the branch points to (one tiny request) and
+reuses the extracted tree if another job already downloaded that commit.
+
+Layout under the cache root:
+
+    <owner>__<repo>@<sha>/        extracted repository tree
+    <owner>__<repo>@<sha>.json    metadata; its mtime is the entry's last use
+    locks/                        per-entry fill locks and the index lock
+    stats.json                    hit, miss and eviction counts
+
+Concurrent jobs, in any process, are safe: an entry is filled in a temporary
+directory and renamed into place under its lock, so a second job waiting for
+the same commit finds it complete. Least recently used entries are evicted
+once the cache exceeds its size cap, except entries used in the last
+IN_USE_SECONDS, which a running job may still be reading.
+"""
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from pipeline.snapshot import RepoSnapshot
+
+SNAPSHOT_CACHE_DIR = Path(os.getenv(
+    "SNAPSHOT_CACHE_DIR", str(Path(__file__).parent.parent.absolute() / "storage" / "snapshots")
+))
+# 0 disables the cache (every job downloads into its own workspace)
+SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv("SNAPSHOT_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+# Entries used this recently are never evicted
+IN_USE_SECONDS = int(os.getenv("SNAPSHOT_CACHE_IN_USE_SECONDS", "1800"))
+
+
+@contextmanager
+def _locked(path: Path):
+    """Exclusive advisory lock on a file, shared by every process on the host"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def cache_key(repo_name: str, sha: str) -> str:
+    return f"{repo_name.replace('/', '__')}@{sha}"
+
+
+class SnapshotCache:
+    """Size-capped LRU cache of extracted repositories"""
+
+    def __init__(self, root=None, max_bytes: int = None, in_use_seconds: int = None):
+        self.root = Path(root or SNAPSHOT_CACHE_DIR)
+        self.max_bytes = SNAPSHOT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.in_use_seconds = IN_USE_SECONDS if in_use_seconds is None else in_use_seconds
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _lock_file(self, name: str) -> Path:
+        return self.root / "locks" / f"{name}.lock"
+
+    def _count(self, key: str, delta: int = 1):
+        with _locked(self._lock_file("index")):
+            stats_file = self.root / "stats.json"
+            stats = json.loads(stats_file.read_text()) if stats_file.exists() else {}
+            stats[key] = stats.get(key, 0) + delta
+            # Readers (stats()) do not take the lock, so replace the file atomically
+            staging = stats_file.with_suffix(".tmp")
+            staging.write_text(json.dumps(stats))
+            os.replace(staging, stats_file)
+
+    def _load(self, key: str) -> Optional[RepoSnapshot]:
+        meta_file = self.root / f"{key}.json"
+        if not meta_file.exists() or not (self.root / key).is_dir():
+            return None
+        os.utime(meta_file)  # Mark as recently used
+        return RepoSnapshot.from_output({**json.loads(meta_file.read_text()), "root": str(self.root / key)})
+
+    def get_or_fetch(
+        self,
+        repo_name: str,
+        sha: str,
+        fetch: Callable[[Path], RepoSnapshot]
+    ) -> Tuple[RepoSnapshot, bool]:
+        """
+        Return (snapshot, hit). On a miss, fetch(dest) extracts the repository
+        into dest; only one job per commit fetches, the others wait for it.
+        """
+        key = cache_key(repo_name, sha)
+        snapshot = self._load(key)
+        if snapshot is None:
+            with _locked(self._lock_file(key)):
+                # Another job may have filled it while we waited for the lock
+                snapshot = self._load(key)
+                if snapshot is None:
+                    snapshot = self._fill(key, sha, fetch)
+                    self._count("misses")
+                    self.evict()
+                    return snapshot, False
+        self._count("hits")
+        return snapshot, True
+
+    def _fill(self, key: str, sha: str, fetch: Callable[[Path], RepoSnapshot]) -> RepoSnapshot:
+        staging = self.root / "tmp" / f"{key}.{uuid.uuid4().hex}"
+        try:
+            snapshot = fetch(staging)
+            snapshot.sha = sha
+            # Left over from a fill that crashed before writing its metadata
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            os.replace(staging, self.root / key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        snapshot.root = self.root / key
+        output = snapshot.to_output()
+        del output["root"]
+        (self.root / f"{key}.json").write_text(json.dumps(output))
+        return snapshot
+
+    def _entries(self):
+        """(last used, bytes, key) of every complete entry"""
+        entries = []
+        for meta_file in self.root.glob("*.json"):
+            if meta_file.name == "stats.json":
+                continue
+            try:
+                stat = meta_file.stat()
+                entries.append((stat.st_mtime, json.loads(meta_file.read_text()).get("bytes", 0), meta_file.stem))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits its cap; returns how many"""
+        removed = 0
+        with _locked(self._lock_file("index")):
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            now = time.time()
+            for last_used, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                if now - last_used < self.in_use_seconds:
+                    continue
+                (self.root / f"{key}.json").unlink(missing_ok=True)
+                shutil.rmtree(self.root / key, ignore_errors=True)
+                total -= size
+                removed += 1
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def stats(self) -> dict:
+        """Entries, bytes used, size cap and hit/miss/eviction counts (all processes)"""
+        stats_file = self.root / "stats.json"
+        counts = json.loads(stats_file.read_text()) if stats_file.exists() else {}
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": counts.get("hits", 0),
+            "misses": counts.get("misses", 0),
+            "evictions": counts.get("evictions", 0),
+        }
+
+
+_cache = None
+
+
+def get_cache() -> Optional[SnapshotCache]:
+    """The process-wide cache, or None if SNAPSHOT_CACHE_MAX_BYTES is 0"""
+    global _cache
+    if _cache is None and SNAPSHOT_CACHE_MAX_BYTES > 0:
+        _cache = SnapshotCache()
+    return _cache
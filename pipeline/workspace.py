@@ -0,0 +1,63 @@
+"""
+Per-job workspace for pipeline artifacts.
+
+Every stage reads and writes through a JobWorkspace instead of the current
+working directory, so any number of jobs can run side by side in one process.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+# File names produced inside a workspace
+CONTENT_FILE = "content.txt"
+WORKFLOW_JSON_FILE = "project_workflow.json"
+DIAGRAM_FILE = "project_workflow_diagram.png"
+PDF_FILE = "technical_documentation.pdf"
+WORKFLOW_DEBUG_FILE = "workflow_debug.txt"
+DRAFT_MARKDOWN_FILE = "draft.md"
+DRAFT_PDF_FILE = "draft.pdf"
+SNAPSHOT_DIR = "snapshot"
+
+
+@dataclass(frozen=True)
+class JobWorkspace:
+    """Directory that holds every artifact of a single pipeline job"""
+    root: Path
+
+    @classmethod
+    def create(cls, output_dir) -> "JobWorkspace":
+        """Create (if needed) and return the workspace rooted at output_dir"""
+        root = Path(output_dir).absolute()
+        root.mkdir(parents=True, exist_ok=True)
+        return cls(root=root)
+
+    @property
+    def content_file(self) -> Path:
+        return self.root / CONTENT_FILE
+
+    @property
+    def workflow_json_file(self) -> Path:
+        return self.root / WORKFLOW_JSON_FILE
+
+    @property
+    def diagram_file(self) -> Path:
+        return self.root / DIAGRAM_FILE
+
+    @property
+    def pdf_file(self) -> Path:
+        return self.root / PDF_FILE
+
+    @property
+    def workflow_debug_file(self) -> Path:
+        return self.root / WORKFLOW_DEBUG_FILE
+
+    @property
+    def draft_markdown_file(self) -> Path:
+        return self.root / DRAFT_MARKDOWN_FILE
+
+    @property
+    def draft_pdf_file(self) -> Path:
+        return self.root / DRAFT_PDF_FILE
+
+    @property
+    def snapshot_dir(self) -> Path:
+        return self.root / SNAPSHOT_DIR
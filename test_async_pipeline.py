@@ -0,0 +1,119 @@
+"""Async pipeline: many jobs multiplexed on one event loop, bounded by a semaphore"""
+import asyncio
+import base64
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from pipeline import PipelineCancelled, async_runner
+from pipeline.async_runner import AsyncPipelineRunner, arun_pipeline
+from pipeline.github_async import AsyncGithubTools
+
+
+def test_async_pipeline_produces_the_same_artifacts(tmp_path, fake_agents, fake_diagram):
+    result = asyncio.run(arun_pipeline("https://github.com/owner/repo", "q", tmp_path))
+
+    assert result.repo_name == "owner/repo"
+    assert result.pdf_file.exists()
+    assert result.diagram_file.exists()
+    assert "## Workflow Diagram" in result.content_file.read_text()
+    assert sorted(fake_agents["calls"]) == ["analyze", "document", "workflow"]
+
+
+def test_runner_multiplexes_jobs_within_the_limit(tmp_path, fake_agents, fake_diagram):
+    fake_agents["delay"] = 0.5
+    runner = AsyncPipelineRunner(max_concurrent_jobs=4)
+    peak = []
+    try:
+        started = time.perf_counter()
+        futures = [
+            runner.submit(f"https://github.com/owner/repo{i}", "q", tmp_path / str(i))
+            for i in range(8)
+        ]
+        while not all(f.done() for f in futures):
+            peak.append(runner.stats()["active"])
+            time.sleep(0.02)
+        elapsed = time.perf_counter() - started
+        results = [f.result() for f in futures]
+    finally:
+        runner.close()
+
+    # Two LLM round-trips per job; 8 jobs at 4 at a time take about two job lengths
+    assert elapsed < 4
+    assert max(peak) == 4
+    assert [r.repo_name for r in results] == [f"owner/repo{i}" for i in range(8)]
+    assert runner.stats()["jobs_completed"] == 8
+
+
+def test_runner_cancels_a_run(tmp_path, fake_agents, fake_diagram):
+    fake_agents["delay"] = 5.0
+    runner = AsyncPipelineRunner(max_concurrent_jobs=2)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    try:
+        started = time.perf_counter()
+        with pytest.raises(PipelineCancelled):
+            runner.run("https://github.com/owner/repo", "q", tmp_path, cancel_event=cancel)
+        assert time.perf_counter() - started < 1
+        time.sleep(0.1)
+        assert runner.stats()["jobs_cancelled"] == 1
+    finally:
+        runner.close()
+
+
+def test_cancelled_run_is_abandoned_until_its_threads_exit(tmp_path, fake_agents, fake_diagram, monkeypatch):
+    release = threading.Event()
+    real_snapshot = async_runner.stage_snapshot
+
+    def slow_snapshot(job, inputs):
+        release.wait(5)  # a tarball download the cancelled task cannot interrupt
+        return real_snapshot(job, inputs)
+
+    monkeypatch.setattr(async_runner, "stage_snapshot", slow_snapshot)
+    runner = AsyncPipelineRunner(max_concurrent_jobs=2)
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    try:
+        with pytest.raises(PipelineCancelled) as cancelled:
+            runner.run("https://github.com/owner/repo", "q", tmp_path, cancel_event=cancel)
+        time.sleep(0.2)
+        assert cancelled.value.abandoned and not any(f.done() for f in cancelled.value.abandoned)
+        release.set()
+        for future in cancelled.value.abandoned:
+            future.result(timeout=5)
+    finally:
+        release.set()
+        runner.close()
+
+
+def test_async_github_tools_read_files():
+    def handler(request):
+        if request.url.path == "/repos/owner/repo/contents/README.md":
+            return httpx.Response(200, json={
+                "name": "README.md", "path": "README.md", "type": "file", "size": 7,
+                "content": base64.b64encode(b"# Hello").decode(),
+            })
+        if request.url.path == "/repos/owner/repo/contents/":
+            return httpx.Response(200, json=[
+                {"name": "src", "path": "src", "type": "dir"},
+                {"name": "README.md", "path": "README.md", "type": "file"},
+            ])
+        return httpx.Response(404, json={"message": "Not Found"})
+
+    async def scenario():
+        client = httpx.AsyncClient(base_url="https://api.github.test", transport=httpx.MockTransport(handler))
+        tools = AsyncGithubTools(client)
+        async with client:
+            return (
+                json.loads(await tools.get_file_content("owner/repo", "README.md")),
+                json.loads(await tools.get_directory_content("owner/repo", "")),
+                json.loads(await tools.get_file_content("owner/repo", "missing.py")),
+            )
+
+    readme, listing, missing = asyncio.run(scenario())
+    assert readme["content"] == "# Hello"
+    assert [item["name"] for item in listing] == ["src", "README.md"]
+    assert "error" in missing
@@ -0,0 +1,84 @@
+"""Batch CLI: many repositories, one output directory each, plus a summary"""
+import json
+import threading
+import time
+
+import batch
+
+
+def write_batch(tmp_path, lines):
+    path = tmp_path / "repos.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_batch_documents_every_repository(tmp_path, fake_agents, fake_diagram):
+    batch_file = write_batch(tmp_path, [
+        "# internal repositories",
+        "https://github.com/acme/api  Focus on the REST endpoints",
+        "",
+        '{"repo_url": "acme/web"}',
+        "https://github.com/acme/api",
+    ])
+    out = tmp_path / "out"
+
+    exit_code = batch.main([str(batch_file), "--output-dir", str(out), "--parallelism", "3", "--quiet"])
+
+    assert exit_code == 0
+    assert sorted(p.name for p in out.iterdir() if p.is_dir()) == ["acme__api", "acme__api-2", "acme__web"]
+    for name in ["acme__api", "acme__api-2", "acme__web"]:
+        assert (out / name / "technical_documentation.pdf").exists()
+    summary = json.loads((out / batch.SUMMARY_FILE).read_text())
+    assert summary["succeeded"] == 3 and summary["failed"] == 0
+    assert summary["latency_seconds"]["max"] >= summary["latency_seconds"]["p50"]
+    assert "analyze" in summary["mean_stage_seconds"]
+
+
+def test_batch_reports_failures_and_keeps_going(tmp_path, fake_agents, fake_diagram, monkeypatch):
+    from pipeline import runner
+
+    def broken_pdf(input_file, output_file):
+        if "broken" in str(output_file):
+            raise RuntimeError("renderer crashed")
+        return real_pdf(input_file, output_file)
+
+    real_pdf = runner.generate_pdf
+    monkeypatch.setattr(runner, "generate_pdf", broken_pdf)
+    batch_file = write_batch(tmp_path, ["acme/ok", "acme/broken"])
+    out = tmp_path / "out"
+
+    exit_code = batch.main([str(batch_file), "--output-dir", str(out), "--mode", "threads", "--quiet"])
+
+    assert exit_code == 1
+    outcomes = {o["repo_url"]: o for o in json.loads((out / batch.SUMMARY_FILE).read_text())["outcomes"]}
+    assert outcomes["acme/ok"]["ok"]
+    assert "renderer crashed" in outcomes["acme/broken"]["error"]
+
+
+def test_invalid_line_is_reported_with_its_number(tmp_path):
+    batch_file = write_batch(tmp_path, ["acme/ok", "not a url"])
+
+    assert batch.main([str(batch_file), "--output-dir", str(tmp_path / "out")]) == 2
+
+
+def test_per_package_runs_repositories_one_at_a_time(tmp_path, monkeypatch):
+    lock = threading.Lock()
+    running, peak, budgets = [0], [0], []
+
+    def run_packages(repo_url, question, output_dir, depth, parallelism, resume):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            budgets.append(parallelism)
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return []
+
+    monkeypatch.setattr(batch, "run_packages", run_packages)
+    entries = batch.read_batch_file(write_batch(tmp_path, ["acme/a", "acme/b", "acme/c"]), tmp_path / "out", "q")
+
+    batch.run_batch_threads(entries, 4, per_package=True)
+
+    # The packages of one repository get the whole budget: never 4 x 4 pipelines at once
+    assert peak[0] == 1 and budgets == [4, 4, 4]
@@ -0,0 +1,90 @@
+"""Context packing: importance ranking, token budgets and the packed key files the analysis starts from"""
+import subprocess
+
+import pytest
+
+from pipeline import agents, local_repo, run_pipeline
+from pipeline.context_pack import estimate_tokens, pack_context, packed_context, rank_files
+from pipeline.scanner import scan_repository
+
+
+@pytest.fixture
+def project(tmp_path):
+    repo = tmp_path / "shop"
+    (repo / "shop").mkdir(parents=True)
+    (repo / "tests").mkdir()
+    (repo / "README.md").write_text("# Shop\n\nStart with `shop/app.py`; orders live in shop/orders.py.\n")
+    (repo / "shop" / "__init__.py").write_text("")
+    (repo / "shop" / "app.py").write_text(
+        "from fastapi import FastAPI\nfrom shop.orders import place\nfrom shop import db\n\napp = FastAPI()\n"
+    )
+    (repo / "shop" / "orders.py").write_text("from shop import db\n\n\ndef place(item):\n    return db.save(item)\n")
+    (repo / "shop" / "db.py").write_text("ROWS = []\n\n\ndef save(item):\n    ROWS.append(item)\n    return item\n" * 40)
+    (repo / "shop" / "util.py").write_text("def noop():\n    return None\n" * 5)
+    (repo / "tests" / "test_orders.py").write_text("from shop.orders import place\n\n\ndef test_place():\n    assert place(1)\n")
+    return repo
+
+
+def test_files_are_ranked_by_importance(project):
+    ranked = rank_files(project, scan_repository(project))
+    paths = [item.path for item in ranked]
+    by_path = {item.path: item for item in ranked}
+
+    assert set(paths[:2]) == {"README.md", "shop/app.py"}
+    assert "entry point" in by_path["shop/app.py"].reasons
+    assert "imported by 2" in by_path["shop/db.py"].reasons
+    assert "mentioned in README" in by_path["shop/orders.py"].reasons
+    # Tests and files nothing points to come last
+    assert paths.index("shop/db.py") < paths.index("shop/util.py") < paths.index("tests/test_orders.py")
+
+
+def test_pack_fills_the_budget_deterministically(project):
+    ranked = rank_files(project, scan_repository(project))
+
+    first, second = pack_context(project, ranked, 700), pack_context(project, ranked, 700)
+
+    assert first == second and first.key
+    assert first.tokens <= 700 and first.tokens == estimate_tokens(first.text)
+    packed = [item["path"] for item in first.files]
+    assert set(packed[:2]) == {"README.md", "shop/app.py"}
+    # db.py is larger than a quarter of the budget, so it is cut rather than crowding out the rest
+    db = next(item for item in first.files if item["path"] == "shop/db.py")
+    assert db["cut"] and "cut to fit the context budget" in first.text
+    assert "### tests/test_orders.py" not in first.text
+
+    whole = pack_context(project, ranked, 50000)
+    assert not any(item["cut"] for item in whole.files) and whole.tokens < 50000
+
+
+def test_analysis_starts_from_the_packed_files(tmp_path, project, fake_agents, fake_diagram, monkeypatch):
+    seen = {}
+    fake_analysis_agent = agents.build_analysis_agent
+
+    def analysis_agent(repo_name, **kwargs):
+        seen["packed"] = kwargs["packed_context"]
+        return fake_analysis_agent(repo_name, **kwargs)
+
+    monkeypatch.setattr(agents, "build_analysis_agent", analysis_agent)
+    result = run_pipeline(str(project), "q", tmp_path / "standard", mode="standard")
+
+    assert seen["packed"].files[0]["path"] == "shop/app.py"
+    assert "### README.md" in seen["packed"].text
+    assert result.context == {"files": len(seen["packed"].files), "tokens": seen["packed"].tokens, "budget": 20000}
+
+    # Fast mode documents from the facts and the packed files, without an analysis call
+    fast = run_pipeline(str(project), "q", tmp_path / "fast", mode="fast")
+    assert "### shop/orders.py" in fast.analysis and fast.context["budget"] == 6000
+
+
+def test_working_tree_packs_are_not_cached(tmp_path, project):
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], cwd=project, check=True)
+    subprocess.run(git + ["add", "."], cwd=project, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=project, check=True)
+
+    first = packed_context(local_repo.open_snapshot(project, tmp_path / "snapshot", "local/shop"), 50000)
+    # An uncommitted edit keeps the HEAD sha, so the sha cannot tell the two packs apart
+    (project / "shop" / "app.py").write_text("from fastapi import FastAPI\n\napp = FastAPI(title='edited')\n")
+    second = packed_context(local_repo.open_snapshot(project, tmp_path / "snapshot", "local/shop"), 50000)
+
+    assert "edited" not in first.text and "edited" in second.text
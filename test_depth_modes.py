@@ -0,0 +1,54 @@
+"""Depth modes: fast skips the diagram, file reads are capped, budgets follow the mode"""
+import json
+
+import pytest
+
+from pipeline import agents, run_pipeline
+from pipeline.modes import get_mode
+from pipeline.runner import resolve_budgets
+
+
+def test_fast_mode_skips_the_workflow_diagram(tmp_path, fake_agents):
+    result = run_pipeline("https://github.com/owner/repo", "q", tmp_path, mode="fast")
+
+    assert sorted(fake_agents["calls"]) == ["analyze", "document"]
+    assert result.diagram_file is None
+    assert result.workflow_json_file is None
+    assert result.pdf_file.exists()
+    assert result.mode == "fast"
+    assert result.latency_target_seconds == 30
+    assert result.within_target
+
+
+def test_fast_mode_uses_the_summary_prompt():
+    assert agents.documentation_prompt(get_mode("fast")) == agents.SUMMARY_PROMPT
+    assert agents.documentation_prompt() == agents.DOCUMENTATION_PROMPT
+
+
+def test_file_read_limit_stops_extra_reads():
+    hook = agents.limit_file_reads(2)
+    read = lambda path: f"content of {path}"
+
+    assert hook("get_file_content", read, {"path": "a.py"}) == "content of a.py"
+    assert hook("get_file_content", read, {"path": "b.py"}) == "content of b.py"
+    assert "error" in json.loads(hook("get_file_content", read, {"path": "c.py"}))
+    # Other tools are never limited
+    assert hook("get_directory_content", read, {"path": "src"}) == "content of src"
+
+
+def test_file_read_limit_counts_each_bulk_path():
+    hook = agents.limit_file_reads(3)
+    read_files = lambda paths: paths
+
+    assert hook("read_files", read_files, {"paths": ["a.py", "b.py"]}) == ["a.py", "b.py"]
+    assert hook("read_files", read_files, {"paths": ["c.py", "d.py"]}) == ["c.py"]
+    assert "error" in json.loads(hook("read_files", read_files, {"paths": ["e.py"]}))
+
+
+def test_budgets_layer_defaults_mode_and_overrides():
+    budgets = resolve_budgets({"analysis": 5}, get_mode("fast"))
+
+    assert budgets["analysis"] == 5
+    assert budgets["documentation"] == get_mode("fast").stage_budgets["documentation"]
+    with pytest.raises(ValueError):
+        get_mode("thorough")
@@ -0,0 +1,117 @@
+"""Draft tier: a quick overview is exposed first and replaced by the full document"""
+import base64
+import threading
+
+import httpx
+
+from api.database import Document
+from api.services import doc_generator
+from pipeline.draft import generate_draft
+from test_job_queue import add_document, make_session_maker
+
+
+def fake_github(request):
+    routes = {
+        "/repos/acme/api": {
+            "full_name": "acme/api", "description": "Billing API", "default_branch": "main",
+            "html_url": "https://github.com/acme/api", "license": {"name": "MIT"},
+        },
+        "/repos/acme/api/languages": {"Python": 900, "Shell": 100},
+        "/repos/acme/api/contents/": [
+            {"name": "setup.py", "type": "file"},
+            {"name": "src", "type": "dir"},
+        ],
+        "/repos/acme/api/readme": {"content": base64.b64encode(b"# Acme API\n\n## Usage\n\nRun it.").decode()},
+    }
+    if request.url.path in routes:
+        return httpx.Response(200, json=routes[request.url.path])
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def test_draft_is_built_from_metadata_only(tmp_path):
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(fake_github))
+
+    pdf = generate_draft("https://github.com/acme/api", tmp_path, client=client)
+
+    markdown = (tmp_path / "draft.md").read_text()
+    assert pdf.exists()
+    assert markdown.startswith("# acme/api: Billing API")
+    assert "- **Python:** 90.0%" in markdown
+    assert markdown.index("- src/") < markdown.index("- setup.py")
+    assert "### Acme API" in markdown and "#### Usage" in markdown
+
+
+def test_draft_is_exposed_then_replaced(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    monkeypatch.setattr(doc_generator, "GIT2DOC_ROOT", tmp_path)
+    monkeypatch.setattr(doc_generator, "DRAFT_ENABLED", True)
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(fake_github))
+    monkeypatch.setattr(
+        doc_generator, "generate_draft",
+        lambda repo_url, output_dir: generate_draft(repo_url, output_dir, client=client)
+    )
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc = add_document(db)
+
+    draft_seen = threading.Event()
+    release = threading.Event()
+
+    def slow_runner(repo_url, question, output_dir, **kwargs):
+        # Hold the full pipeline until the draft has been published
+        release.wait(10)
+        return doc_generator.run_pipeline("https://github.com/acme/api", question, output_dir, **kwargs)
+
+    worker = threading.Thread(
+        target=doc_generator.generate_document,
+        args=(doc.id, "https://github.com/acme/api", "", session_maker),
+        kwargs={"runner": slow_runner}
+    )
+    worker.start()
+    for _ in range(100):
+        db.expire_all()
+        if db.get(Document, doc.id).draft_file_path:
+            draft_seen.set()
+            break
+        worker.join(0.05)
+    release.set()
+    worker.join(10)
+
+    assert draft_seen.is_set()
+    db.expire_all()
+    final = db.get(Document, doc.id)
+    assert final.status == "completed"
+    assert final.draft_file_path is None
+    assert not (tmp_path / f"storage/documents/{doc.id}/draft.pdf").exists()
+
+
+def test_draft_finished_after_the_document_leaves_no_files(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    monkeypatch.setattr(doc_generator, "GIT2DOC_ROOT", tmp_path)
+    monkeypatch.setattr(doc_generator, "DRAFT_ENABLED", True)
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(fake_github))
+    document_done = threading.Event()
+
+    def slow_draft(repo_url, output_dir):
+        # A resume restored from checkpoints beats the draft
+        document_done.wait(10)
+        return generate_draft(repo_url, output_dir, client=client)
+
+    monkeypatch.setattr(doc_generator, "generate_draft", slow_draft)
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc = add_document(db)
+
+    doc_generator.generate_document(
+        doc.id, "https://github.com/acme/api", "", session_maker,
+        runner=lambda repo_url, question, output_dir, **kwargs: doc_generator.run_pipeline(
+            "https://github.com/acme/api", question, output_dir, **kwargs
+        )
+    )
+    document_done.set()
+    draft = next(thread for thread in threading.enumerate() if thread.name == f"git2doc-draft-{doc.id}")
+    draft.join(10)
+
+    db.expire_all()
+    assert db.get(Document, doc.id).draft_file_path is None
+    doc_dir = tmp_path / f"storage/documents/{doc.id}"
+    assert not (doc_dir / "draft.pdf").exists() and not (doc_dir / "draft.md").exists()
+    assert (doc_dir / "technical_documentation.pdf").exists()
@@ -0,0 +1,54 @@
+"""File classifier: skipped noise, head-only large files and the bytes saved"""
+import json
+
+from pipeline import file_filter
+from pipeline.file_filter import FilterStats, classify, read_file, read_text
+from pipeline.snapshot import RepoSnapshot, SnapshotTools
+
+
+def test_noise_is_recognized_from_path_and_head():
+    assert classify("package-lock.json").action == "skip"
+    assert classify("web/uv.lock").action == "skip"
+    assert classify("static/app.min.js").action == "skip"
+    assert classify("node_modules/react/index.js").action == "skip"
+    assert classify("docs/logo.svg.png").action == "skip"
+    assert classify("api/service_pb2.py").action == "skip"
+    # Only the first bytes give these away
+    assert classify("assets/logo", 10, b"\x89PNG\r\n\x1a\n").action == "skip"
+    assert classify("client/gen.go", 10, b"// Code generated by protoc. DO NOT EDIT.\n").action == "skip"
+    assert classify("README.md", 10, b"Docs are auto-generated by this tool").action == "keep"
+    assert classify("src/app.py", 10, b"import os\n").action == "keep"
+    assert classify("src/big.py", file_filter.LARGE_FILE_BYTES + 1).action == "head"
+
+
+def test_large_files_are_read_head_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_filter, "LARGE_FILE_BYTES", 100)
+    monkeypatch.setattr(file_filter, "HEAD_CHARS", 20)
+    stats = FilterStats()
+    raw = ("x = 1\n" * 50).encode()
+
+    content = read_text("src/table.py", raw, stats)["content"]
+
+    assert content == "x = 1\n" * 3 + "x \n... (head only: 300 bytes, 50 lines in total)"
+    assert read_text("dist/app.min.js", b"!function(){}", stats) == {"skipped": "generated or minified file"}
+    assert stats.stats() == {
+        "skipped_files": 1, "truncated_files": 1, "bytes_saved": 13 + 300 - len(content.encode()),
+    }
+
+    # On disk only the head is read, even when it ends inside a multi-byte character
+    big = tmp_path / "notes.py"
+    big.write_text("x" + "é" * 41 + "x = 1\n" * 100_000, encoding="utf-8")
+    assert read_file(big, "notes.py")["content"] == "x" + "é" * 19 + f"\n... (head only: {big.stat().st_size} bytes in total)"
+
+
+def test_tools_skip_noise_in_a_working_tree(tmp_path):
+    (tmp_path / "yarn.lock").write_text("lodash@4: ...\n" * 100)
+    (tmp_path / "index.js").write_text("module.exports = 1\n")
+    stats = FilterStats()
+    tools = SnapshotTools(RepoSnapshot(tmp_path, "local/app"), stats=stats)
+
+    files = json.loads(tools.read_files("local/app", ["yarn.lock", "index.js"]))
+
+    assert files[0] == {"path": "yarn.lock", "size": 1400, "skipped": "lockfile (the manifest lists the dependencies)"}
+    assert files[1]["content"] == "module.exports = 1\n"
+    assert stats.stats()["bytes_saved"] == 1400
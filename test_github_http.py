@@ -0,0 +1,94 @@
+"""GitHub HTTP layer: ETag revalidation, the per-run tool call memo and bulk reads"""
+import asyncio
+import base64
+import json
+
+import httpx
+
+from pipeline import github_async
+from pipeline.agents import ToolCallMemo
+from pipeline.github_async import AsyncGithubTools, GithubApiTools
+from pipeline.github_http import AsyncCachingTransport, CachingTransport, ETagStore
+
+LISTING = [{"name": "src", "path": "src", "type": "dir"}, {"name": "README.md", "path": "README.md", "type": "file"}]
+
+
+def fake_github(seen: list):
+    def handler(request):
+        seen.append((request.url.path, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=LISTING, headers={"ETag": '"v1"'})
+    return handler
+
+
+def test_unchanged_resource_is_revalidated_with_a_304():
+    seen, store = [], ETagStore()
+    client = httpx.Client(
+        base_url="https://api.github.test",
+        transport=CachingTransport(store, httpx.MockTransport(fake_github(seen)))
+    )
+
+    first = client.get("/repos/o/r/contents/")
+    second = client.get("/repos/o/r/contents/")
+
+    assert second.status_code == 200 and second.json() == first.json() == LISTING
+    assert seen == [("/repos/o/r/contents/", None), ("/repos/o/r/contents/", '"v1"')]
+    assert store.stats()["not_modified"] == 1
+
+
+def test_repeated_tool_calls_reach_github_once():
+    seen = []
+    client = httpx.Client(
+        base_url="https://api.github.test",
+        transport=CachingTransport(ETagStore(), httpx.MockTransport(fake_github(seen)))
+    )
+    tools, memo = GithubApiTools(client), ToolCallMemo()
+
+    for _ in range(3):
+        result = memo.hook("get_directory_content", tools.get_directory_content, {"repo_name": "o/r", "path": ""})
+
+    assert [item["name"] for item in json.loads(result)] == ["src", "README.md"]
+    assert len(seen) == 1
+    assert memo.stats() == {"requested": 3, "memoized": 2, "executed": 1}
+
+
+def test_async_memo_hook_awaits_the_tool():
+    seen = []
+
+    async def scenario():
+        client = httpx.AsyncClient(
+            base_url="https://api.github.test",
+            transport=AsyncCachingTransport(ETagStore(), httpx.MockTransport(fake_github(seen)))
+        )
+        tools, memo = AsyncGithubTools(client), ToolCallMemo()
+
+        async def call(**arguments):
+            return await tools.get_directory_content(**arguments)
+
+        results = [await memo.ahook("get_directory_content", call, {"repo_name": "o/r", "path": ""}) for _ in range(2)]
+        await client.aclose()
+        return results, memo.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results[0] == results[1] and len(seen) == 1
+    assert stats["memoized"] == 1
+
+
+def test_read_files_fetches_concurrently_and_caps_each_file(monkeypatch):
+    monkeypatch.setattr(github_async, "READ_FILES_MAX_CHARS", 10)
+    bodies = {"README.md": "# Project\n", "src/app.py": "x" * 50}
+
+    def handler(request):
+        path = request.url.path.split("/contents/", 1)[1]
+        if path not in bodies:
+            return httpx.Response(404, json={"message": "Not Found"})
+        content = base64.b64encode(bodies[path].encode()).decode()
+        return httpx.Response(200, json={"path": path, "size": len(bodies[path]), "content": content})
+
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(handler))
+    files = json.loads(GithubApiTools(client).read_files("o/r", ["README.md", "src/app.py", "missing.py"]))
+
+    assert files[0] == {"path": "README.md", "size": 10, "content": "# Project\n"}
+    assert files[1]["content"] == "x" * 10 + "\n... (truncated, 50 chars in total)"
+    assert files[2]["path"] == "missing.py" and "404" in files[2]["error"]
@@ -0,0 +1,165 @@
+"""GitHub rate-limit governor: shared budget, pacing instead of 403s, token pool rotation"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from pipeline.github_rate import (
+    AsyncRateLimitedTransport,
+    RateGovernor,
+    RateLimitedTransport,
+    RateLimitExhausted,
+    _locked,
+)
+
+API_URL = "https://api.github.test"
+
+
+class FakeGithub:
+    """Allows `limit` requests per token in one-second windows, then answers 403"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.windows = {}
+        self.served = {}
+        self.lock = threading.Lock()
+
+    def handler(self, request):
+        token = request.headers.get("Authorization", "anonymous")
+        with self.lock:
+            now = time.time()
+            reset, used = self.windows.get(token, (int(now) + 1, 0))
+            if now >= reset:
+                reset, used = int(now) + 1, 0
+            allowed = used < self.limit
+            used += allowed
+            self.windows[token] = (reset, used)
+            self.served[token] = self.served.get(token, 0) + allowed
+        headers = {
+            "X-RateLimit-Limit": str(self.limit), "X-RateLimit-Remaining": str(self.limit - used),
+            "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": "core",
+        }
+        return httpx.Response(200 if allowed else 403, json={"ok": allowed}, headers=headers)
+
+
+def fetch_all(client: httpx.Client, count: int):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        return list(pool.map(lambda _: client.get("/repos/o/r").status_code, range(count)))
+
+
+def test_jobs_slow_down_instead_of_failing(tmp_path):
+    github = FakeGithub(limit=4)
+    plain = httpx.Client(base_url=API_URL, transport=httpx.MockTransport(github.handler))
+    assert 403 in fetch_all(plain, 8)
+
+    github = FakeGithub(limit=4)
+    governor = RateGovernor(tokens=["t1"], state_dir=tmp_path, reserve_fraction=0.5)
+    governed = httpx.Client(
+        base_url=API_URL, transport=RateLimitedTransport(httpx.MockTransport(github.handler), API_URL, governor)
+    )
+
+    assert fetch_all(governed, 8) == [200] * 8
+    stats = governor.stats()
+    assert stats["requests"] >= 8 and stats["paced"] > 0
+    assert stats["tokens"][0]["limit"] == 4
+
+
+def test_requests_rotate_across_the_token_pool(tmp_path):
+    github = FakeGithub(limit=3)
+    governor = RateGovernor(tokens=["t1", "t2"], state_dir=tmp_path, reserve_fraction=0)
+    client = httpx.Client(
+        base_url=API_URL, transport=RateLimitedTransport(httpx.MockTransport(github.handler), API_URL, governor)
+    )
+
+    statuses = [client.get("/repos/o/r").status_code for _ in range(6)]
+
+    assert statuses == [200] * 6
+    assert github.served == {"Bearer t1": 3, "Bearer t2": 3}
+    assert governor.stats()["paced"] == 0
+
+
+def test_budget_is_shared_between_workers(tmp_path):
+    now = 1_000_000.0
+    worker_a = RateGovernor(tokens=["t1"], state_dir=tmp_path, clock=lambda: now)
+    worker_b = RateGovernor(tokens=["t1"], state_dir=tmp_path, clock=lambda: now)
+
+    token, wait = worker_a.acquire()
+    worker_a.update(token, httpx.Response(200, headers={
+        "X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(now) + 30),
+    }))
+
+    # The other worker has never talked to GitHub, yet waits for the reset
+    assert (token, wait) == ("t1", 0.0)
+    assert worker_b.acquire() == ("t1", 30.0)
+
+
+def test_revalidations_do_not_drain_the_budget(tmp_path):
+    governor = RateGovernor(tokens=["t1"], state_dir=tmp_path, reserve_fraction=0.5)
+    headers = {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "9", "X-RateLimit-Reset": str(int(time.time()) + 60)}
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json={}, headers={**headers, "ETag": '"v1"'})
+
+    client = httpx.Client(
+        base_url=API_URL, transport=RateLimitedTransport(httpx.MockTransport(handler), API_URL, governor)
+    )
+    client.get("/repos/o/r")
+    statuses = [client.get("/repos/o/r", headers={"If-None-Match": '"v1"'}).status_code for _ in range(20)]
+
+    # GitHub does not count 304s, so neither does the governor: no pacing despite 21 requests on a limit of 10
+    assert statuses == [304] * 20
+    stats = governor.stats()
+    assert stats["tokens"][0]["remaining"] == 9
+    assert (stats["revalidated"], stats["paced"]) == (20, 0)
+
+
+def test_an_exhausted_budget_fails_instead_of_blocking_for_the_window(tmp_path):
+    # The unauthenticated budget, spent with most of the hour to go
+    headers = {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 3000)}
+    governor = RateGovernor(tokens=[None], state_dir=tmp_path)
+    client = httpx.Client(
+        base_url=API_URL,
+        transport=RateLimitedTransport(httpx.MockTransport(lambda _: httpx.Response(200, headers=headers)), API_URL, governor)
+    )
+    client.get("/repos/o/r")
+
+    started = time.perf_counter()
+    with pytest.raises(RateLimitExhausted):
+        client.get("/repos/o/r")
+    assert time.perf_counter() - started < 1
+
+
+def test_async_requests_wait_for_the_lock_off_the_event_loop(tmp_path):
+    governor = RateGovernor(tokens=["t1"], state_dir=tmp_path)
+    client = httpx.AsyncClient(
+        base_url=API_URL,
+        transport=AsyncRateLimitedTransport(httpx.MockTransport(lambda request: httpx.Response(200)), API_URL, governor),
+    )
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        # Another worker process holds the state lock for a while
+        with _locked(governor._lock_file):
+            request = asyncio.create_task(client.get("/repos/o/r"))
+            await asyncio.to_thread(time.sleep, 0.3)
+            assert not request.done()
+        response = await request
+        ticking.cancel()
+        await client.aclose()
+        return response.status_code, ticks
+
+    status, ticks = asyncio.run(scenario())
+    assert status == 200 and ticks >= 10
@@ -0,0 +1,114 @@
+"""Cancelling a running generation job stops the pipeline and frees the slot"""
+import threading
+import time
+
+import pytest
+from agno.exceptions import RunCancelledException
+
+from api.database import Document, Job
+from api.services import doc_generator, job_queue
+from api.worker import Worker
+from pipeline.agents import ToolCallMemo
+from pipeline.dag import PipelineCancelled
+from test_job_queue import add_document, make_session_maker
+
+
+def test_cancel_stops_running_job(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    monkeypatch.setattr(doc_generator, "GIT2DOC_ROOT", tmp_path)
+    fake_agents["delay"] = 3.0
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc = add_document(db)
+    job = job_queue.enqueue_job(db, doc.id)
+
+    worker = Worker(db_session_maker=session_maker, worker_id="w", cancel_poll_interval=0.1)
+    slot = threading.Thread(target=worker.run_once)
+    slot.start()
+    time.sleep(0.3)  # let the analysis stage start
+
+    started = time.perf_counter()
+    assert job_queue.cancel_jobs(db, doc.id) == 1
+    slot.join(timeout=5)
+
+    assert not slot.is_alive()
+    assert time.perf_counter() - started < 1.5
+    db.expire_all()
+    assert db.get(Job, job.id).status == "cancelled"
+    assert db.get(Document, doc.id).status == "processing"  # left for the API to set
+    assert job_queue.claim_job(db, "w") is None
+    # The slot is free, but the abandoned analysis still holds the lease, so the document cannot be resumed yet
+    assert job_queue.has_live_attempt(db, doc.id)
+    # It finishes later, writes nothing for the cancelled job and releases the lease
+    time.sleep(3)
+    assert not (tmp_path / f"storage/documents/{doc.id}/.checkpoints").exists()
+    assert fake_agents["calls"] == ["analyze"]
+    db.expire_all()
+    assert not job_queue.has_live_attempt(db, doc.id)
+
+
+def test_deleted_document_files_are_removed_once_the_attempt_exits(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    monkeypatch.setattr(doc_generator, "GIT2DOC_ROOT", tmp_path)
+    fake_agents["delay"] = 2.0
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc = add_document(db)
+    job_queue.enqueue_job(db, doc.id)
+    doc_dir = doc_generator.document_dir(doc.id)
+
+    worker = Worker(db_session_maker=session_maker, worker_id="w", cancel_poll_interval=0.1)
+    slot = threading.Thread(target=worker.run_once)
+    slot.start()
+    time.sleep(0.3)
+
+    # What DELETE /documents/<id> does: the attempt is live, so the files are left to the worker
+    job_queue.cancel_jobs(db, doc.id)
+    assert job_queue.has_live_attempt(db, doc.id)
+    db.delete(doc)
+    db.commit()
+    slot.join(timeout=5)
+    assert doc_dir.exists()  # the abandoned analysis is still running
+
+    time.sleep(2.5)
+    assert not doc_dir.exists()
+
+
+def test_lost_lease_stops_the_attempt(tmp_path):
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc = add_document(db)
+    job = job_queue.enqueue_job(db, doc.id)
+
+    def handler(doc_id, repo_url, prompt, db_session_maker, cancel_event=None):
+        if cancel_event.wait(timeout=5):
+            raise PipelineCancelled("cancelled")
+
+    worker = Worker(db_session_maker=session_maker, handler=handler, worker_id="w", lease_seconds=0.3)
+    slot = threading.Thread(target=worker.run_once)
+    slot.start()
+    time.sleep(0.2)
+    # The lease expired (a long GC pause, say) and another worker claimed the job
+    db.query(Job).filter(Job.id == job.id).update({Job.lease_owner: "other"})
+    db.commit()
+
+    slot.join(timeout=2)
+    assert not slot.is_alive()
+    db.expire_all()
+    assert (db.get(Job, job.id).status, db.get(Job, job.id).lease_owner) == ("running", "other")
+
+
+def test_cancel_ends_the_agent_loop_at_its_next_tool_call():
+    cancel = threading.Event()
+    memo = ToolCallMemo(cancel)
+    calls = []
+
+    def read_files(paths):
+        calls.append(paths)
+        return "contents"
+
+    assert memo.hook("read_files", read_files, {"paths": ["a.py"]}) == "contents"
+    cancel.set()
+
+    # No more GitHub reads, and agno ends the run instead of asking the model for another turn
+    with pytest.raises(RunCancelledException):
+        memo.hook("read_files", read_files, {"paths": ["b.py"]})
+    assert calls == [["a.py"]]
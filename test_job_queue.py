@@ -0,0 +1,92 @@
+"""Durable job queue: lease-based claiming, visibility timeouts and retries"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, Document, Job, User
+from api.services import job_queue
+from api.worker import Worker
+
+
+def make_session_maker(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def add_document(db):
+    user = User(email=f"u{datetime.utcnow().timestamp()}@x.io", full_name="U")
+    db.add(user)
+    db.commit()
+    doc = Document(user_id=user.id, name="Processing...", repo_url="https://github.com/o/r", github_repo="o/r")
+    db.add(doc)
+    db.commit()
+    return doc
+
+
+def test_only_one_worker_claims_a_job(tmp_path):
+    db = make_session_maker(tmp_path)()
+    job = job_queue.enqueue_job(db, add_document(db).id)
+
+    first = job_queue.claim_job(db, "worker-a")
+    second = job_queue.claim_job(db, "worker-b")
+
+    assert first.id == job.id and first.lease_owner == "worker-a"
+    assert second is None
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    db = make_session_maker(tmp_path)()
+    job = job_queue.enqueue_job(db, add_document(db).id)
+    job_queue.claim_job(db, "crashed-worker", lease_seconds=60)
+
+    # Simulate the lease running out without a heartbeat
+    db.query(Job).filter(Job.id == job.id).update({Job.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    reclaimed = job_queue.claim_job(db, "worker-b")
+    assert reclaimed.id == job.id
+    assert reclaimed.lease_owner == "worker-b"
+    assert reclaimed.attempts == 2
+    assert not job_queue.complete_job(db, job.id, "crashed-worker")
+    assert job_queue.complete_job(db, job.id, "worker-b")
+
+
+def test_failures_retry_with_backoff_then_fail_document(tmp_path):
+    db = make_session_maker(tmp_path)()
+    doc = add_document(db)
+    job = job_queue.enqueue_job(db, doc.id, max_attempts=2)
+
+    job_queue.claim_job(db, "w")
+    assert job_queue.fail_job(db, job.id, "w", "boom") == "queued"
+    db.refresh(job)
+    assert job.available_at > datetime.utcnow()
+    assert job_queue.claim_job(db, "w") is None  # still backing off
+
+    job.available_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    job_queue.claim_job(db, "w")
+    assert job_queue.fail_job(db, job.id, "w", "boom again") == "failed"
+    db.refresh(doc)
+    assert doc.status == "failed"
+
+
+def test_worker_runs_queued_jobs(tmp_path):
+    session_maker = make_session_maker(tmp_path)
+    db = session_maker()
+    doc_ids = [add_document(db).id for _ in range(3)]
+    for doc_id in doc_ids:
+        job_queue.enqueue_job(db, doc_id)
+
+    handled = []
+
+    def handler(doc_id, repo_url, prompt, db_session_maker, cancel_event=None):
+        handled.append(doc_id)
+
+    worker = Worker(concurrency=2, db_session_maker=session_maker, handler=handler, worker_id="w")
+    while worker.run_once():
+        pass
+
+    assert sorted(handled) == doc_ids
+    assert {job.status for job in db.query(Job).all()} == {"completed"}
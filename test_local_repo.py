@@ -0,0 +1,90 @@
+"""Local repositories: working trees, bare git repositories and file:// URLs"""
+import json
+import subprocess
+
+import pytest
+
+from pipeline import agents, local_repo, parse_repo_url, run_pipeline
+from pipeline.planner import local_profile
+from pipeline.snapshot import SnapshotTools
+
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+@pytest.fixture
+def working_tree(tmp_path):
+    repo = tmp_path / "app"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "main.py").write_text("print('hi')\n")
+    (repo / "README.md").write_text("# App\n")
+    (repo / ".gitignore").write_text("build/\n.env\n")
+    (repo / ".env").write_text("SECRET=abc\n")
+    (repo / "build").mkdir()
+    (repo / "build" / "huge.bin").write_bytes(b"\0" * 50_000)
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "init")
+    return repo
+
+
+def test_urls_are_local_only_when_explicit(working_tree):
+    assert parse_repo_url(str(working_tree)) == "local/app"
+    assert parse_repo_url(f"file://{working_tree}") == "local/app"
+    assert parse_repo_url("github.com/owner/repo") == "owner/repo"
+    with pytest.raises(ValueError):
+        parse_repo_url(f"file://{working_tree}/missing")
+
+
+def test_working_tree_is_analyzed_in_place(tmp_path, working_tree, fake_agents, fake_diagram, monkeypatch):
+    seen = {}
+    fake_analysis_agent = agents.build_analysis_agent
+
+    def analysis_agent(repo_name, **kwargs):
+        seen["snapshot"] = kwargs["snapshot"]
+        return fake_analysis_agent(repo_name, **kwargs)
+
+    monkeypatch.setattr(agents, "build_analysis_agent", analysis_agent)
+    result = run_pipeline(str(working_tree), "q", tmp_path / "out")
+
+    assert result.repo_name == "local/app" and result.pdf_file.exists()
+    assert seen["snapshot"].root != working_tree
+    # Ignored files count towards neither the snapshot nor the plan
+    assert seen["snapshot"].files == 3
+    assert local_profile("local/app", working_tree).size_kb == 0
+    assert working_tree.exists()
+
+
+def test_bare_repository_is_exported(tmp_path, working_tree):
+    bare = tmp_path / "app.git"
+    git(tmp_path, "clone", "-q", "--bare", str(working_tree), str(bare))
+    path = local_repo.local_repo_path(f"file://{bare}")
+
+    snapshot = local_repo.open_snapshot(path, tmp_path / "snapshot", local_repo.local_repo_name(path))
+    tools = SnapshotTools(snapshot)
+
+    assert (snapshot.repo_name, snapshot.files) == ("local/app", 3)
+    assert snapshot.sha == local_repo.head_sha(working_tree)
+    assert json.loads(tools.get_file_content("local/app", "src/main.py"))["content"] == "print('hi')\n"
+    assert local_profile("local/app", path).directories == ["src"]
+
+
+def test_ignored_files_of_a_working_tree_are_not_readable(tmp_path, working_tree):
+    (working_tree / "node_modules" / "react").mkdir(parents=True)
+    (working_tree / "node_modules" / ".gitignore").write_text("*\n")
+    (working_tree / "node_modules" / "react" / "index.js").write_text("module.exports = {}\n")
+
+    snapshot = local_repo.open_snapshot(working_tree, tmp_path / "snapshot", "local/app")
+    tools = SnapshotTools(snapshot)
+
+    assert "error" in json.loads(tools.get_file_content("local/app", ".env"))
+    assert "error" in json.loads(tools.read_files("local/app", [".env"]))[0]
+    listed = {item["name"] for item in json.loads(tools.get_directory_content("local/app", ""))}
+    assert listed == {".gitignore", "README.md", "src"}
+    tree = tools.get_repository_tree("local/app")
+    assert "SECRET" not in tree and ".env" not in tree and "node_modules" not in tree
+    assert json.loads(tools.get_repository_languages("local/app")) == {"Python": 12}
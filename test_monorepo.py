@@ -0,0 +1,109 @@
+"""Monorepos: jobs scoped to a subpath and per-package documentation with an index"""
+import base64
+import json
+import subprocess
+from dataclasses import asdict
+
+import httpx
+
+from pipeline import local_repo, parse_repo_url, parse_tree_path, planner, run_packages, snapshot
+from pipeline.github_async import GithubApiTools
+from pipeline.monorepo import find_packages, package_url
+from pipeline.planner import fetch_tree_profile
+from pipeline.runner import PipelineJob, stage_snapshot
+from pipeline.workspace import JobWorkspace
+
+
+def test_tree_urls_carry_ref_and_subpath():
+    url = "https://github.com/org/mono/tree/main/services/billing"
+
+    assert parse_repo_url(url) == "org/mono"
+    assert parse_tree_path(url) == ("main", "services/billing")
+    assert parse_tree_path("github.com/org/mono") == (None, "")
+    assert find_packages([
+        "pyproject.toml", "services/billing/pyproject.toml", "services/billing/src/app.py",
+        "web/package.json", "web/node_modules/react/package.json", "tools/go.mod",
+    ]) == ["services/billing", "tools", "web"]
+
+
+def test_github_tools_see_the_subpath_as_the_root():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.url.params.get("ref")))
+        path = request.url.path.split("/contents/", 1)[1]
+        if path == "services/billing":
+            return httpx.Response(200, json=[{"name": "app.py", "path": "services/billing/app.py", "type": "file"}])
+        content = base64.b64encode(b"print('bill')\n").decode()
+        return httpx.Response(200, json={"path": path, "size": 14, "content": content})
+
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(handler))
+    tools = GithubApiTools(client, ref="main", subpath="services/billing")
+
+    listing = json.loads(tools.get_directory_content("org/mono", ""))
+    file = json.loads(tools.get_file_content("org/mono", "app.py"))
+
+    assert listing[0]["path"] == "app.py" and file["path"] == "app.py"
+    assert seen == [
+        ("/repos/org/mono/contents/services/billing", "main"),
+        ("/repos/org/mono/contents/services/billing/app.py", "main"),
+    ]
+
+
+def test_each_package_is_documented_with_an_index(tmp_path, fake_agents, fake_diagram):
+    repo = tmp_path / "mono"
+    for package, manifest in (("api", "pyproject.toml"), ("web", "package.json")):
+        (repo / package).mkdir(parents=True)
+        (repo / package / manifest).write_text("{}\n")
+        (repo / package / "main.py").write_text("print(1)\n")
+
+    outcomes = run_packages(str(repo), "q", tmp_path / "out", parallelism=2)
+
+    assert [(outcome.path, outcome.result.repo_name) for outcome in outcomes] == [("api", "local/api"), ("web", "local/web")]
+    assert all(outcome.result.pdf_file.exists() for outcome in outcomes)
+    index = (tmp_path / "out" / "index.md").read_text()
+    assert "packages/api/technical_documentation.pdf" in index and "Generated from ANALYSIS OF local/web" in index
+    assert (tmp_path / "out" / "index.pdf").exists()
+
+
+def test_local_packages_keep_their_repository(tmp_path):
+    repo = tmp_path / "mono"
+    (repo / "web" / "node_modules" / "react").mkdir(parents=True)
+    (repo / ".gitignore").write_text("node_modules/\n")
+    (repo / "web" / "package.json").write_text("{}\n")
+    (repo / "web" / "node_modules" / "react" / "index.js").write_text("x" * 300_000)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(git + ["init", "-q"], cwd=repo, check=True)
+    subprocess.run(git + ["add", "."], cwd=repo, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=repo, check=True)
+
+    package = local_repo.local_repo_path(package_url(str(repo), "web"))
+
+    # The repository's .gitignore and HEAD apply to the package
+    assert list(local_repo.list_files(package)) == [("package.json", 3)]
+    assert local_repo.head_sha(package) == local_repo.head_sha(repo) != "working-tree"
+    assert local_repo.open_snapshot(package, tmp_path / "snapshot", "local/web").files == 1
+
+
+def test_packages_of_a_large_monorepo_skip_the_snapshot(tmp_path, monkeypatch):
+    tree = [
+        {"path": "services/billing", "type": "tree"},
+        {"path": "services/billing/app.py", "type": "blob", "size": 2048},
+        {"path": "assets/video.bin", "type": "blob", "size": 900 * 1024 * 1024},
+    ]
+    client = httpx.Client(
+        base_url="https://api.github.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"tree": tree, "truncated": False})),
+    )
+    monkeypatch.setattr(planner, "fetch_tree_profile", fetch_tree_profile)  # the real one, not the offline fake
+    plan = planner.plan_job("org/mono", client=client, ref="main", subpath="services/billing")
+    assert (plan.size_kb, plan.repository_kb) == (2, 900 * 1024 + 2)
+
+    def download(*args, **kwargs):
+        raise AssertionError("the whole repository must not be downloaded")
+
+    monkeypatch.setattr(snapshot, "download_snapshot", download)
+    job = PipelineJob(repo_url="", question="", workspace=JobWorkspace.create(tmp_path), subpath="services/billing")
+
+    # Straight to API ingestion instead of streaming the tarball up to the extraction cap
+    assert stage_snapshot(job, {"ingest": "org/mono", "plan": asdict(plan)}) is None
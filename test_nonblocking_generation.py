@@ -0,0 +1,91 @@
+"""Document generation in the embedded worker must not stall other requests on the event loop"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import fitz
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, Document, User
+from api.main import app
+from api.services import doc_generator, job_queue
+from api.worker import Worker
+
+GENERATION_SECONDS = 0.5
+
+
+def make_session_maker(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def slow_pipeline(repo_url, question, output_dir, **kwargs):
+    """Blocking stand-in for run_pipeline that writes a one-page PDF"""
+    time.sleep(GENERATION_SECONDS)
+    pdf_file = output_dir / "technical_documentation.pdf"
+    pdf = fitz.open()
+    pdf.new_page()
+    pdf.save(pdf_file)
+    pdf.close()
+    return SimpleNamespace(
+        pdf_file=pdf_file, repo_name="owner/repo", subpath="", degraded_stages=[], resumed_stages=[],
+        stage_timings={"analyze": 0.1}, elapsed_seconds=0.1
+    )
+
+
+def test_health_latency_stays_flat_during_generation(tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_generator, "run_pipeline", slow_pipeline)
+    monkeypatch.setattr(doc_generator, "GIT2DOC_ROOT", tmp_path)
+    session_maker = make_session_maker(tmp_path)
+
+    db = session_maker()
+    user = User(email="a@b.c", full_name="A")
+    db.add(user)
+    db.commit()
+    doc_ids = []
+    for _ in range(4):
+        doc = Document(user_id=user.id, name="Processing...", repo_url="u", github_repo="owner/repo")
+        db.add(doc)
+        db.commit()
+        doc_ids.append(doc.id)
+        job_queue.enqueue_job(db, doc.id)
+    db.close()
+
+    # The same worker the API embeds, one slot per job
+    worker = Worker(concurrency=4, db_session_maker=session_maker, poll_interval=0.02, worker_id="embedded")
+
+    def statuses():
+        db = session_maker()
+        try:
+            return [db.get(Document, doc_id).status for doc_id in doc_ids]
+        finally:
+            db.close()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            worker.start()
+            await asyncio.sleep(0.1)  # let every slot claim its job
+
+            latencies = []
+            deadline = time.monotonic() + 10
+            while statuses() != ["completed"] * 4 and time.monotonic() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                await asyncio.sleep(0.02)
+            return latencies
+
+    try:
+        latencies = asyncio.run(scenario())
+    finally:
+        worker.stop(timeout=5)
+
+    assert len(latencies) >= 5
+    assert max(latencies) < GENERATION_SECONDS / 5
+
+    assert statuses() == ["completed"] * 4
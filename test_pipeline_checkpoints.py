@@ -0,0 +1,43 @@
+"""Checkpointed stages: a late failure resumes without repeating LLM calls"""
+import pytest
+
+from pipeline import run_pipeline, runner
+from pipeline.dag import StageError
+
+
+def test_render_failure_resumes_without_new_llm_calls(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    real_generate_pdf = runner.generate_pdf
+
+    def broken_generate_pdf(input_file, output_file):
+        raise RuntimeError("PyMuPDF crashed")
+
+    monkeypatch.setattr(runner, "generate_pdf", broken_generate_pdf)
+    with pytest.raises(StageError) as excinfo:
+        run_pipeline("https://github.com/owner/repo", "q", tmp_path, resume=True)
+    assert excinfo.value.stage == "render"
+    assert sorted(fake_agents["calls"]) == ["analyze", "document", "workflow"]
+
+    monkeypatch.setattr(runner, "generate_pdf", real_generate_pdf)
+    result = run_pipeline("https://github.com/owner/repo", "q", tmp_path, resume=True)
+
+    assert sorted(fake_agents["calls"]) == ["analyze", "document", "workflow"]
+    assert set(result.resumed_stages) == {"analyze", "document", "workflow_json", "diagram"}
+    assert result.pdf_file.exists()
+    # The diagram is embedded exactly once even though render ran twice
+    assert result.content_file.read_text().count("## Workflow Diagram") == 1
+
+
+def test_changed_inputs_invalidate_checkpoints(tmp_path, fake_agents, fake_diagram):
+    run_pipeline("https://github.com/owner/repo", "first question", tmp_path, resume=True)
+    result = run_pipeline("https://github.com/owner/repo", "second question", tmp_path, resume=True)
+
+    assert result.resumed_stages == []
+    assert fake_agents["calls"].count("analyze") == 2
+
+
+def test_checkpoints_are_ignored_without_resume(tmp_path, fake_agents, fake_diagram):
+    run_pipeline("https://github.com/owner/repo", "q", tmp_path)
+    result = run_pipeline("https://github.com/owner/repo", "q", tmp_path)
+
+    assert result.resumed_stages == []
+    assert fake_agents["calls"].count("analyze") == 2
@@ -0,0 +1,68 @@
+"""Stage DAG scheduler and the parallel pipeline built on it"""
+import time
+
+import pytest
+
+from pipeline import run_pipeline
+from pipeline.dag import Stage, StageError, run_dag, validate_dag
+
+
+def test_independent_stages_run_in_parallel():
+    def slow(value):
+        def func(inputs):
+            time.sleep(0.2)
+            return value
+        return func
+
+    stages = [
+        Stage("root", lambda inputs: 1),
+        Stage("left", slow("L"), deps=("root",)),
+        Stage("right", slow("R"), deps=("root",)),
+        Stage("join", lambda inputs: inputs["left"] + inputs["right"], deps=("left", "right")),
+    ]
+
+    started = time.perf_counter()
+    result = run_dag(stages)
+    elapsed = time.perf_counter() - started
+
+    assert result.outputs["join"] == "LR"
+    assert elapsed < 0.35
+    assert set(result.timings) == {"root", "left", "right", "join"}
+
+
+def test_failing_stage_raises_and_skips_dependents():
+    ran = []
+
+    def boom(inputs):
+        raise RuntimeError("render exploded")
+
+    stages = [
+        Stage("a", boom),
+        Stage("b", lambda inputs: ran.append("b"), deps=("a",)),
+    ]
+
+    with pytest.raises(StageError) as excinfo:
+        run_dag(stages)
+    assert excinfo.value.stage == "a"
+    assert ran == []
+
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        validate_dag([Stage("a", None, deps=("b",)), Stage("b", None, deps=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        validate_dag([Stage("a", None, deps=("missing",))])
+
+
+def test_documenter_and_workflow_agents_overlap(tmp_path, fake_agents, fake_diagram):
+    fake_agents["delay"] = 0.3
+
+    started = time.perf_counter()
+    result = run_pipeline("https://github.com/owner/repo", "q", tmp_path)
+    elapsed = time.perf_counter() - started
+
+    # analyze (0.3) + max(document, workflow) (0.3) instead of 0.9 sequentially
+    assert elapsed < 0.8
+    assert result.diagram_file is not None
+    assert result.pdf_file.exists()
+    assert {"analyze", "document", "workflow_json", "diagram", "render"} <= set(result.stage_timings)
@@ -0,0 +1,38 @@
+"""Concurrent pipeline runs must keep their artifacts in their own workspaces"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+
+from pipeline import run_pipeline
+
+
+def test_concurrent_jobs_use_isolated_workspaces(tmp_path, monkeypatch, fake_agents, fake_diagram):
+    # Run from an empty cwd so any stray write is easy to spot
+    cwd = tmp_path / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    fake_agents["delay"] = 0.05
+
+    repos = [f"owner/repo{i}" for i in range(6)]
+    barrier = threading.Barrier(len(repos))
+
+    def job(repo):
+        barrier.wait()  # start every job at the same moment
+        return run_pipeline(f"https://github.com/{repo}", "q", tmp_path / repo.replace("/", "_"))
+
+    with ThreadPoolExecutor(max_workers=len(repos)) as pool:
+        results = list(pool.map(job, repos))
+
+    for repo, result in zip(repos, results):
+        content = result.content_file.read_text()
+        assert f"ANALYSIS OF {repo}" in content
+        assert all(f"ANALYSIS OF {other}" not in content for other in repos if other != repo)
+        assert str(result.diagram_file) in content
+        assert result.output_dir == tmp_path / repo.replace("/", "_")
+
+        with fitz.open(result.pdf_file) as pdf:
+            text = "".join(page.get_text() for page in pdf)
+        assert repo in text
+
+    assert list(cwd.iterdir()) == []
@@ -0,0 +1,61 @@
+"""Strategy planner and ETA predictions from recorded stage timings"""
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.database import Base, Document
+from api.services import eta
+from pipeline import planner, run_pipeline
+from pipeline.modes import get_mode
+from pipeline.planner import RepoProfile, choose_plan
+
+
+def test_strategy_follows_repository_size():
+    small = RepoProfile("o/small", size_kb=300, languages={"Python": 9000}, directories=["src"])
+    medium = RepoProfile("o/medium", size_kb=8000, languages={"Go": 1}, directories=["cmd", "pkg"])
+    large = RepoProfile("o/large", size_kb=90000, languages={"TypeScript": 1}, directories=["docs", "packages", "src", "tools"])
+
+    assert choose_plan(small).strategy == "full"
+    assert choose_plan(medium).strategy == "sampled"
+    plan = choose_plan(large)
+    assert plan.strategy == "map_reduce"
+    assert plan.partitions == ["", "packages", "src", "tools"]
+    assert plan.max_files * len(plan.partitions) <= get_mode().max_files
+    # Five file reads cannot be split across parts
+    assert choose_plan(large, get_mode("fast")).strategy == "sampled"
+
+
+def test_unreachable_metadata_falls_back_to_default_plan(monkeypatch):
+    def offline(repo_name, client=None):
+        raise httpx.ConnectError("offline")
+
+    monkeypatch.setattr(planner, "fetch_profile", offline)
+    assert planner.plan_job("o/r").strategy == "sampled"
+
+
+def test_map_reduce_analyzes_each_partition(tmp_path, fake_agents, fake_diagram):
+    plan = choose_plan(RepoProfile("o/r", size_kb=90000, languages={"Python": 1}, directories=["api", "core"]))
+    result = run_pipeline("https://github.com/o/r", "q", tmp_path, plan=plan)
+
+    assert fake_agents["calls"].count("analyze") == 3
+    assert result.strategy == "map_reduce"
+    assert "## Part: repository root" in result.analysis and "## Part: core/" in result.analysis
+
+
+def test_eta_uses_critical_path_of_recorded_timings(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'eta.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    timings = {"ingest": 0, "plan": 1, "snapshot": 2, "scan": 0, "pack": 0, "analyze": 40, "document": 30, "workflow_json": 10, "diagram": 2, "render": 4}
+    for doc_id in range(3):
+        eta.record_stage_timings(db, doc_id, "standard", "full", 100, timings)
+
+    # document (30s) is longer than workflow_json + diagram (12s), so it is on the critical path
+    assert eta.predict_total_seconds(db, "standard", "full") == 1 + 2 + 40 + 30 + 4
+    doc = Document(status="processing", mode="standard", strategy="full", predicted_seconds=77,
+                   started_at=datetime.utcnow() - timedelta(seconds=30))
+    status = eta.document_eta(db, doc)
+    assert 35 <= status["progress"] <= 45
+    assert 45 <= status["eta_seconds"] <= 50
@@ -0,0 +1,73 @@
+"""get_repository_tree: the whole repository listed in one tool call"""
+import httpx
+
+from pipeline.github_async import GithubApiTools
+from pipeline.repo_tree import TreeEntry, render_tree
+from pipeline.snapshot import RepoSnapshot, SnapshotTools
+
+GIT_TREE = {
+    "sha": "abc",
+    "truncated": False,
+    "tree": [
+        {"path": "README.md", "type": "blob", "size": 2048},
+        {"path": "src", "type": "tree"},
+        {"path": "src/app.py", "type": "blob", "size": 512},
+        {"path": "src/api", "type": "tree"},
+        {"path": "src/api/routes.py", "type": "blob", "size": 1536},
+        {"path": "node_modules", "type": "tree"},
+        {"path": "node_modules/left-pad", "type": "tree"},
+        {"path": "node_modules/left-pad/index.js", "type": "blob", "size": 100},
+        {"path": "libs/shared", "type": "commit"},
+        {"path": "libs", "type": "tree"},
+    ],
+}
+
+
+def test_whole_tree_in_one_request():
+    requests = []
+
+    def fake_github(request):
+        requests.append((request.url.path, request.url.params.get("recursive")))
+        return httpx.Response(200, json=GIT_TREE)
+
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(fake_github))
+    listing = GithubApiTools(client).get_repository_tree("acme/api")
+
+    assert requests == [("/repos/acme/api/git/trees/HEAD", "1")]
+    assert listing.splitlines() == [
+        "acme/api@HEAD: 4 files, 4.1K",
+        "libs/  (0 files, 0B)",
+        "  shared  (submodule)",
+        "node_modules/  (1 files, 100B, not expanded)",
+        "src/  (2 files, 2.0K)",
+        "  api/  (1 files, 1.5K)",
+        "    routes.py  1.5K",
+        "  app.py  512B",
+        "README.md  2.0K",
+    ]
+
+
+def test_huge_trees_keep_the_top_levels():
+    entries = [TreeEntry(f"pkg{i}", "dir") for i in range(3)]
+    entries += [TreeEntry(f"pkg{i}/mod{j}.py", "file", 10) for i in range(3) for j in range(100)]
+    listing = render_tree(entries, "o/r", max_entries=30).splitlines()
+
+    assert listing[0] == "o/r: 300 files, 2.9K (listing truncated to 30 of 303 entries)"
+    assert [line for line in listing if not line.startswith(" ")][1:] == [
+        "pkg0/  (100 files, 1000B)", "pkg1/  (100 files, 1000B)", "pkg2/  (100 files, 1000B)",
+    ]
+    assert "  ... 73 more entries" in listing and "  ... 100 more entries" in listing
+
+
+def test_snapshot_tree_of_a_subdirectory(tmp_path):
+    (tmp_path / "src" / "api").mkdir(parents=True)
+    (tmp_path / "src" / "api" / "routes.py").write_text("x" * 40)
+    (tmp_path / "README.md").write_text("# r")
+    tools = SnapshotTools(RepoSnapshot(tmp_path, "o/r", "1a2b", files=2, bytes=43))
+
+    assert tools.get_repository_tree("o/r", path="src").splitlines() == [
+        "o/r@1a2b src/: 1 files, 40B",
+        "api/  (1 files, 40B)",
+        "  routes.py  40B",
+    ]
+    assert "error" in tools.get_repository_tree("o/r", path="../..")
@@ -0,0 +1,86 @@
+"""Static scanner: manifests, entry points, env vars and test commands without an LLM"""
+import json
+
+import pytest
+
+from pipeline import agents, run_pipeline
+from pipeline.scanner import ProjectScan, scan_repository
+
+
+@pytest.fixture
+def project(tmp_path):
+    repo = tmp_path / "shop"
+    (repo / "api").mkdir(parents=True)
+    (repo / "web" / "src").mkdir(parents=True)
+    (repo / "tests").mkdir()
+    (repo / "worker").mkdir()
+    (repo / "README.md").write_text("# Shop\n\nSells things.\n")
+    (repo / "pyproject.toml").write_text(
+        '[project]\nname = "shop"\ndependencies = ["fastapi>=0.100", "sqlalchemy[asyncio]"]\n'
+        '[project.scripts]\nshop = "api.cli:main"\n[tool.pytest.ini_options]\naddopts = "-q"\n'
+    )
+    (repo / "api" / "main.py").write_text(
+        "import os\nfrom fastapi import FastAPI\n\napp = FastAPI()\n"
+        "DB = os.getenv('DATABASE_URL', 'sqlite://')\nKEY = os.environ['SECRET_KEY']\n"
+    )
+    (repo / "api" / "cli.py").write_text("def main():\n    pass\n\nif __name__ == '__main__':\n    main()\n")
+    (repo / "tests" / "test_api.py").write_text("def test_ok():\n    assert True\n")
+    (repo / "web" / "package.json").write_text(json.dumps({
+        "name": "shop-web", "dependencies": {"react": "^18"}, "scripts": {"dev": "vite", "test": "vitest"},
+    }))
+    (repo / "web" / "src" / "api.ts").write_text("export const url = import.meta.env.VITE_API_URL;\n")
+    (repo / "worker" / "queue_test.go").write_text("package worker\n")
+    (repo / "Dockerfile").write_text('FROM python:3.11\nENV PORT=8000\nCMD ["uvicorn", "api.main:app"]\n')
+    return repo
+
+
+def test_scan_extracts_the_project_facts(project):
+    scan = scan_repository(project)
+
+    assert [(m["path"], m["name"], m["dependencies"]) for m in scan.manifests] == [
+        ("pyproject.toml", "shop", ["fastapi", "sqlalchemy"]),
+        ("web/package.json", "shop-web", ["react"]),
+    ]
+    entries = {(entry["path"], entry["kind"], entry["detail"]) for entry in scan.entry_points}
+    assert ("api/main.py", "FastAPI app `app`", "uvicorn api.main:app") in entries
+    assert ("api/cli.py", "__main__ block", "python api/cli.py") in entries
+    assert ("Dockerfile", "Docker CMD", "uvicorn api.main:app") in entries
+    assert ("pyproject.toml", "console script `shop`", "api.cli:main") in entries
+    assert ("web/package.json", "npm run dev", "vite") in entries
+    assert scan.env_vars == {
+        "DATABASE_URL": ["api/main.py"], "PORT": ["Dockerfile"],
+        "SECRET_KEY": ["api/main.py"], "VITE_API_URL": ["web/src/api.ts"],
+    }
+    # Each test command records the folder its tests were found in
+    assert scan.test_commands == ["go test ./... (in worker/)", "npm test (in web/)", "pytest", "pytest (in tests/)"]
+
+
+def test_scan_output_is_deterministic(project):
+    first, second = scan_repository(project), scan_repository(project)
+
+    assert json.dumps(first.to_output()) == json.dumps(second.to_output())
+    assert ProjectScan.from_output(first.to_output()) == first
+    facts = first.render()
+    assert "Entry points:" in facts and "- api/main.py: FastAPI app `app` -> uvicorn api.main:app" in facts
+    assert "Test commands: go test ./... (in worker/); npm test (in web/); pytest; pytest (in tests/)" in facts
+
+
+def test_scan_replaces_or_seeds_the_analysis(tmp_path, project, fake_agents, fake_diagram, monkeypatch):
+    result = run_pipeline(str(project), "q", tmp_path / "fast", mode="fast")
+
+    # Fast mode: no analysis call at all
+    assert fake_agents["calls"] == ["document"]
+    assert "uvicorn api.main:app" in result.analysis and "Sells things." in result.analysis
+
+    seen = {}
+    fake_analysis_agent = agents.build_analysis_agent
+
+    def analysis_agent(repo_name, **kwargs):
+        seen["scan"] = kwargs["project_scan"]
+        return fake_analysis_agent(repo_name, **kwargs)
+
+    monkeypatch.setattr(agents, "build_analysis_agent", analysis_agent)
+    run_pipeline(str(project), "q", tmp_path / "standard", mode="standard")
+
+    # Other modes: the agent starts from the facts
+    assert seen["scan"].manifests[0]["path"] == "pyproject.toml"
@@ -0,0 +1,79 @@
+"""Repository snapshots: one tarball download, then tools served from disk"""
+import io
+import json
+import tarfile
+
+import httpx
+import pytest
+
+from pipeline import snapshot as snapshot_module
+from pipeline.snapshot import SnapshotTools, load_snapshot
+
+# conftest replaces download_snapshot with an offline stand-in; these tests need the real one
+download_snapshot = snapshot_module.download_snapshot
+
+
+def make_tarball(files: dict, top: str = "acme-api-1a2b3c4") -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(f"{top}/{name}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo(f"{top}/escape")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        archive.addfile(link)
+        evil = tarfile.TarInfo(f"{top}/../evil.txt")
+        evil.size = 4
+        archive.addfile(evil, io.BytesIO(b"evil"))
+    return buffer.getvalue()
+
+
+FILES = {
+    "README.md": b"# API\n",
+    "src/app.py": b"print('hi')\n",
+    "logo.png": b"\x89PNG\x00\x00\x01",
+}
+
+
+def test_one_request_downloads_the_whole_repository(tmp_path):
+    requests = []
+    tarball = make_tarball(FILES)
+
+    def fake_github(request):
+        requests.append(request.url.path)
+        if request.url.path == "/repos/acme/api/tarball":
+            return httpx.Response(302, headers={"Location": "https://codeload.github.test/acme/api/tar.gz/main"})
+        return httpx.Response(200, content=tarball)
+
+    client = httpx.Client(base_url="https://api.github.test", transport=httpx.MockTransport(fake_github))
+    snapshot = download_snapshot("acme/api", tmp_path / "snapshot", client=client)
+
+    assert requests == ["/repos/acme/api/tarball", "/acme/api/tar.gz/main"]
+    # logo.png is left out (see pipeline.file_filter)
+    assert (snapshot.sha, snapshot.files, snapshot.skipped_files) == ("1a2b3c4", 2, 1)
+    assert (tmp_path / "snapshot/src/app.py").read_text() == "print('hi')\n"
+    assert not (tmp_path / "evil.txt").exists() and not (tmp_path / "snapshot/escape").exists()
+
+
+def test_tools_read_the_snapshot(tmp_path):
+    archive = tmp_path / "repo.tar.gz"
+    archive.write_bytes(make_tarball(FILES))
+    tools = SnapshotTools(load_snapshot(archive, tmp_path / "snapshot", "acme/api"))
+
+    listing = json.loads(tools.get_directory_content("acme/api", ""))
+    assert [item["name"] for item in listing] == ["src", "README.md"]
+    assert json.loads(tools.get_file_content("acme/api", "src/app.py"))["content"] == "print('hi')\n"
+    assert "error" in json.loads(tools.get_file_content("acme/api", "logo.png"))
+    assert json.loads(tools.get_repository_languages("acme/api")) == {"Python": 12}
+    assert "error" in json.loads(tools.get_file_content("acme/api", "../../etc/passwd"))
+
+
+def test_oversized_archive_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_module, "SNAPSHOT_MAX_BYTES", 10)
+    archive = tmp_path / "repo.tar.gz"
+    archive.write_bytes(make_tarball(FILES))
+
+    with pytest.raises(snapshot_module.SnapshotTooLarge):
+        load_snapshot(archive, tmp_path / "snapshot", "acme/api")
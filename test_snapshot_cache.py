@@ -0,0 +1,59 @@
+"""Snapshot cache: keyed by commit, filled once under concurrency, LRU-evicted"""
+import os
+import threading
+import time
+
+from pipeline.snapshot import RepoSnapshot
+from pipeline.snapshot_cache import SnapshotCache
+
+
+def fake_fetch(size: int, calls: list):
+    def fetch(dest):
+        calls.append(dest)
+        time.sleep(0.05)
+        dest.mkdir(parents=True)
+        (dest / "README.md").write_bytes(b"x" * size)
+        return RepoSnapshot(root=dest, repo_name="o/r", files=1, bytes=size)
+    return fetch
+
+
+def test_concurrent_jobs_fetch_a_commit_once(tmp_path):
+    cache = SnapshotCache(tmp_path)
+    calls, results = [], []
+
+    def job():
+        results.append(cache.get_or_fetch("o/r", "a" * 40, fake_fetch(10, calls)))
+
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False, True, True, True]
+    assert all((snapshot.root / "README.md").exists() for snapshot, _ in results)
+    assert {"hits": 3, "misses": 1}.items() <= cache.stats().items()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = SnapshotCache(tmp_path, max_bytes=250, in_use_seconds=0)
+    cache.get_or_fetch("o/r", "1" * 40, fake_fetch(100, []))
+    cache.get_or_fetch("o/r", "2" * 40, fake_fetch(100, []))
+    # Make entry 1 the most recently used
+    os.utime(tmp_path / f"o__r@{'2' * 40}.json", (0, 0))
+    cache.get_or_fetch("o/r", "1" * 40, fake_fetch(100, []))
+
+    cache.get_or_fetch("o/r", "3" * 40, fake_fetch(100, []))
+
+    assert not (tmp_path / f"o__r@{'2' * 40}").exists()
+    assert (tmp_path / f"o__r@{'1' * 40}").exists() and (tmp_path / f"o__r@{'3' * 40}").exists()
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 200
+
+
+def test_recently_used_entries_are_kept_over_the_cap(tmp_path):
+    cache = SnapshotCache(tmp_path, max_bytes=50, in_use_seconds=3600)
+    cache.get_or_fetch("o/r", "1" * 40, fake_fetch(100, []))
+    cache.get_or_fetch("o/r", "2" * 40, fake_fetch(100, []))
+
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,57 @@
+"""Per-stage time budgets: optional stages degrade, required stages fail fast"""
+import time
+
+import pytest
+
+from pipeline import run_pipeline, runner
+from pipeline.dag import Stage, StageError, StageTimeout, run_dag
+
+
+def test_slow_diagram_still_produces_pdf(tmp_path, monkeypatch, fake_agents):
+    def hanging_render(input_file, output_file, timeout=30):
+        time.sleep(3)
+        return str(output_file)
+
+    monkeypatch.setattr(runner, "render_workflow_diagram", hanging_render)
+    started = time.perf_counter()
+    result = run_pipeline(
+        "https://github.com/owner/repo", "q", tmp_path,
+        stage_budgets={"diagram": 0.1}
+    )
+
+    assert time.perf_counter() - started < 2
+    assert result.degraded_stages == ["diagram"]
+    assert result.pdf_file.exists()
+    assert "## Workflow Diagram" not in result.content_file.read_text()
+
+
+def test_required_stage_timeout_fails_the_run(tmp_path, fake_agents, fake_diagram):
+    fake_agents["delay"] = 2.0
+    started = time.perf_counter()
+    with pytest.raises(StageError) as excinfo:
+        run_pipeline(
+            "https://github.com/owner/repo", "q", tmp_path,
+            stage_budgets={"analysis": 0.2}
+        )
+
+    assert excinfo.value.stage == "analyze"
+    assert isinstance(excinfo.value.error, StageTimeout)
+    assert time.perf_counter() - started < 1.5
+
+
+def test_failed_optional_stage_passes_none_downstream():
+    def broken(inputs):
+        raise RuntimeError("boom")
+
+    result = run_dag([
+        Stage("extra", broken, optional=True),
+        Stage("final", lambda inputs: inputs["extra"], deps=("extra",)),
+    ])
+
+    assert result.degraded == ["extra"]
+    assert result.outputs["final"] is None
+
+
+def test_unknown_stage_budget_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run_pipeline("https://github.com/owner/repo", "q", tmp_path, stage_budgets={"nope": 1})
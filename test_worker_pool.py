@@ -0,0 +1,87 @@
+"""Warm worker pool: job hand-off, recycling and statistics"""
+import os
+import threading
+import time
+
+import pytest
+
+from api.services.worker_pool import WorkerPool
+from pipeline import PipelineCancelled
+
+
+def report_pid(value):
+    """Pool target used by these tests"""
+    if value == "boom":
+        raise ValueError("boom")
+    if value == "hang":
+        time.sleep(60)
+    return os.getpid(), value
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def _make(**kwargs):
+        pool = WorkerPool(target="test_worker_pool:report_pid", warm_up=None, **kwargs)
+        pool.start()
+        pools.append(pool)
+        return pool
+
+    yield _make
+    for pool in pools:
+        pool.close()
+
+
+def test_workers_are_recycled_after_max_jobs(make_pool):
+    pool = make_pool(size=2, max_jobs_per_worker=2)
+
+    pids = [pool.run(i)[0] for i in range(6)]
+
+    assert all(pids.count(pid) <= 2 for pid in pids)
+    stats = pool.stats()
+    assert stats["jobs_completed"] == 6
+    assert stats["warm_jobs"] + stats["cold_jobs"] == 6
+    assert stats["recycled_after_jobs"] == 3
+    assert stats["alive"] == 2
+
+
+def test_workers_are_recycled_over_rss_threshold(make_pool):
+    pool = make_pool(size=1, max_jobs_per_worker=0, max_rss_mb=1)
+
+    first, _ = pool.run("a")
+    second, _ = pool.run("b")
+
+    assert first != second
+    assert pool.stats()["recycled_for_rss"] == 2
+
+
+def test_job_errors_are_raised_and_counted(make_pool):
+    pool = make_pool(size=1)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.run("boom")
+
+    assert pool.run("ok")[1] == "ok"
+    stats = pool.stats()
+    assert stats["jobs_failed"] == 1
+    assert stats["jobs_completed"] == 1
+    assert stats["recycled"] == 0
+
+
+def test_cancel_kills_the_job_and_replaces_the_worker(make_pool):
+    pool = make_pool(size=1)
+    first_pid = pool.run("warm")[0]
+
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    started = time.perf_counter()
+    with pytest.raises(PipelineCancelled):
+        pool.run("hang", cancel_event=cancel)
+
+    assert time.perf_counter() - started < 2
+    assert pool.run("ok")[0] != first_pid
+    stats = pool.stats()
+    assert stats["jobs_cancelled"] == 1
+    assert stats["jobs_failed"] == 0
+    assert stats["alive"] == 1